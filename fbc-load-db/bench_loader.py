@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  © 2025 Francisco Vivas Puerto (aka “DaFrancc”)
+#  All rights reserved. This file is part of the FoodBankConnect tooling.
+#  You may use and distribute with proper attribution to the author.
+# ============================================================================
+
+"""
+Loader benchmarks over synthetic_data.generate().
+
+For each size, the in-memory pipeline (entity resolution, classify/dedup, id
+assignment) runs once; then, when a database is configured (DB_HOST, DB_NAME,
+DB_USER, DB_PASSWORD), every insert strategy loads the same rows into a scratch
+schema (bench_<strategy>, dropped afterwards) against the local Postgres.
+
+Results go to stdout as one JSON object per line (or to --output), with the
+per-stage breakdown from main.LoadReport; logs go to stderr.
+
+Usage:
+    python bench_loader.py                                # 1k, 100k, 1M rows; copy, executemany, orm
+    python bench_loader.py --sizes 1k,100k --strategies copy,executemany --output bench.jsonl
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+import main as loader
+from synthetic_data import DUPLICATE_RATE, generate, parse_size
+
+
+def _assign_ids(pipeline_counts: Dict[str, int]):
+    """
+    Sequential ids per bucket, standing in for StableIds (which needs the live id_map).
+    """
+    def assign(batch: List[Dict[str, Any]], bucket: str) -> List[Dict[str, Any]]:
+        for r in batch:
+            pipeline_counts[bucket] += 1
+            r["id"] = str(pipeline_counts[bucket])
+        return batch
+    return assign
+
+
+def _rows(size: int, seed: int, duplicate_rate: float, resolve: bool) -> Iterable[Dict[str, Any]]:
+    rows = loader.REPORT.timed(generate(size, seed, duplicate_rate), "generate")
+    if resolve:
+        rows = loader.REPORT.timed(loader.EntityResolver().resolve(rows), "resolve")
+    return rows
+
+
+def _result(kind: str, size: int, strategy: Optional[str], counts: Dict[str, int], started: float) -> Dict[str, Any]:
+    report = loader.REPORT.to_dict()
+    wall = time.perf_counter() - started
+    loaded = sum(counts.values())
+    return {
+        "benchmark": kind,
+        "size": size,
+        "strategy": strategy,
+        "rows_out": loaded,
+        "counts": counts,
+        "wall_secs": round(wall, 4),
+        "rows_per_sec": round(size / wall, 1) if wall > 0 else None,
+        "process_peak_rss_mb": report["process_peak_rss_mb"],
+        "round_trips": report["round_trips"],
+        "stages": report["stages"],
+    }
+
+
+def bench_pipeline(size: int, seed: int, duplicate_rate: float, resolve: bool) -> Dict[str, Any]:
+    """
+    Normalize/dedup only: everything before the database, batches are discarded.
+    """
+    loader.REPORT = loader.LoadReport()
+    started = time.perf_counter()
+    counts = loader.BatchPipeline(lambda model, batch, bucket: None).feed(_rows(size, seed, duplicate_rate, resolve))
+    return _result("pipeline", size, None, dict(counts), started)
+
+
+def _create_scratch_schema(engine, schema: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        for model in loader.RESOURCE_MODELS:
+            # The id column defaults reference <table>_id_seq, so it has to exist first.
+            conn.execute(text(f"CREATE SEQUENCE {schema}.{model.__tablename__}_id_seq"))
+        loader.Base.metadata.create_all(conn, tables=[m.__table__ for m in loader.RESOURCE_MODELS])
+
+
+def bench_insert(size: int, strategy: str, seed: int, duplicate_rate: float, resolve: bool) -> Dict[str, Any]:
+    """
+    Full normalize/dedup/insert of size rows with one strategy into a scratch schema.
+    """
+    schema = f"bench_{strategy}"
+    engine = loader.get_engine(search_path=schema)
+    try:
+        _create_scratch_schema(engine, schema)
+        loader.REPORT = loader.LoadReport()
+        ids = _assign_ids(dict.fromkeys(loader.BUCKET_MODELS, 0))
+        started = time.perf_counter()
+        with loader.get_session(engine) as s:
+            def flush(model, batch, bucket):
+                with loader.REPORT.stage(f"insert.{model.__tablename__}", rows=len(batch)):
+                    loader.insert_rows(s, model, ids(batch, bucket), bucket, strategy)
+
+            counts = loader.BatchPipeline(flush).feed(_rows(size, seed, duplicate_rate, resolve))
+        return _result("insert", size, strategy, dict(counts), started)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        engine.dispose()
+
+
+def _database_configured() -> bool:
+    return all(os.getenv(k) for k in ("DB_HOST", "DB_NAME", "DB_USER", "DB_PASSWORD"))
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the loader on synthetic data.")
+    parser.add_argument("--sizes", default="1k,100k,1M", help="comma-separated row counts (default: 1k,100k,1M)")
+    parser.add_argument("--strategies", default=",".join(loader.INSERTERS),
+                        help=f"comma-separated insert strategies (default: {','.join(loader.INSERTERS)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE)
+    parser.add_argument("--no-resolve", action="store_true", help="skip entity resolution")
+    parser.add_argument("--no-db", action="store_true", help="only run the in-memory pipeline")
+    parser.add_argument("--output", help="write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(os.getenv("LOG_LEVEL", "WARNING"))      # scraper's import already configured logging
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+    unknown = [s for s in strategies if s not in loader.INSERTERS]
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(unknown)}")
+    use_db = not args.no_db and _database_configured()
+    if not args.no_db and not use_db:
+        logging.warning("No database configured (DB_HOST/DB_NAME/DB_USER/DB_PASSWORD); running pipeline benchmarks only.")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    env = {"python": platform.python_version(), "platform": platform.platform(),
+           "batch_size": loader.LOAD_BATCH_SIZE, "duplicate_rate": args.duplicate_rate, "seed": args.seed}
+    resolve = not args.no_resolve and loader.ENTITY_RESOLUTION
+    try:
+        for size in sizes:
+            results = [bench_pipeline(size, args.seed, args.duplicate_rate, resolve)]
+            if use_db:
+                results += [bench_insert(size, strategy, args.seed, args.duplicate_rate, resolve)
+                            for strategy in strategies]
+            for r in results:
+                out.write(json.dumps(dict(r, env=env)) + "\n")
+                out.flush()
+                print(f"[bench] {r['benchmark']:<8} size={r['size']:<8} strategy={r['strategy'] or '-':<11} "
+                      f"{r['wall_secs']:9.3f}s {r['rows_per_sec'] or 0:12.1f} rows/s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,23 +3,32 @@
 # All rights reserved.
 # ============================================================= #
 
-from typing import Any, Dict, List, Optional, Tuple, Iterable
+from typing import Any, Callable, Dict, List, Optional, Tuple, Iterable, Iterator
+import io
+import argparse
 import os
+import re
 import sys
 import json
+import time
+import uuid
+import queue
+import threading
 import hashlib
 import logging
-
-from sqlalchemy import String, Float, Integer, TIMESTAMP, create_engine, func, cast, Sequence
+import difflib
+import resource
+import itertools
+import contextlib
+from datetime import datetime, timezone
+
+from sqlalchemy import String, Float, Integer, TIMESTAMP, create_engine, event, func, cast, text, Sequence
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
-from sqlalchemy.dialects.postgresql import JSONB, TEXT
-
-from scraper import scrape as run_all_scrapers
-
-global_foodbank_id = 1
-global_program_id = 1
-global_sponsor_id = 1
+from sqlalchemy.dialects.postgresql import JSONB, TEXT, insert as pg_insert
 
+from scraper import CHECKPOINT_DIR, SCRAPER_STATS, scrape_stream, replay_checkpoints
 
 class Base(DeclarativeBase):
     """
@@ -102,11 +111,376 @@ class Sponsor(Base):
     created_at: Mapped[Any] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
 
 
+class DatasetVersion(Base):
+    """
+    Single-row stamp describing the currently loaded dataset.
+    The API reads it to derive ETags/Cache-Control without touching resource tables.
+    """
+    __tablename__ = "dataset_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)                   # always 1
+    version: Mapped[str] = mapped_column(String(64))                              # content checksum prefix
+    load_id: Mapped[str] = mapped_column(String(64))
+    checksum: Mapped[str] = mapped_column(String(64))
+    row_counts: Mapped[Optional[Any]] = mapped_column(JSONB, nullable=True)
+    loaded_at: Mapped[Any] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class IdMap(Base):
+    """
+    Persistent natural key -> numeric id assignments, so a record keeps its id (and its
+    URLs, cache entries and ETags) across reloads. Lives outside the swapped tables.
+    """
+    __tablename__ = "id_map"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    natural_key: Mapped[str] = mapped_column(String, primary_key=True)     # make_stable_id() output
+    id: Mapped[str] = mapped_column(String)
+    created_at: Mapped[Any] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class RowHash(Base):
+    """
+    Content hash of every row written by an incremental load, keyed by (table, id).
+    Kept outside the resource tables so API responses are unaffected.
+    """
+    __tablename__ = "row_hashes"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64))
+
+
+# ----------------------------------------------------------------------------
+# Derived relations (materialized views refreshed after every load)
+# ----------------------------------------------------------------------------
+
+# Full-text search documents served by the API's /v1/search route.
+# Each row carries the display name, a plain-text body used for snippets and a
+# weighted tsvector (name = A, everything else = B) backed by a GIN index.
+SEARCH_DOCUMENTS_SQL = """
+SELECT
+    docs.model,
+    docs.id,
+    docs.name,
+    docs.body,
+    setweight(to_tsvector('english', coalesce(docs.name, '')), 'A')
+        || setweight(to_tsvector('english', docs.body), 'B') AS document
+FROM (
+    SELECT 'foodbanks'::text AS model, id, name,
+           concat_ws(' ', name, city, state, zipcode, eligibility, urgency, about,
+                     services::text, languages::text) AS body
+    FROM foodbanks
+    UNION ALL
+    SELECT 'programs'::text, id, name,
+           concat_ws(' ', name, program_type, host, eligibility, frequency, cost, about)
+    FROM programs
+    UNION ALL
+    SELECT 'sponsors'::text, id, name,
+           concat_ws(' ', name, affiliation, contribution, past_involvement, city, state, about)
+    FROM sponsors
+) AS docs
+"""
+
+# Precomputed relationships served by /v1/<resource>/<id>/<related>.
+# Edges are stored in both directions and ranked per (source, target model);
+# each direction keeps its LINKS_PER_ITEM best targets.
+#   foodbank <-> program : program.host names the foodbank, or the foodbank lists the program in services
+#   sponsor  <-> foodbank: past_involvement mentions the foodbank, same city, or same state
+#   program  <-> sponsor : sponsors linked to the program's host foodbank
+# Every edge type is its own equality join (hash join) or LATERAL index walk, and is ranked
+# and cut to LINKS_PER_ITEM before it is combined or chained, so the work stays linear in
+# the number of rows instead of pairing everything in a state.
+LINKS_PER_ITEM = int(os.getenv("LINKS_PER_ITEM", "25"))
+
+# Indexes the LATERAL "same city" / "same state" walks use; created with the list indexes.
+LINK_INDEX_DDL: Dict[str, Tuple[str, ...]] = {
+    table: (
+        f"CREATE INDEX IF NOT EXISTS {table}_state_link_idx ON {table} (upper(state), id)",
+        f"CREATE INDEX IF NOT EXISTS {table}_city_link_idx ON {table} (lower(city), upper(state), id)",
+    )
+    for table in ("foodbanks", "sponsors")
+}
+
+
+def _top_links_sql(candidates: str) -> str:
+    """
+    Best reason per (src_id, dst_id) among the candidate edges, then the LINKS_PER_ITEM best dst per src.
+    """
+    return f"""
+    SELECT src_id, dst_id, reason, score
+    FROM (
+        SELECT best.*, row_number() OVER (PARTITION BY src_id ORDER BY score DESC, dst_id) AS rank
+        FROM (
+            SELECT DISTINCT ON (src_id, dst_id) src_id, dst_id, reason, score
+            FROM ({candidates}) AS cand
+            ORDER BY src_id, dst_id, score DESC
+        ) AS best
+    ) AS ranked
+    WHERE rank <= {LINKS_PER_ITEM}"""
+
+
+def _nearby_links_sql(src: str, dst: str) -> str:
+    """
+    Same-city (score 2) and same-state (score 1) candidates from src to dst. Each LATERAL walks
+    dst's link index and stops after LINKS_PER_ITEM rows, which is all the ranking can keep.
+    """
+    return f"""
+    SELECT a.id AS src_id, n.id AS dst_id, 'city' AS reason, 2 AS score
+    FROM {src} a
+    CROSS JOIN LATERAL (
+        SELECT b.id FROM {dst} b
+        WHERE lower(b.city) = lower(a.city) AND upper(b.state) = upper(a.state)
+        ORDER BY b.id LIMIT {LINKS_PER_ITEM}
+    ) AS n
+    UNION ALL
+    SELECT a.id, n.id, 'state', 1
+    FROM {src} a
+    CROSS JOIN LATERAL (
+        SELECT b.id FROM {dst} b
+        WHERE upper(b.state) = upper(a.state)
+        ORDER BY b.id LIMIT {LINKS_PER_ITEM}
+    ) AS n"""
+
+
+LINKS_SQL = f"""
+WITH fb_prog AS (
+    SELECT f.id AS fb_id, p.id AS prog_id, 'host' AS reason, 3 AS score
+    FROM foodbanks f
+    JOIN programs p ON lower(p.host) = lower(f.name)
+    UNION ALL
+    SELECT f.id, p.id, 'services', 1
+    FROM foodbanks f
+    CROSS JOIN LATERAL jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(f.services) = 'array' THEN f.services ELSE '[]'::jsonb END
+    ) AS svc(name)
+    JOIN programs p ON p.name = svc.name
+),
+-- Sponsors are split into words so the containment test only runs on pairs that share
+-- the first word of the foodbank's name.
+sponsor_words AS (
+    SELECT DISTINCT s.id, lower(s.past_involvement) AS past_involvement, w.word
+    FROM sponsors s
+    CROSS JOIN LATERAL regexp_split_to_table(lower(s.past_involvement), '[^a-z0-9]+') AS w(word)
+    WHERE w.word <> ''
+),
+fb_sponsor_past AS (
+    SELECT DISTINCT f.id AS fb_id, sw.id AS sponsor_id
+    FROM foodbanks f
+    JOIN sponsor_words sw ON sw.word = substring(lower(f.name) FROM '[a-z0-9]+')
+    WHERE strpos(sw.past_involvement, lower(f.name)) > 0
+),
+fb_to_prog AS ({_top_links_sql("SELECT fb_id AS src_id, prog_id AS dst_id, reason, score FROM fb_prog")}
+),
+prog_to_fb AS ({_top_links_sql("SELECT prog_id AS src_id, fb_id AS dst_id, reason, score FROM fb_prog")}
+),
+fb_to_sponsor AS ({_top_links_sql(
+    "SELECT fb_id AS src_id, sponsor_id AS dst_id, 'past_involvement' AS reason, 3 AS score FROM fb_sponsor_past"
+    " UNION ALL " + _nearby_links_sql("foodbanks", "sponsors"))}
+),
+sponsor_to_fb AS ({_top_links_sql(
+    "SELECT sponsor_id AS src_id, fb_id AS dst_id, 'past_involvement' AS reason, 3 AS score FROM fb_sponsor_past"
+    " UNION ALL " + _nearby_links_sql("sponsors", "foodbanks"))}
+),
+prog_to_sponsor AS ({_top_links_sql(
+    "SELECT h.prog_id AS src_id, fs.dst_id, 'host_' || fs.reason AS reason, fs.score"
+    " FROM fb_prog h JOIN fb_to_sponsor fs ON fs.src_id = h.fb_id WHERE h.reason = 'host'")}
+),
+sponsor_to_prog AS ({_top_links_sql(
+    "SELECT sf.src_id, h.dst_id, 'host_' || sf.reason AS reason, sf.score"
+    " FROM sponsor_to_fb sf JOIN fb_to_prog h ON h.src_id = sf.dst_id WHERE h.reason = 'host'")}
+),
+edges AS (
+    SELECT 'foodbanks'::text AS src_model, src_id, 'programs'::text AS dst_model, dst_id, reason, score FROM fb_to_prog
+    UNION ALL
+    SELECT 'programs', src_id, 'foodbanks', dst_id, reason, score FROM prog_to_fb
+    UNION ALL
+    SELECT 'foodbanks', src_id, 'sponsors', dst_id, reason, score FROM fb_to_sponsor
+    UNION ALL
+    SELECT 'sponsors', src_id, 'foodbanks', dst_id, reason, score FROM sponsor_to_fb
+    UNION ALL
+    SELECT 'programs', src_id, 'sponsors', dst_id, reason, score FROM prog_to_sponsor
+    UNION ALL
+    SELECT 'sponsors', src_id, 'programs', dst_id, reason, score FROM sponsor_to_prog
+)
+SELECT src_model, src_id, dst_model, dst_id, reason, score,
+       row_number() OVER (PARTITION BY src_model, src_id, dst_model ORDER BY score DESC, dst_id) AS rank
+FROM edges
+"""
+
+# Chart dimensions; must match FACET_DIMENSIONS in fbc-rest-api/app.py.
+# Counts are precomputed for every single dimension and every pair of dimensions,
+# keyed by the comma-joined sorted dimension names (e.g. "affiliation,contribution").
+FACET_DIMENSIONS: Dict[str, Tuple[str, ...]] = {
+    "foodbanks": ("state", "city", "urgency", "capacity", "eligibility"),
+    "programs": ("program_type", "frequency", "cost", "eligibility"),
+    "sponsors": ("affiliation", "contribution", "state", "city"),
+}
+
+
+def _facet_counts_sql() -> str:
+    """
+    Builds one GROUP BY per (model, dimension combination), merged with UNION ALL.
+    """
+    selects = []
+    for model, dims in FACET_DIMENSIONS.items():
+        for k in (1, 2):
+            for combo in itertools.combinations(sorted(dims), k):
+                cols = ", ".join(combo)
+                bucket = ", ".join(f"'{c}', {c}" for c in combo)
+                selects.append(
+                    f"SELECT '{model}'::text AS model, '{','.join(combo)}'::text AS dimensions, "
+                    f"jsonb_build_object({bucket}) AS bucket, count(*) AS count "
+                    f"FROM {model} GROUP BY {cols}"
+                )
+    return "\nUNION ALL\n".join(selects)
+
+
+FACET_COUNTS_SQL = _facet_counts_sql()
+
+DERIVED_VIEWS: Dict[str, Tuple[str, List[str]]] = {
+    "search_documents": (
+        SEARCH_DOCUMENTS_SQL,
+        [
+            "CREATE UNIQUE INDEX IF NOT EXISTS search_documents_pk ON search_documents (model, id)",
+            "CREATE INDEX IF NOT EXISTS search_documents_document_idx ON search_documents USING GIN (document)",
+        ],
+    ),
+    "links": (
+        LINKS_SQL,
+        ["CREATE UNIQUE INDEX IF NOT EXISTS links_pk ON links (src_model, src_id, dst_model, rank)"],
+    ),
+    "facet_counts": (
+        FACET_COUNTS_SQL,
+        # Unique (as REFRESH ... CONCURRENTLY requires); its (model, dimensions) prefix serves lookups.
+        ["CREATE UNIQUE INDEX IF NOT EXISTS facet_counts_pk ON facet_counts (model, dimensions, bucket)"],
+    ),
+}
+
+
+def refresh_derived_views(session: Session) -> None:
+    """
+    Creates and refreshes every derived materialized view inside the current transaction.
+    Each view is tagged (COMMENT) with a hash of its SQL and recreated when the definition
+    changes. Views that already hold data are refreshed CONCURRENTLY, so API readers of
+    search/related/facets are not blocked until the load commits.
+    """
+    for name, (select_sql, index_ddl) in DERIVED_VIEWS.items():
+        signature = hashlib.sha256(select_sql.encode("utf-8")).hexdigest()
+        current = session.execute(text(
+            "SELECT ispopulated, obj_description(format('%I.%I', schemaname, matviewname)::regclass, 'pg_class') "
+            "FROM pg_matviews WHERE schemaname = current_schema() AND matviewname = :name"
+        ), {"name": name}).first()
+        if current is not None and current[1] != signature:
+            logging.info("Definition of %s changed; recreating it", name)
+            session.execute(text(f"DROP MATERIALIZED VIEW {name}"))
+            current = None
+        if current is None:
+            session.execute(text(f"CREATE MATERIALIZED VIEW {name} AS {select_sql} WITH NO DATA"))
+            session.execute(text(f"COMMENT ON MATERIALIZED VIEW {name} IS '{signature}'"))
+        for ddl in index_ddl:
+            session.execute(text(ddl))
+        concurrently = "CONCURRENTLY " if current is not None and current[0] else ""
+        session.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}{name}"))
+
+
+# ----------------------------------------------------------------------------
+# List ordering indexes (keyset pagination in the API)
+# ----------------------------------------------------------------------------
+
+# Numeric-first id tiebreaker; must match _ID_ORDER_EXPRS in fbc-rest-api/app.py
+# so the planner can walk these indexes instead of sorting whole tables.
+ID_ORDER_SQL = (
+    "(CASE WHEN id ~ '^[0-9]{1,18}$' THEN 0 ELSE 1 END), "
+    "(CASE WHEN id ~ '^[0-9]{1,18}$' THEN id::bigint END), "
+    "id"
+)
+
+# Columns the frontend sorts by; each gets a (column, id tiebreaker) index.
+SORT_INDEX_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "foodbanks": ("name", "city", "zipcode", "urgency", "eligibility"),
+    "programs": ("name", "host", "frequency", "program_type", "eligibility"),
+    "sponsors": ("name", "contribution", "affiliation", "city", "state"),
+}
+
+
+def ensure_list_indexes(session: Session, tables: Optional[Iterable[str]] = None) -> None:
+    """
+    Creates the id-order, per-sort-column and link-join indexes (for all tables, or just the given ones)
+    if they are missing.
+    """
+    for table, columns in SORT_INDEX_COLUMNS.items():
+        if tables is not None and table not in tables:
+            continue
+        session.execute(text(f"CREATE INDEX IF NOT EXISTS {table}_id_order_idx ON {table} ({ID_ORDER_SQL})"))
+        for col in columns:
+            session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {table}_{col}_order_idx ON {table} ({col}, {ID_ORDER_SQL})"
+            ))
+        for ddl in LINK_INDEX_DDL.get(table, ()):
+            session.execute(text(ddl))
+
+
+# ----------------------------------------------------------------------------
+# Dataset version stamp
+# ----------------------------------------------------------------------------
+
+VERSIONED_TABLES = ("foodbanks", "programs", "sponsors")
+
+
+# Load timestamps change on every run without the content changing. API reads still
+# return them, which is why the API's ETags derived from this checksum are weak.
+CHECKSUM_IGNORED_COLUMNS = ("created_at", "fetched_at")
+
 
+def dataset_checksum(session: Session) -> Tuple[str, Dict[str, int]]:
+    """
+    Returns (checksum, row counts) over the versioned tables, ignoring CHECKSUM_IGNORED_COLUMNS.
+    """
+    digest = hashlib.sha256()
+    counts: Dict[str, int] = {}
+    row_json = "to_jsonb(t)" + "".join(f" - '{c}'" for c in CHECKSUM_IGNORED_COLUMNS)
+    for table in VERSIONED_TABLES:
+        n, table_md5 = session.execute(text(
+            f"SELECT count(*), coalesce(md5(string_agg(md5(({row_json})::text), '' ORDER BY t.id)), '') "
+            f"FROM {table} AS t"
+        )).one()
+        counts[table] = int(n)
+        digest.update(f"{table}:{n}:{table_md5}|".encode("utf-8"))
+    return digest.hexdigest(), counts
+
+
+def stamp_dataset_version(session: Session, checksum: Optional[Tuple[str, Dict[str, int]]] = None) -> str:
+    """
+    Records the content checksum of the loaded tables (computed here unless passed in),
+    with a fresh load id, in dataset_version. Returns the version.
+    Identical reloads therefore keep the same version and downstream ETags stay valid.
+    """
+    checksum, counts = checksum or dataset_checksum(session)
+    version = checksum[:20]
+    load_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + uuid.uuid4().hex[:8]
 
-def get_engine():
+    stmt = pg_insert(DatasetVersion).values(
+        id=1, version=version, load_id=load_id, checksum=checksum, row_counts=counts, loaded_at=func.now(),
+    )
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[DatasetVersion.id],
+        set_={
+            "version": stmt.excluded.version,
+            "load_id": stmt.excluded.load_id,
+            "checksum": stmt.excluded.checksum,
+            "row_counts": stmt.excluded.row_counts,
+            "loaded_at": stmt.excluded.loaded_at,
+        },
+    ))
+    logging.info("Dataset version %s (load %s)", version, load_id)
+    return version
+
+
+def get_engine(search_path: Optional[str] = None):
     """
-    Builds Engine from discrete env vars; sets search_path via connect args.
+    Builds Engine from discrete env vars; sets search_path via connect args
+    (DB_SCHEMA unless search_path is given, e.g. "app_staging,app" while building a load).
     Required: DB_HOST, DB_NAME, DB_USER, DB_PASSWORD.
     Optional: DB_PORT (5432), DB_SCHEMA (public).
     """
@@ -126,7 +500,7 @@ def get_engine():
         conn_str,
         pool_pre_ping=True,
         future=True,
-        connect_args={"options": f"-c search_path={schema}"},
+        connect_args={"options": f"-c search_path={search_path or schema}"},
     )
 
 
@@ -137,45 +511,202 @@ def get_session(engine) -> Session:
     return Session(engine)
 
 
-def normalize_buckets(rows):
+# ----------------------------------------------------------------------------
+# Load report (per-stage timing, throughput, RSS growth, DB round trips)
+# ----------------------------------------------------------------------------
+
+LOAD_REPORT_DIR = os.getenv("LOAD_REPORT_DIR", os.getenv("LOG_DIR", "."))
+
+
+def _peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far (ru_maxrss is KiB on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _current_rss_mb() -> float:
     """
-    /* Split into (foodbanks, programs, sponsors) without 'type'. */
+    Current resident set size of this process from /proc/self/statm (0.0 where unavailable).
     """
-    fb, prg, spn = [], [], []
-    def _classify(r):
-        if any(k in r for k in ("program_type","details_page","sign_up_link","frequency","host")):
-            return "program"
-        if any(k in r for k in ("affiliation","contribution","contribution_amt","sponsor_link","ein","media","contact")):
-            return "sponsor"
-        return "foodbank"
-    for r in rows:
-        b = r.get("__bucket__") or _classify(r)
-        (prg if b=="program" else spn if b=="sponsor" else fb).append(r)
-    return fb, prg, spn
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * resource.getpagesize() / 1048576.0
+    except (OSError, ValueError, IndexError):
+        return 0.0
 
 
+class LoadReport:
+    """
+    Accumulates per-stage wall time, rows, DB round trips and RSS growth for one loader run.
+    Stages nest per thread and time is exclusive: a stage's secs exclude the stages opened
+    inside it, so streaming stages that interleave (scrape -> resolve -> classify -> insert)
+    still add up to the run's wall time. Round trips are statements and commits issued on
+    any Engine while the stage is the innermost one on its thread, plus explicit COPYs.
+    rss_delta_mb sums current RSS at exit minus at entry over the stage's calls; it is
+    inclusive of nested stages and, RSS being per process, of concurrent threads' work.
+    The ru_maxrss lifetime peak is only reported for the whole run (process_peak_rss_mb).
+    """
 
-def _dedup_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def __init__(self):
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        return self.stages.setdefault(name, {"secs": 0.0, "calls": 0, "rows": 0, "round_trips": 0, "rss_delta_mb": 0.0})
+
+    def _enter(self, name: str) -> list:
+        frame = [name, 0.0, time.perf_counter(), _current_rss_mb()]   # [stage, nested secs, start, RSS]
+        self._local.__dict__.setdefault("stack", []).append(frame)
+        return frame
+
+    def _exit(self, frame: list, rows: int) -> None:
+        elapsed = time.perf_counter() - frame[2]
+        rss_delta = _current_rss_mb() - frame[3]
+        stack = self._local.stack
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+        with self._lock:
+            e = self._entry(frame[0])
+            e["secs"] += elapsed - frame[1]
+            e["calls"] += 1
+            e["rows"] += rows
+            e["rss_delta_mb"] += rss_delta
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: int = 0) -> Iterator[None]:
+        frame = self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit(frame, rows)
+
+    def add_rows(self, name: str, n: int) -> None:
+        with self._lock:
+            self._entry(name)["rows"] += n
+
+    def round_trip(self, n: int = 1) -> None:
+        stack = getattr(self._local, "stack", None)
+        with self._lock:
+            self._entry(stack[-1][0] if stack else "other")["round_trips"] += n
+
+    def timed(self, rows: Iterable[Any], name: str) -> Iterator[Any]:
+        """
+        Wraps an iterator so the time spent producing each item (and the item) count toward name.
+        """
+        it = iter(rows)
+        stack = self._local.__dict__.setdefault("stack", [])
+        secs, calls, n = 0.0, 0, 0
+        rss_start = _current_rss_mb()                    # sampled per iterator, not per row
+        try:
+            while True:
+                frame = [name, 0.0, time.perf_counter()]
+                stack.append(frame)
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed = time.perf_counter() - frame[2]
+                    stack.pop()
+                    if stack:
+                        stack[-1][1] += elapsed
+                    secs += elapsed - frame[1]
+                    calls += 1
+                n += 1
+                yield item
+        finally:
+            rss_delta = _current_rss_mb() - rss_start
+            with self._lock:                             # one update per iterator, not per row
+                e = self._entry(name)
+                e["secs"] += secs
+                e["calls"] += calls
+                e["rows"] += n
+                e["rss_delta_mb"] += rss_delta
+
+    def to_dict(self) -> Dict[str, Any]:
+        wall = time.perf_counter() - self.started
+        stages = {}
+        for name, e in self.stages.items():
+            stages[name] = dict(e, secs=round(e["secs"], 4), rss_delta_mb=round(e["rss_delta_mb"], 1),
+                                rows_per_sec=round(e["rows"] / e["secs"], 1) if e["rows"] and e["secs"] > 0 else None)
+        return {
+            "run_id": self.run_id,
+            "wall_secs": round(wall, 4),
+            "process_peak_rss_mb": round(_peak_rss_mb(), 1),
+            "round_trips": sum(e["round_trips"] for e in self.stages.values()),
+            "stages": stages,
+            "scrapers": {k: dict(v, rows_per_sec=round(v["rows"] / v["secs"], 1) if v["secs"] else None)
+                         for k, v in SCRAPER_STATS.items()},
+        }
+
+    def write(self, directory: Optional[str] = None) -> str:
+        """
+        Logs a one-line summary per stage and writes load-report-<run_id>.json; returns its path.
+        """
+        data = self.to_dict()
+        for name, e in sorted(data["stages"].items(), key=lambda kv: -kv[1]["secs"]):
+            logging.info("Stage %-22s %8.3fs rows=%-8d rows/s=%-10s round trips=%-6d RSS delta=%+.1f MB",
+                         name, e["secs"], e["rows"], e["rows_per_sec"] or "-", e["round_trips"], e["rss_delta_mb"])
+        path = os.path.join(directory or LOAD_REPORT_DIR, f"load-report-{self.run_id}.json")
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=2)
+        except OSError as exc:
+            logging.warning("Could not write load report %s: %s", path, exc)
+            return ""
+        logging.info("Load report written to %s (wall %.3fs, process peak RSS %.1f MB)",
+                     path, data["wall_secs"], data["process_peak_rss_mb"])
+        return path
+
+
+REPORT = LoadReport()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    REPORT.round_trip()
+
+
+@event.listens_for(Engine, "commit")
+def _count_commit(conn):
+    REPORT.round_trip()
+
+
+def _row_bucket(r: Dict[str, Any]) -> str:
     """
-    Removes exact-duplicate dicts using canonical JSON serialization.
+    Classifies one scraped row as "foodbank", "program" or "sponsor" (explicit __bucket__ wins).
     """
-    seen, out = set(), []
-    for r in rows:
-        key = json.dumps(r, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(r)
-    return out
+    b = r.get("__bucket__")
+    if b:
+        return b
+    if any(k in r for k in ("program_type","details_page","sign_up_link","frequency","host")):
+        return "program"
+    if any(k in r for k in ("affiliation","contribution","contribution_amt","sponsor_link","ein","media","contact")):
+        return "sponsor"
+    return "foodbank"
+
+
+def _row_digest(r: Dict[str, Any]) -> bytes:
+    """
+    Digest of the row's canonical JSON serialization; equal for exact-duplicate dicts.
+    """
+    key = json.dumps(r, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha1(key.encode("utf-8")).digest()
 
 
 def _first_nonempty(rec: Dict[str, Any], keys: Iterable[str]) -> Optional[str]:
     """
-    Returns the first non-empty value among the provided keys as str.
+    Returns the first non-empty value among the provided keys as str ("N/A" placeholders count as empty).
     """
     for k in keys:
         v = rec.get(k)
-        if isinstance(v, str) and v.strip():
+        if isinstance(v, str) and v.strip() and v.strip().upper() != "N/A":
             return v.strip()
         if isinstance(v, (int, float)):
             return str(v)
@@ -187,7 +718,7 @@ def make_stable_id(rec: Dict[str, Any], bucket: str) -> str:
     Returns a stable, deterministic ID when none is provided.
        Preference:
          1) Strong identifiers: id/uuid/slug/ein/program_id/sponsor_id/url
-         2) Name + location tuple hash
+         2) Name + location (program host, city, state, zip) tuple hash
          3) Canonical JSON hash of the whole record
 
     """
@@ -200,7 +731,7 @@ def make_stable_id(rec: Dict[str, Any], bucket: str) -> str:
         if rec.get(k):
             parts.append(str(rec[k]))
             break
-    for k in ("city", "state", "zipcode", "zip", "country"):
+    for k in ("host", "city", "state", "zipcode", "zip", "country"):
         if rec.get(k):
             parts.append(str(rec[k]))
     if parts:
@@ -320,91 +851,911 @@ def coerce_kwargs(rec: Dict[str, Any], bucket: str) -> Dict[str, Any]:
 
 
 
-def truncate_tables(session: Session) -> None:
+def _strip_legacy_keys(items) -> None:
     """
-    Clears target tables inside current transaction.
+    Drops the legacy 'type' and internal '__bucket__' keys; ids come from StableIds.
     """
-    session.query(FoodBank).delete()
-    session.query(Program).delete()
-    session.query(Sponsor).delete()
+    for r in items:
+        r.pop("type", None)
+        r.pop("__bucket__", None)
 
 
 def bulk_insert(session, model, items, bucket):
-    global global_foodbank_id, global_program_id, global_sponsor_id
-
-    rows = []
-    for r in items:
-        r.pop("type", None)  # remove legacy key
-
-        # Assign global ID as string if missing or invalid
-        if "id" not in r or not str(r["id"]).isdigit():
-            if model.__tablename__ == "foodbanks":
-                r["id"] = str(global_foodbank_id)
-                global_foodbank_id += 1
-            elif model.__tablename__ == "programs":
-                r["id"] = str(global_program_id)
-                global_program_id += 1
-            elif model.__tablename__ == "sponsors":
-                r["id"] = str(global_sponsor_id)
-                global_sponsor_id += 1
-
-        rows.append(model(**r))
-
+    """
+    ORM insert path (one mapped object per row); kept as the INSERT_STRATEGY=orm fallback.
+    """
+    _strip_legacy_keys(items)
+    rows = [model(**r) for r in items]
     session.bulk_save_objects(rows)
     session.commit()
     return len(rows)
 
 
-def run_once() -> int:
+# ----------------------------------------------------------------------------
+# COPY bulk load
+# ----------------------------------------------------------------------------
+
+def _load_columns(model) -> List[Any]:
+    """
+    Columns written by the loader; created_at is left to its server default.
+    """
+    return [c for c in model.__table__.columns if c.name != "created_at"]
+
+
+def _column_value(r: Dict[str, Any], col) -> Any:
+    """
+    Returns the row's value for col, falling back to the model's Python-side default (e.g. [] for languages).
+    """
+    if col.name not in r and col.default is not None:
+        return col.default.arg(None) if col.default.is_callable else col.default.arg
+    return r.get(col.name)
+
+
+def _copy_text(value: Any, is_json: bool) -> str:
+    """
+    Encodes one value for COPY ... FROM STDIN in text format (\\N = NULL).
+    """
+    if value is None:
+        return "\\N"
+    if is_json:
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    elif not isinstance(value, str):
+        value = str(value)
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class _CopyStream(io.TextIOBase):
+    """
+    File-like reader over lazily encoded COPY lines, so rows are never
+    materialized as one big buffer.
+    """
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buf = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buf) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buf += line
+        if size < 0:
+            out, self._buf = self._buf, ""
+        else:
+            out, self._buf = self._buf[:size], self._buf[size:]
+        return out
+
+    readline = read
+
+
+def copy_insert(session, model, items, bucket):
+    """
+    COPY path: streams rows straight from the normalized bucket through psycopg2's copy_expert.
+    """
+    _strip_legacy_keys(items)
+    columns = _load_columns(model)
+
+    def _lines() -> Iterator[str]:
+        for r in items:
+            yield "\t".join(_copy_text(_column_value(r, c), isinstance(c.type, JSONB)) for c in columns) + "\n"
+
+    col_sql = ", ".join(c.name for c in columns)
+    raw = session.connection().connection
+    with raw.cursor() as cur:
+        cur.copy_expert(f"COPY {model.__tablename__} ({col_sql}) FROM STDIN", _CopyStream(_lines()))
+    REPORT.round_trip()
+    session.commit()
+    return len(items)
+
+
+def executemany_insert(session, model, items, bucket):
+    """
+    Core INSERT with one parameter set per row; SQLAlchemy batches it into multi-row VALUES statements.
+    """
+    _strip_legacy_keys(items)
+    columns = _load_columns(model)
+    session.execute(model.__table__.insert(), [{c.name: _column_value(r, c) for c in columns} for r in items])
+    session.commit()
+    return len(items)
+
+
+INSERTERS = {
+    "copy": copy_insert,
+    "executemany": executemany_insert,
+    "orm": bulk_insert,
+}
+
+
+def insert_rows(session, model, items, bucket, strategy: str = "copy") -> int:
+    """
+    Inserts one bucket with the chosen strategy and logs throughput.
+    """
+    started = time.perf_counter()
+    n = INSERTERS[strategy](session, model, items, bucket)
+    elapsed = time.perf_counter() - started
+    logging.info("Inserted %d %s rows via %s in %.3fs (%.0f rows/s)",
+                 n, model.__tablename__, strategy, elapsed, n / elapsed if elapsed > 0 else 0.0)
+    return n
+
+
+# ----------------------------------------------------------------------------
+# Stable ids
+# ----------------------------------------------------------------------------
+
+class StableIds:
+    """
+    Assigns numeric string ids keyed on make_stable_id() (EIN/explicit id, else name + location)
+    and persists new assignments in id_map, so reloads hand out the same ids in any scrape order.
+    The first time a table is seen, id_map is seeded from the live table so existing ids survive.
+    """
+
+    def __init__(self, session: Session, live: str):
+        self.session = session
+        self.live = live
+        self.ids: Dict[str, Dict[str, str]] = {}
+        self.next_id: Dict[str, int] = {}
+        self.taken: Dict[str, set] = {}
+        self.used: Dict[str, set] = {}
+        self.duplicates = 0
+
+    def _table(self, bucket: str, table: str) -> Dict[str, str]:
+        if table in self.ids:
+            return self.ids[table]
+        mapping = dict(self.session.execute(
+            text(f"SELECT natural_key, id FROM {IdMap.__tablename__} WHERE table_name = :t"), {"t": table}
+        ).all())
+        if not mapping:
+            mapping = self._seed(bucket, table)
+        self.ids[table] = mapping
+        self.next_id[table] = max((int(v) for v in mapping.values() if v.isdigit()), default=0) + 1
+        self.taken[table] = set(mapping.values())
+        self.used[table] = set()
+        return mapping
+
+    def _seed(self, bucket: str, table: str) -> Dict[str, str]:
+        """
+        Maps every existing live row to its current id; rows sharing a key keep theirs reserved.
+        """
+        if self.session.execute(text("SELECT to_regclass(:t)"), {"t": f"{self.live}.{table}"}).scalar() is None:
+            return {}
+        mapping: Dict[str, str] = {}
+        for row in self.session.execute(text(f"SELECT * FROM {self.live}.{table} ORDER BY id")).mappings():
+            rec = {k: v for k, v in row.items() if k not in ("id", "created_at", "fetched_at")}
+            key = make_stable_id(rec, bucket)
+            if key in mapping:
+                key = f"{bucket}:legacy:{row['id']}"
+            mapping[key] = str(row["id"])
+        self._persist(table, mapping.items())
+        logging.info("Seeded id_map for %s with %d existing ids", table, len(mapping))
+        return mapping
+
+    def _persist(self, table: str, pairs: Iterable[Tuple[str, str]]) -> None:
+        values = [{"table_name": table, "natural_key": k, "id": v} for k, v in pairs]
+        for batch in _chunks(values, UPSERT_BATCH_SIZE):
+            self.session.execute(pg_insert(IdMap).values(batch).on_conflict_do_nothing())
+
+    def assign(self, model, items: List[Dict[str, Any]], bucket: str) -> List[Dict[str, Any]]:
+        """
+        Sets r["id"] on every row and returns them, minus rows whose natural key already
+        received a row earlier in this load (they would collide on the primary key).
+        """
+        table = model.__tablename__
+        mapping = self._table(bucket, table)
+        used = self.used[table]
+        out, new = [], []
+        for r in items:
+            key = make_stable_id({k: v for k, v in r.items() if k not in ("type", "__bucket__")}, bucket)
+            if key in used:
+                self.duplicates += 1
+                continue
+            used.add(key)
+            rid = mapping.get(key)
+            if rid is None:
+                explicit = _digits_only(r.get("id"))
+                if explicit is not None and explicit not in self.taken[table]:
+                    rid = explicit
+                else:
+                    rid = str(self.next_id[table])
+                self.next_id[table] = max(self.next_id[table], int(rid) + 1)
+                mapping[key] = rid
+                self.taken[table].add(rid)
+                new.append((key, rid))
+            r["id"] = rid
+            out.append(r)
+        if new:
+            self._persist(table, new)
+        return out
+
+
+# ----------------------------------------------------------------------------
+# Entity resolution (blocking + field-wise merge across scrapers)
+# ----------------------------------------------------------------------------
+
+# Opt-in: resolution holds one record per entity until the scrape ends, so inserts wait for it.
+ENTITY_RESOLUTION = os.getenv("ENTITY_RESOLUTION", "0") == "1"
+ER_NAME_SIMILARITY = float(os.getenv("ER_NAME_SIMILARITY", "0.9"))
+ER_MAX_BLOCK = int(os.getenv("ER_MAX_BLOCK", "50"))          # zipcode-block candidates compared per row
+
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_KEY_ALIASES = {"zip": "zipcode", "zip_code": "zipcode", "postal_code": "zipcode", "sign_up": "sign_up_link"}
+_NAME_STOPWORDS = frozenset({"the", "inc", "incorporated", "corp", "corporation", "co", "llc", "ltd", "of"})
+
+
+def _canonical_key(k: str) -> str:
+    """
+    contributionAmt -> contribution_amt, EIN -> ein, detailsPage -> details_page.
+    """
+    if k.startswith("__"):
+        return k
+    k = _CAMEL_RE.sub(r"\1_\2", k).lower()
+    return _KEY_ALIASES.get(k, k)
+
+
+def _canonical_row(r: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns r with canonical key spellings; when two spellings collide the first non-empty value wins.
+    """
+    out: Dict[str, Any] = {}
+    for k, v in r.items():
+        ck = _canonical_key(k)
+        if ck not in out or _is_empty(out[ck]):
+            out[ck] = v
+    return out
+
+
+def _is_empty(v: Any) -> bool:
+    if v is None:
+        return True
+    if isinstance(v, str):
+        return not v.strip() or v.strip().upper() == "N/A"
+    if isinstance(v, (list, dict)):
+        return not v
+    return False
+
+
+def _norm_text(v: Any) -> str:
+    """
+    Lowercase alphanumeric tokens without corporate suffixes, space-joined.
+    """
+    if _is_empty(v):
+        return ""
+    tokens = re.findall(r"[a-z0-9]+", str(v).lower())
+    return " ".join(t for t in tokens if t not in _NAME_STOPWORDS)
+
+
+def _name_signature(name: str) -> Tuple[List[str], frozenset]:
+    """
+    Numbers in the name (must agree for a fuzzy match) and its character bigrams.
+    """
+    return re.findall(r"\d+", name), frozenset(name[i:i + 2] for i in range(len(name) - 1))
+
+
+def _merge_value(old: Any, new: Any) -> Any:
+    """
+    Field-wise merge: keep the first non-empty value, union lists, fill missing dict keys.
+    """
+    if _is_empty(old):
+        return new if not _is_empty(new) else old
+    if isinstance(old, list) and isinstance(new, list):
+        return old + [x for x in new if x not in old]
+    if isinstance(old, dict) and isinstance(new, dict):
+        return {**{k: v for k, v in new.items() if not _is_empty(v)}, **{k: v for k, v in old.items() if not _is_empty(v)}} or old
+    return old
+
+
+class EntityResolver:
+    """
+    Collapses records describing the same organization (or program) across scrapers.
+    Each row is compared only with candidates sharing a blocking key:
+      - EIN                                  -> exact match (unless both carry different EINs)
+      - normalized name + city (or + host)   -> exact match
+      - zipcode + name without spaces        -> exact match ("foodbank" == "food bank")
+      - zipcode + sorted name tokens         -> exact match (reordered words)
+      - zipcode                              -> match if names are at least ER_NAME_SIMILARITY alike
+                                                and carry the same numbers
+    so work per row is bounded by ER_MAX_BLOCK and the whole pass is near-linear.
+    Matches are merged field-wise into one record; entities that turn out to be the same
+    are unioned (union-find). State grows with entities, not rows: a matched row is folded
+    into its entity and dropped, and only fuzzy candidates keep a name signature. Still, one
+    merged record per entity is held until the stream ends (hence ENTITY_RESOLUTION is opt-in).
+    """
+
+    def __init__(self):
+        self.records: List[Optional[Dict[str, Any]]] = []
+        self.parent: List[int] = []
+        self.exact: Dict[str, int] = {}
+        self.zip_blocks: Dict[str, List[int]] = {}
+        self.names: Dict[int, Tuple[str, List[str], frozenset]] = {}   # fuzzy candidates: name, numbers, bigrams
+        self.rows_in = 0
+
+    def _find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    @staticmethod
+    def _ein(r: Dict[str, Any]) -> str:
+        return re.sub(r"\D", "", str(r.get("ein") or ""))
+
+    @staticmethod
+    def _exact_keys(bucket: str, r: Dict[str, Any], ein: str, name: str, zipcode: str) -> List[str]:
+        keys = [f"{bucket}|ein|{ein}"] if ein else []
+        where = _norm_text(r.get("host")) if bucket == "program" else _norm_text(r.get("city"))
+        if name and where:
+            keys.append(f"{bucket}|nc|{name}|{where}")
+        if name and zipcode:
+            keys.append(f"{bucket}|zn|{zipcode}|{name.replace(' ', '')}")
+            keys.append(f"{bucket}|zt|{zipcode}|{' '.join(sorted(name.split()))}")
+        return keys
+
+    def _fuzzy_match(self, zip_key: str, name: str, signature: Tuple[List[str], frozenset], ein: str) -> Optional[int]:
+        """
+        First entity in the zipcode block whose name is similar enough; cheap bounds go first.
+        """
+        digits, grams = signature
+        matcher = None
+        for i in self.zip_blocks.get(zip_key, [])[-ER_MAX_BLOCK:]:
+            other, other_digits, other_grams = self.names[i]
+            if other_digits != digits:
+                continue
+            if 2 * min(len(name), len(other)) < ER_NAME_SIMILARITY * (len(name) + len(other)):
+                continue
+            # Bigram Dice coefficient is a cheap prefilter; SequenceMatcher.ratio() decides.
+            if 2 * len(grams & other_grams) < (ER_NAME_SIMILARITY - 0.2) * (len(grams) + len(other_grams)):
+                continue
+            if matcher is None:
+                matcher = difflib.SequenceMatcher(None, "", name)    # b-side index built once per row
+            matcher.set_seq1(other)
+            if matcher.ratio() >= ER_NAME_SIMILARITY:
+                root = self._find(i)
+                if self._compatible(root, ein):
+                    return root
+        return None
+
+    def _compatible(self, i: int, ein: str) -> bool:
+        other = self._ein(self.records[i])
+        return not (ein and other and ein != other)
+
+    def _union(self, a: int, b: int) -> int:
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return a
+        keep, drop = min(a, b), max(a, b)          # keep the first-seen entity's position
+        for k, v in self.records[drop].items():
+            self.records[keep][k] = _merge_value(self.records[keep].get(k), v)
+        self.records[drop] = None
+        self.parent[drop] = keep
+        return keep
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.rows_in += 1
+        r = _canonical_row(row)
+        bucket = _row_bucket(r)
+        ein = self._ein(r)
+        name = _norm_text(r.get("name"))
+        zipcode = re.sub(r"\D", "", str(r.get("zipcode") or ""))[:5]
+        zipcode = zipcode if len(zipcode) == 5 else ""
+        exact = self._exact_keys(bucket, r, ein, name, zipcode)
+
+        matches = {self._find(self.exact[k]) for k in exact if k in self.exact}
+        matches = {i for i in matches if self._compatible(i, ein)}
+
+        zip_key = f"{bucket}|{zipcode}" if zipcode else None
+        signature = _name_signature(name)
+        if zip_key and name and not matches:
+            root = self._fuzzy_match(zip_key, name, signature, ein)
+            if root is not None:
+                matches.add(root)
+
+        if matches:
+            idx = min(matches)
+            for m in matches:
+                idx = self._union(m, idx)
+            entity = self.records[idx]
+            for k, v in r.items():
+                entity[k] = _merge_value(entity.get(k), v)
+        else:
+            idx = len(self.records)
+            self.records.append(r)
+            self.parent.append(idx)
+            if zip_key and name:                         # only new entities become fuzzy candidates
+                self.zip_blocks.setdefault(zip_key, []).append(idx)
+                self.names[idx] = (name, *signature)
+        for k in exact:
+            self.exact.setdefault(k, idx)
+
+    def resolve(self, rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Consumes rows, then yields one merged record per entity in first-seen order.
+        """
+        for row in rows:
+            self.add(row)
+        out = [r for r in self.records if r is not None]
+        logging.info("Entity resolution: %d rows -> %d entities", self.rows_in, len(out))
+        self.records, self.parent, self.exact, self.zip_blocks, self.names = [], [], {}, {}, {}
+        yield from out
+
+
+# ----------------------------------------------------------------------------
+# Streaming pipeline (classify -> dedup -> fixed-size batches)
+# ----------------------------------------------------------------------------
+
+LOAD_BATCH_SIZE = int(os.getenv("LOAD_BATCH_SIZE", "1000"))
+BUCKET_MODELS = {"foodbank": FoodBank, "program": Program, "sponsor": Sponsor}
+
+
+class BatchPipeline:
+    """
+    Consumes scraped rows as they arrive: classifies each into its bucket, drops exact
+    duplicates, assigns stable ids (when ids is given) and hands full batches to flush(model, rows, bucket).
+    Memory is bounded by one partial batch per bucket plus a 20-byte digest per distinct row.
+    """
+
+    def __init__(self, flush: Callable[[Any, List[Dict[str, Any]], str], Any], batch_size: int = LOAD_BATCH_SIZE,
+                 ids: Optional[StableIds] = None):
+        self.flush = flush
+        self.ids = ids
+        self.batch_size = max(1, batch_size)
+        self.pending: Dict[str, List[Dict[str, Any]]] = {b: [] for b in BUCKET_MODELS}
+        self.counts: Dict[str, int] = dict.fromkeys(BUCKET_MODELS, 0)
+        self.duplicates = 0
+        self._seen: set = set()
+
+    def add(self, row: Dict[str, Any]) -> None:
+        row = _canonical_row(row)
+        key = _row_digest(row)
+        if key in self._seen:
+            self.duplicates += 1
+            return
+        self._seen.add(key)
+        bucket = _row_bucket(row)
+        if bucket not in BUCKET_MODELS:
+            bucket = "foodbank"
+        self.pending[bucket].append(row)
+        if len(self.pending[bucket]) >= self.batch_size:
+            self._flush(bucket)
+
+    def _flush(self, bucket: str) -> None:
+        batch, self.pending[bucket] = self.pending[bucket], []
+        if batch and self.ids is not None:
+            with REPORT.stage("stable_ids", rows=len(batch)):
+                batch = self.ids.assign(BUCKET_MODELS[bucket], batch, bucket)
+        if batch:
+            self.counts[bucket] += len(batch)
+            with REPORT.stage("dispatch", rows=len(batch)):
+                self.flush(BUCKET_MODELS[bucket], batch, bucket)
+
+    def close(self) -> None:
+        for bucket in BUCKET_MODELS:
+            self._flush(bucket)
+
+    def feed(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Drains rows through the pipeline, flushes the remainders and returns per-bucket counts.
+        """
+        with REPORT.stage("classify_dedup"):
+            n = 0
+            for row in rows:
+                self.add(row)
+                n += 1
+            self.close()
+        REPORT.add_rows("classify_dedup", n)
+        duplicates = self.duplicates + (self.ids.duplicates if self.ids is not None else 0)
+        logging.info("Buckets: foodbanks=%d programs=%d sponsors=%d (duplicates dropped: %d)",
+                     self.counts["foodbank"], self.counts["program"], self.counts["sponsor"], duplicates)
+        return self.counts
+
+
+# ----------------------------------------------------------------------------
+# Incremental upsert load
+# ----------------------------------------------------------------------------
+
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "500"))
+
+
+def content_hash(model, r: Dict[str, Any]) -> str:
+    """
+    SHA-256 over the canonical JSON of the row's loader columns (defaults applied).
+    """
+    values = {c.name: _column_value(r, c) for c in _load_columns(model)}
+    canon = json.dumps(values, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def _chunks(seq: List[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Yields consecutive slices of seq with at most size items.
+    """
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def reset_row_hashes(session: Session) -> None:
+    """
+    Forgets stored hashes; full loads call this so the next incremental run re-verifies every row.
+    """
+    session.query(RowHash).delete()
+
+
+class IncrementalUpsert:
+    """
+    Brings one table in line with the rows fed to it batch by batch, without truncating it:
+      - rows whose content hash differs from the stored one (or is unknown) go through INSERT ... ON CONFLICT DO UPDATE
+      - rows with a matching hash are left untouched
+      - on finish(), rows present in the table but never fed are deleted
+    Only the table's (id, hash) pairs and the ids seen so far are kept in memory.
+    """
+
+    def __init__(self, session: Session, model):
+        self.session = session
+        self.model = model
+        self.table = model.__tablename__
+        self.columns = _load_columns(model)
+        self.existing: Dict[str, Optional[str]] = dict(session.execute(text(
+            f"SELECT t.id, h.content_hash FROM {self.table} AS t "
+            f"LEFT JOIN {RowHash.__tablename__} AS h ON h.table_name = :table AND h.id = t.id"
+        ), {"table": self.table}).all())
+        self.seen: set = set()
+        self.counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+
+    def add(self, items: List[Dict[str, Any]]) -> None:
+        _strip_legacy_keys(items)
+        latest: Dict[str, Tuple[Dict[str, Any], str]] = {}
+        for r in items:
+            latest[str(r["id"])] = (r, content_hash(self.model, r))   # last duplicate id wins
+
+        changed = []
+        for rid, (r, h) in latest.items():
+            first = rid not in self.seen
+            self.seen.add(rid)
+            if self.existing.get(rid) == h:
+                self.counts["unchanged"] += first
+                continue
+            if first:
+                self.counts["updated" if rid in self.existing else "added"] += 1
+            self.existing[rid] = h
+            changed.append((rid, r, h))
+
+        for batch in _chunks(changed, UPSERT_BATCH_SIZE):
+            stmt = pg_insert(self.model).values([{c.name: _column_value(r, c) for c in self.columns} for _, r, _ in batch])
+            self.session.execute(stmt.on_conflict_do_update(
+                index_elements=[self.model.id],
+                set_={c.name: stmt.excluded[c.name] for c in self.columns if c.name != "id"},
+            ))
+            hstmt = pg_insert(RowHash).values([{"table_name": self.table, "id": rid, "content_hash": h} for rid, _, h in batch])
+            self.session.execute(hstmt.on_conflict_do_update(
+                index_elements=[RowHash.table_name, RowHash.id],
+                set_={"content_hash": hstmt.excluded.content_hash},
+            ))
+
+    def finish(self) -> Dict[str, int]:
+        removed = [rid for rid in self.existing if rid not in self.seen]
+        self.counts["removed"] = len(removed)
+        for batch in _chunks(removed, UPSERT_BATCH_SIZE):
+            self.session.query(self.model).filter(self.model.id.in_(batch)).delete(synchronize_session=False)
+            self.session.query(RowHash).filter(RowHash.table_name == self.table, RowHash.id.in_(batch)).delete(synchronize_session=False)
+
+        logging.info("Incremental %s: added=%d updated=%d unchanged=%d removed=%d", self.table,
+                     self.counts["added"], self.counts["updated"], self.counts["unchanged"], self.counts["removed"])
+        return self.counts
+
+
+# ----------------------------------------------------------------------------
+# Blue/green full load (build in a staging schema, swap in one transaction)
+# ----------------------------------------------------------------------------
+
+RESOURCE_MODELS = (FoodBank, Program, Sponsor)
+SWAP_LOCK_TIMEOUT = os.getenv("SWAP_LOCK_TIMEOUT", "5s")
+SWAP_ATTEMPTS = int(os.getenv("SWAP_ATTEMPTS", "3"))
+
+
+def staging_schema_name(live: str) -> str:
+    """
+    Schema the next full load is built in (STAGING_SCHEMA, default <live>_staging).
+    """
+    return os.getenv("STAGING_SCHEMA") or f"{live}_staging"
+
+
+LOAD_QUEUE_BATCHES = int(os.getenv("LOAD_QUEUE_BATCHES", "4"))
+
+
+class TableWriter(threading.Thread):
+    """
+    Loads one staging table on its own pooled connection: the batches handed to put(), an
+    optional seed from live, then the table's list indexes and ANALYZE. A failure in any
+    writer sets the shared abort event; the others stop writing and drain their queues.
+    """
+
+    def __init__(self, engine, model, bucket: str, strategy: str, live: str, staging: str,
+                 keep_existing: bool, abort: threading.Event):
+        super().__init__(name=f"load-{model.__tablename__}", daemon=True)
+        self.engine = engine
+        self.model = model
+        self.bucket = bucket
+        self.strategy = strategy
+        self.live = live
+        self.staging = staging
+        self.keep_existing = keep_existing
+        self.abort = abort
+        self.batches: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=LOAD_QUEUE_BATCHES)
+        self.error: Optional[BaseException] = None
+        self.rows = 0
+        self.insert_secs = 0.0
+        self.index_secs = 0.0
+        self.wall_secs = 0.0
+
+    def put(self, batch: List[Dict[str, Any]]) -> None:
+        if self.abort.is_set():
+            raise RuntimeError("load aborted by a failed table writer")
+        self.batches.put(batch)
+
+    def _seed_from_live(self, s: Session) -> None:
+        """
+        Copies the live rows whose ids this load did not bring back. Runs after the new
+        batches, so a re-scraped entity (same id via id_map) keeps its fresh row.
+        """
+        table = self.model.__tablename__
+        if s.execute(text("SELECT to_regclass(:t)"), {"t": f"{self.live}.{table}"}).scalar() is None:
+            return
+        cols = ", ".join(c.name for c in self.model.__table__.columns)
+        s.execute(text(f"INSERT INTO {self.staging}.{table} ({cols}) SELECT {cols} FROM {self.live}.{table} "
+                       f"ON CONFLICT (id) DO NOTHING"))
+        s.commit()
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        table = self.model.__tablename__
+        drained = False
+        with get_session(self.engine) as s:
+            try:
+                while True:
+                    batch = self.batches.get()
+                    if batch is None:
+                        drained = True
+                        break
+                    if self.abort.is_set():
+                        continue
+                    t0 = time.perf_counter()
+                    with REPORT.stage(f"insert.{table}", rows=len(batch)):
+                        self.rows += insert_rows(s, self.model, batch, self.bucket, self.strategy)
+                    self.insert_secs += time.perf_counter() - t0
+                if self.abort.is_set():
+                    return
+                if self.keep_existing:
+                    with REPORT.stage(f"seed.{table}"):
+                        self._seed_from_live(s)
+                t0 = time.perf_counter()
+                with REPORT.stage(f"index.{table}"):
+                    ensure_list_indexes(s, [table])
+                    s.execute(text(f"ANALYZE {self.staging}.{table}"))
+                    s.commit()
+                self.index_secs = time.perf_counter() - t0
+            except BaseException as exc:
+                s.rollback()
+                self.error = exc
+                self.abort.set()
+                while not drained:                       # keep the producer unblocked
+                    drained = self.batches.get() is None
+            finally:
+                self.wall_secs = time.perf_counter() - started
+
+    def close(self) -> None:
+        self.batches.put(None)
+        self.join()
+
+
+def build_staging(engine, live: str, staging: str, rows: Iterable[Dict[str, Any]],
+                  strategy: str, keep_existing: bool) -> Tuple[Dict[str, int], Tuple[str, Dict[str, int]]]:
+    """
+    Recreates the staging schema and streams rows into fresh resource tables in LOAD_BATCH_SIZE
+    batches, one TableWriter (and connection) per table, so the tables load, index and ANALYZE
+    concurrently. The derived views are built once every writer has finished.
+    engine's search_path must be "<staging>,<live>" so unqualified names resolve to staging
+    while sequences still come from live.
+    With keep_existing (TRUNCATE=0) the live rows the load did not replace are copied in after the new ones.
+    Nothing is swapped in unless every table loaded; returns the counts and staged checksum.
+    """
+    with REPORT.stage("setup"), engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {staging} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {staging}"))
+        Base.metadata.create_all(conn, tables=[m.__table__ for m in RESOURCE_MODELS], checkfirst=False)
+
+    abort = threading.Event()
+    writers = {bucket: TableWriter(engine, model, bucket, strategy, live, staging, keep_existing, abort)
+               for bucket, model in BUCKET_MODELS.items()}
+    started = time.perf_counter()
+    with get_session(engine) as s:
+        try:
+            for w in writers.values():
+                w.start()
+            try:
+                pipeline = BatchPipeline(lambda model, batch, bucket: writers[bucket].put(batch),
+                                         ids=StableIds(s, live))
+                counts = pipeline.feed(rows)
+            except BaseException:
+                abort.set()
+                raise
+            finally:
+                for w in writers.values():
+                    w.close()
+            failed = [w for w in writers.values() if w.error is not None]
+            if failed:
+                raise RuntimeError(f"loading {failed[0].model.__tablename__} failed") from failed[0].error
+
+            for w in writers.values():
+                logging.info("Loaded %s: %d rows, insert %.3fs, indexes+analyze %.3fs, wall %.3fs",
+                             w.model.__tablename__, w.rows, w.insert_secs, w.index_secs, w.wall_secs)
+            logging.info("Parallel table load finished in %.3fs (serial insert+index time would be %.3fs)",
+                         time.perf_counter() - started,
+                         sum(w.insert_secs + w.index_secs for w in writers.values()))
+
+            with REPORT.stage("views"):
+                refresh_derived_views(s)
+                for name in DERIVED_VIEWS:
+                    s.execute(text(f"ANALYZE {staging}.{name}"))
+            with REPORT.stage("commit"):
+                checksum = dataset_checksum(s)
+                s.commit()
+            return counts, checksum
+        except Exception:
+            s.rollback()
+            raise
+
+
+def swap_in_staging(session: Session, live: str, staging: str) -> None:
+    """
+    Replaces the live resource tables and derived views with the staged ones. Only catalog
+    changes happen here, so the transaction holds its ACCESS EXCLUSIVE locks for milliseconds
+    and readers see either the old load or the new one. lock_timeout keeps a long-running
+    reader from making new readers queue up behind the swap.
+    """
+    session.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+    for name in DERIVED_VIEWS:
+        session.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {live}.{name}"))
+    for model in RESOURCE_MODELS:
+        table = model.__tablename__
+        # Sequences owned by the old table would otherwise be dropped with it.
+        session.execute(text(f"ALTER SEQUENCE IF EXISTS {live}.{table}_id_seq OWNED BY NONE"))
+        session.execute(text(f"DROP TABLE IF EXISTS {live}.{table}"))
+        session.execute(text(f"ALTER TABLE {staging}.{table} SET SCHEMA {live}"))
+    for name in DERIVED_VIEWS:
+        session.execute(text(f"ALTER MATERIALIZED VIEW {staging}.{name} SET SCHEMA {live}"))
+
+
+def blue_green_load(engine, live: str, rows: Iterable[Dict[str, Any]],
+                    strategy: str, keep_existing: bool) -> Dict[str, int]:
+    """
+    Full load that never exposes empty or partial tables: build in staging, then swap
+    and stamp the dataset version in one short transaction (retried on lock timeouts).
+    """
+    staging = staging_schema_name(live)
+    staging_engine = get_engine(search_path=f"{staging},{live}")
+    try:
+        counts, checksum = build_staging(staging_engine, live, staging, rows, strategy, keep_existing)
+    finally:
+        staging_engine.dispose()
+
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        with get_session(engine) as s:
+            try:
+                started = time.perf_counter()
+                with REPORT.stage("swap"):
+                    swap_in_staging(s, live, staging)
+                    reset_row_hashes(s)
+                    stamp_dataset_version(s, checksum)
+                    s.commit()
+                logging.info("Swapped %s into %s in %.3fs", staging, live, time.perf_counter() - started)
+                break
+            except OperationalError as exc:
+                s.rollback()
+                if attempt == SWAP_ATTEMPTS:
+                    raise
+                logging.warning("Swap attempt %d/%d failed (%s); retrying.", attempt, SWAP_ATTEMPTS, exc.orig)
+                time.sleep(attempt)
+
+    with REPORT.stage("cleanup"), engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {staging} CASCADE"))
+    return counts
+
+
+def run_once(from_checkpoint: Optional[str] = None, resume: Optional[bool] = None) -> int:
     """
      Runs scrapers or dummy data, optionally simulates (no DB writes), else writes atomically and exits. 
+     from_checkpoint replays saved scrape checkpoints instead of scraping (env LOAD_FROM_CHECKPOINT);
+     resume only re-runs scrapers without a complete checkpoint (env SCRAPE_RESUME=1).
     """
     logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
     simulate = os.getenv("SIMULATE_SUCCESS") == "1"
     dry_run = simulate or (os.getenv("DRY_RUN") == "1")
     do_truncate = os.getenv("TRUNCATE", "1") == "1"
+    load_mode = os.getenv("LOAD_MODE", "full").lower()
+    if load_mode not in ("full", "incremental"):
+        logging.error("Unknown LOAD_MODE %r; expected full or incremental", load_mode)
+        return 1
+    insert_strategy = os.getenv("INSERT_STRATEGY", "copy").lower()
+    if insert_strategy not in INSERTERS:
+        logging.error("Unknown INSERT_STRATEGY %r; expected one of %s", insert_strategy, ", ".join(INSERTERS))
+        return 1
+
+    if from_checkpoint is None:
+        from_checkpoint = os.getenv("LOAD_FROM_CHECKPOINT") or None
+    if resume is None:
+        resume = os.getenv("SCRAPE_RESUME") == "1"
 
+    global REPORT
+    REPORT = LoadReport()
     if os.getenv("SIMULATE_DUMMY") == "1":
         logging.info("Simulation mode: using preset dummy data (skipping scrapers).")
-        payload = [
+        rows: Iterable[Dict[str, Any]] = [
             {"name": "Austin Food Bank", "city": "Austin", "state": "TX"},
             {"name": "Community Outreach Program"},
             {"name": "Local Business Co."},
         ]
+    elif from_checkpoint:
+        logging.info("Replaying scrape checkpoints from %s (skipping scrapers).", from_checkpoint)
+        rows = replay_checkpoints(from_checkpoint)
     else:
-        logging.info("Starting scrape...")
-        payload = run_all_scrapers()
+        logging.info("Starting scrape%s...", " (resuming from checkpoints)" if resume else "")
+        rows = scrape_stream(resume=resume)
+    rows = REPORT.timed(rows, "scrape")
+    if ENTITY_RESOLUTION:
+        rows = REPORT.timed(EntityResolver().resolve(rows), "resolve")
 
-    if isinstance(payload, list):
-        rows, errors_count = payload, 0
-    elif isinstance(payload, dict):
-        rows, errors_count = payload.get("results", []) or [], len(payload.get("errors", []) or [])
-    else:
-        logging.warning("Unexpected scraper return type: %s; treating as empty list.", type(payload).__name__)
-        rows, errors_count = [], 0
-    if errors_count:
-        logging.warning("Scraper errors detected: %d", errors_count)
+    try:
+        return _load(rows, dry_run, load_mode, insert_strategy, do_truncate)
+    finally:
+        REPORT.write()
 
-    fb, prg, spn = normalize_buckets(rows)
-    fb, prg, spn = _dedup_rows(fb), _dedup_rows(prg), _dedup_rows(spn)
-    logging.info("Buckets: foodbanks=%d programs=%d sponsors=%d", len(fb), len(prg), len(spn))
 
+def _load(rows: Iterable[Dict[str, Any]], dry_run: bool, load_mode: str, insert_strategy: str, do_truncate: bool) -> int:
+    """
+    Feeds rows into the configured load (or a no-op pipeline on dry runs); returns the exit code.
+    """
     if dry_run:
+        BatchPipeline(lambda model, batch, bucket: None).feed(rows)
         logging.info("Simulation/Dry run enabled; no database writes performed.")
         return 0
 
     try:
         engine = get_engine()
-        Base.metadata.create_all(engine)
+        live = os.getenv("DB_SCHEMA", "public")
+        if load_mode == "full":
+            with REPORT.stage("setup"):
+                Base.metadata.create_all(engine, tables=[DatasetVersion.__table__, RowHash.__table__, IdMap.__table__])
+            counts = blue_green_load(engine, live, rows,
+                                     insert_strategy, keep_existing=not do_truncate)
+            logging.info("Load complete. Inserted: fb=%d prg=%d spn=%d",
+                         counts["foodbank"], counts["program"], counts["sponsor"])
+            return 0
+
+        with REPORT.stage("setup"):
+            Base.metadata.create_all(engine)
         with get_session(engine) as s:
             try:
-                if do_truncate:
-                    truncate_tables(s)
-                n1 = bulk_insert(s, FoodBank, fb, "foodbank")
-                n2 = bulk_insert(s, Program, prg, "program")
-                n3 = bulk_insert(s, Sponsor, spn, "sponsor")
-                s.commit()
-                logging.info("Load complete. Inserted: fb=%d prg=%d spn=%d", n1, n2, n3)
+                with REPORT.stage("setup"):
+                    ensure_list_indexes(s)
+                upserts = {bucket: IncrementalUpsert(s, model) for bucket, model in BUCKET_MODELS.items()}
+
+                def upsert(model, batch, bucket):
+                    with REPORT.stage(f"upsert.{model.__tablename__}", rows=len(batch)):
+                        upserts[bucket].add(batch)
+
+                counts = BatchPipeline(upsert, ids=StableIds(s, live)).feed(rows)
+                for bucket, up in upserts.items():
+                    with REPORT.stage(f"upsert.{BUCKET_MODELS[bucket].__tablename__}"):
+                        up.finish()
+                with REPORT.stage("views"):
+                    refresh_derived_views(s)
+                with REPORT.stage("commit"):
+                    stamp_dataset_version(s)
+                    s.commit()
+                logging.info("Load complete. Upserted: fb=%d prg=%d spn=%d",
+                             counts["foodbank"], counts["program"], counts["sponsor"])
                 return 0
             except Exception:
                 s.rollback()
@@ -414,6 +1765,11 @@ def run_once() -> int:
         return 1
 
 
-
 if __name__ == "__main__":
-    sys.exit(run_once())
+    parser = argparse.ArgumentParser(description="Scrape and load food bank data.")
+    parser.add_argument("--from-checkpoint", nargs="?", const=str(CHECKPOINT_DIR),
+                        metavar="DIR", help="replay saved scrape checkpoints instead of running scrapers")
+    parser.add_argument("--resume", action="store_true", default=None,
+                        help="reuse complete checkpoints and only re-run scrapers that did not finish")
+    args = parser.parse_args()
+    sys.exit(run_once(from_checkpoint=args.from_checkpoint, resume=args.resume))
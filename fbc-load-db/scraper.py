@@ -8,18 +8,23 @@
 from __future__ import annotations
 
 import os
+import gzip
+import json
 import time
 import sys
+import tempfile
 import logging
 import pathlib
 import traceback
 import importlib.util
-from typing import List, Dict, Any, Callable, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from typing import List, Dict, Any, Callable, Optional, Iterator
+from collections import deque
 import threading
 import asyncio
 import inspect
 import queue
+import concurrent.futures
 
 # ----------------------------------------------------------------------------
 # Logging
@@ -43,15 +48,52 @@ MAX_WORKERS = int(os.environ.get("SCRAPER_MAX_WORKERS", DEFAULT_WORKERS))
 
 # Per-task timeout (seconds)
 SCRAPER_TIMEOUT_SECS = float(os.environ.get("SCRAPER_TIMEOUT_SECS", "1000"))
+# After a timeout, how long a cancelled scraper may take to wind down and hand over its
+# partial rows before it is abandoned.
+SCRAPER_CANCEL_GRACE_SECS = float(os.environ.get("SCRAPER_CANCEL_GRACE_SECS", "5"))
+
+# Rows buffered between scraper threads and the consumer; producers block when it is full,
+# so memory stays bounded no matter how many rows the scrapers produce.
+STREAM_QUEUE_SIZE = int(os.environ.get("SCRAPER_QUEUE_SIZE", "1000"))
+
+# Each scraper's rows are teed into <CHECKPOINT_DIR>/<scraper>.jsonl.gz (written as .partial,
+# renamed when the scraper finishes cleanly) so a failed load can be replayed or resumed.
+CHECKPOINT_DIR = pathlib.Path(os.environ.get(
+    "SCRAPE_CHECKPOINT_DIR", str(pathlib.Path(tempfile.gettempdir()) / "fbc-scrape-checkpoints")
+))
+CHECKPOINTS_ENABLED = os.environ.get("SCRAPE_CHECKPOINTS", "1") == "1"
+
+# "thread" runs scrapers in this process; "process" gives each its own worker process, for
+# GIL-bound (parsing-heavy) scrapers. A scrapers.txt line can override it: "Foo.py process".
+SCRAPER_EXECUTOR = os.environ.get("SCRAPER_EXECUTOR", "thread").lower()
+EXECUTORS = ("thread", "process")
+# Rows per pickled batch sent back from a worker process, and batches buffered in between.
+PROCESS_BATCH_ROWS = int(os.environ.get("SCRAPER_PROCESS_BATCH", "500"))
+PROCESS_QUEUE_BATCHES = int(os.environ.get("SCRAPER_PROCESS_QUEUE", "8"))
+PROCESS_FLUSH_SECS = float(os.environ.get("SCRAPER_PROCESS_FLUSH_SECS", "0.5"))   # slow scrapers still stream
+# forkserver avoids forking a parent that already runs scraper/loader threads.
+MP_START_METHOD = os.environ.get(
+    "SCRAPER_MP_START", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Shared HTTP client handed to async scrapers whose scrape() accepts a `session` argument.
+HTTP_LIMIT = int(os.environ.get("SCRAPER_HTTP_LIMIT", "96"))             # concurrent connections, all hosts
+HTTP_PER_HOST_LIMIT = int(os.environ.get("SCRAPER_HTTP_PER_HOST", "24"))  # concurrent connections per host
+HTTP_TIMEOUT_SECS = float(os.environ.get("SCRAPER_HTTP_TIMEOUT_SECS", "12"))
+DNS_CACHE_SECS = int(os.environ.get("SCRAPER_DNS_CACHE_SECS", "300"))
+
+# Per-scraper outcome of the latest scrape_stream() run: {name: {"rows", "secs", "status"}}.
+SCRAPER_STATS: Dict[str, Dict[str, Any]] = {}
 
 # ----------------------------------------------------------------------------
 # Helpers
 # ----------------------------------------------------------------------------
-def _read_list_file(path: pathlib.Path) -> List[pathlib.Path]:
+def _read_list_file(path: pathlib.Path) -> List[tuple[pathlib.Path, str]]:
     """
-    Read `scrapers.txt` and return absolute paths of valid `.py` scraper files.
+    Read `scrapers.txt` and return (absolute path, executor) for valid `.py` scraper files.
     - Ignores blank lines and comment lines starting with '#'
     - Supports absolute or relative paths (relative to SCRAPERS_DIR)
+    - An optional second token ("thread" or "process") overrides SCRAPER_EXECUTOR
     - Logs warnings for invalid lines
     """
     if not path.exists():
@@ -60,18 +102,23 @@ def _read_list_file(path: pathlib.Path) -> List[pathlib.Path]:
         log.warning(msg)
         return []
 
-    out: List[pathlib.Path] = []
+    out: List[tuple[pathlib.Path, str]] = []
     for i, raw in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
         line = raw.strip()
         if not line or line.startswith("#"):
             continue
+        line, _, executor = line.partition(" ")
+        executor = executor.strip().lower() or SCRAPER_EXECUTOR
+        if executor not in EXECUTORS:
+            print(f"[scraper] Line {i}: unknown executor '{executor}', using thread", file=sys.stderr)
+            executor = "thread"
 
         fpath = (SCRAPERS_DIR / line).resolve() if not pathlib.Path(line).is_absolute() else pathlib.Path(line)
         if not (fpath.exists() and fpath.suffix == ".py"):
             print(f"[scraper] Line {i}: '{line}' is not a valid .py in {SCRAPERS_DIR} (skipping)", file=sys.stderr)
             log.error("Line %d invalid: %s", i, fpath)
             continue
-        out.append(fpath)
+        out.append((fpath, executor))
     return out
 
 
@@ -80,6 +127,9 @@ def _load_module(pyfile: pathlib.Path):
     Dynamically import a Python file as a module with a unique name.
     This prevents namespace collisions when loading multiple scrapers.
     """
+    # Scrapers can import helper modules that sit next to them (e.g. http_cache).
+    if str(pyfile.parent) not in sys.path:
+        sys.path.append(str(pyfile.parent))
     mod_name = f"scraper_file_{pyfile.stem}_{abs(hash(str(pyfile)))}"
     spec = importlib.util.spec_from_file_location(mod_name, str(pyfile))
     if not spec or not spec.loader:
@@ -89,122 +139,547 @@ def _load_module(pyfile: pathlib.Path):
     return mod
 
 
-def _call_with_timeout(fn: Callable[[], Any], timeout_s: float) -> Any:
+def _iter_async(agen) -> Iterator[Any]:
+    """
+    Drive an async generator from synchronous code on a private event loop.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
+
+class ScrapeCancelled(Exception):
+    """
+    A scraper may raise this once its cancellation token is set; rows it already produced are kept.
+    """
+
+
+def _scrape_kwargs(fn: Callable[..., Any], cancelled: Optional[threading.Event]) -> Dict[str, Any]:
     """
-    Run a callable in a helper thread with a timeout.
-    Returns the callable's result or raises TimeoutError if it doesn't finish.
+    Scrapers opt into the cancellation token by accepting a `cancelled` argument
+    (a threading.Event set when their time budget runs out).
     """
-    q: "queue.Queue[tuple[bool, Any]]" = queue.Queue(maxsize=1)
+    if cancelled is not None and "cancelled" in inspect.signature(fn).parameters:
+        return {"cancelled": cancelled}
+    return {}
 
-    def runner() -> None:
+
+def _iter_rows(fn: Callable[..., Any], cancelled: Optional[threading.Event] = None) -> Iterator[Any]:
+    """
+    Call a scraper's scrape() and iterate whatever it produces:
+    a list, a (sync) generator/iterable, an async generator, or a coroutine returning a list.
+    """
+    result = fn(**_scrape_kwargs(fn, cancelled))
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    if result is None:
+        return
+    if inspect.isasyncgen(result):
+        yield from _iter_async(result)
+        return
+    if isinstance(result, (dict, str, bytes)) or not hasattr(result, "__iter__"):
+        raise TypeError(f"scrape() returned {type(result).__name__}, expected a list or generator of dicts")
+    yield from result
+
+# ----------------------------------------------------------------------------
+# Shared event loop for async scrapers
+# ----------------------------------------------------------------------------
+class _Cancelled(Exception):
+    """Raised in a producer thread when its scraper was cancelled while awaiting the shared loop."""
+
+
+class _AsyncHost:
+    """
+    One event loop on a daemon thread that runs every async scraper concurrently, plus the
+    pooled aiohttp ClientSession (global/per-host connection limits, shared DNS cache) they
+    are handed. Producer threads submit work with call()/anext() and block on the result.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="scraper-event-loop", daemon=True)
+        self.thread.start()
+        self._session = None
+
+    async def _shared_session(self):
+        if self._session is None:
+            import aiohttp                           # only needed once an async scraper runs
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECS),
+                connector=aiohttp.TCPConnector(limit=HTTP_LIMIT, limit_per_host=HTTP_PER_HOST_LIMIT,
+                                               ttl_dns_cache=DNS_CACHE_SECS),
+            )
+        return self._session
+
+    async def _call(self, fn: Callable[..., Any], cancelled: threading.Event) -> Any:
+        kwargs = _scrape_kwargs(fn, cancelled)
+        if "session" in inspect.signature(fn).parameters:
+            kwargs["session"] = await self._shared_session()
+        result = fn(**kwargs)
+        return await result if inspect.isawaitable(result) else result
+
+    @staticmethod
+    async def _anext(agen) -> tuple[bool, Any]:
         try:
-            q.put((True, fn()))
-        except BaseException as e:
-            q.put((False, e))
+            return False, await agen.__anext__()
+        except StopAsyncIteration:
+            return True, None
+
+    def wait(self, coro, cancelled: threading.Event) -> Any:
+        """
+        Run coro on the loop and return its result. Once cancelled is set the task gets a
+        CancelledError; if it answers by returning (e.g. the rows collected so far) within
+        SCRAPER_CANCEL_GRACE_SECS that result is still returned, otherwise _Cancelled is raised.
+        """
+        task: "concurrent.futures.Future[asyncio.Task]" = concurrent.futures.Future()
 
-    t = threading.Thread(target=runner, daemon=True)
-    t.start()
+        async def _run() -> Any:
+            task.set_result(asyncio.current_task())
+            return await coro
+
+        fut = asyncio.run_coroutine_threadsafe(_run(), self.loop)
+        deadline = None
+        while True:
+            try:
+                return fut.result(timeout=0.5)
+            except concurrent.futures.TimeoutError:
+                if not cancelled.is_set():
+                    continue
+                if deadline is None and task.done():
+                    deadline = time.monotonic() + SCRAPER_CANCEL_GRACE_SECS
+                    self.loop.call_soon_threadsafe(task.result().cancel)
+                elif deadline is None or time.monotonic() > deadline:
+                    fut.cancel()
+                    raise _Cancelled()
+            except concurrent.futures.CancelledError:
+                raise _Cancelled()                   # cancelled without a result, or the loop shut down
+
+    def iter_rows(self, fn: Callable[..., Any], cancelled: threading.Event) -> Iterator[Any]:
+        """
+        Like _iter_rows(), but the scraper runs on the shared loop instead of a private one.
+        """
+        try:
+            result = self.wait(self._call(fn, cancelled), cancelled)
+            if inspect.isasyncgen(result):
+                try:
+                    while True:
+                        done, item = self.wait(self._anext(result), cancelled)
+                        if done:
+                            return
+                        yield item
+                finally:
+                    if not self.loop.is_closed():
+                        asyncio.run_coroutine_threadsafe(result.aclose(), self.loop)
+            elif result is not None:
+                if isinstance(result, (dict, str, bytes)) or not hasattr(result, "__iter__"):
+                    raise TypeError(f"scrape() returned {type(result).__name__}, expected a list or generator of dicts")
+                yield from result
+        except _Cancelled:
+            return
+
+    def close(self) -> None:
+        async def _shutdown() -> None:
+            if self._session is not None:
+                await self._session.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), self.loop).result(timeout=10)
+        except Exception as e:
+            print(f"[scraper] WARN   shutting down the async scraper loop: {e}", file=sys.stderr)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        if not self.thread.is_alive():
+            self.loop.close()
+
+
+_async_host: Optional[_AsyncHost] = None
+_async_host_lock = threading.Lock()
+
+
+def _shared_loop() -> _AsyncHost:
+    """
+    The running _AsyncHost, started on first use.
+    """
+    global _async_host
+    with _async_host_lock:
+        if _async_host is None:
+            _async_host = _AsyncHost()
+        return _async_host
+
+
+def _close_shared_loop() -> None:
+    global _async_host
+    with _async_host_lock:
+        host, _async_host = _async_host, None
+    if host is not None:
+        host.close()
+
+# ----------------------------------------------------------------------------
+# Checkpoints
+# ----------------------------------------------------------------------------
+def checkpoint_path(pyfile: pathlib.Path, directory: Optional[pathlib.Path] = None, partial: bool = False) -> pathlib.Path:
+    """
+    Checkpoint file for a scraper: complete (<stem>.jsonl.gz) or in progress (<stem>.jsonl.gz.partial).
+    """
+    path = (directory or CHECKPOINT_DIR) / f"{pyfile.stem}.jsonl.gz"
+    return path.with_name(path.name + ".partial") if partial else path
+
+
+def _read_checkpoint(path: pathlib.Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield rows from a gzip JSONL checkpoint; a truncated tail (crash mid-write) ends the file quietly.
+    """
     try:
-        ok, val = q.get(timeout=timeout_s)
-    except queue.Empty:
-        raise TimeoutError(f"no progress within {timeout_s:.1f}s")
-    if ok:
-        return val
-    raise val  # re-raise exception from worker
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    except (EOFError, OSError, json.JSONDecodeError) as e:
+        print(f"[scraper] WARN   checkpoint {path.name} ends early: {e}", file=sys.stderr)
+
+
+def replay_checkpoints(directory: Optional[pathlib.Path] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every row stored under directory: complete checkpoints, then partial ones
+    (scrapers that failed or timed out) for scrapers without a complete file.
+    """
+    directory = pathlib.Path(directory or CHECKPOINT_DIR)
+    complete = sorted(directory.glob("*.jsonl.gz"))
+    partial = [p for p in sorted(directory.glob("*.jsonl.gz.partial"))
+               if not p.with_name(p.name[:-len(".partial")]).exists()]
+    if not complete and not partial:
+        print(f"[scraper] No checkpoints found in {directory}.", file=sys.stderr)
+    total = 0
+    for path in complete + partial:
+        n = 0
+        for row in _read_checkpoint(path):
+            n += 1
+            yield row
+        total += n
+        print(f"[scraper] REPLAY {path.name}: {n} items" + (" (partial)" if path in partial else ""))
+    print(f"[scraper] REPLAY DONE — total items: {total}")
+
+
+class _CheckpointWriter:
+    """
+    Tees one scraper's rows into its .partial checkpoint; close(complete=True) publishes it.
+    """
+
+    def __init__(self, pyfile: pathlib.Path, directory: pathlib.Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.final = checkpoint_path(pyfile, directory)
+        self.partial = checkpoint_path(pyfile, directory, partial=True)
+        self.final.unlink(missing_ok=True)            # never leave an older run's file looking current
+        self.fh = gzip.open(self.partial, "wt", encoding="utf-8")
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self.fh.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+    def close(self, complete: bool) -> None:
+        self.fh.close()
+        if complete:
+            os.replace(self.partial, self.final)
 
 # ----------------------------------------------------------------------------
-# Core runner for a single scraper (with timeout + robust error handling)
+# Process executor (one worker process per scraper, rows shipped back in batches)
 # ----------------------------------------------------------------------------
-def _run_one(pyfile: pathlib.Path) -> List[Dict[str, Any]]:
+def _process_worker(pyfile: str, out: "multiprocessing.Queue[tuple[str, Any]]", batch_rows: int) -> None:
+    """
+    Worker process entry point: run the scraper and send ("rows", [dict, ...]) batches
+    (every batch_rows rows, and every PROCESS_FLUSH_SECS from a background thread so rows
+    from a scraper that then stalls or spins still arrive), then ("done", None) or
+    ("error", traceback text). Non-dict items are dropped here so they are never pickled.
+    """
+    path = pathlib.Path(pyfile)
+    batch: List[Dict[str, Any]] = []
+    lock = threading.Lock()
+    finished = threading.Event()
+
+    def send() -> None:
+        nonlocal batch
+        with lock:
+            pending, batch = batch, []
+            if pending:
+                out.put(("rows", pending))
+
+    def flush_periodically() -> None:
+        while not finished.wait(PROCESS_FLUSH_SECS):
+            send()
+
+    threading.Thread(target=flush_periodically, daemon=True).start()
+    try:
+        fn = getattr(_load_module(path), "scrape", None)
+        if not callable(fn):
+            raise AttributeError("no top-level scrape()")
+        for idx, item in enumerate(_iter_rows(fn), start=1):
+            if not isinstance(item, dict):
+                print(f"[scraper] WARN   {path.name}: item #{idx} is {type(item).__name__}, skipping", file=sys.stderr)
+                continue
+            with lock:
+                batch.append(item)
+                full = len(batch) >= batch_rows
+            if full:
+                send()
+        finished.set()
+        send()
+        out.put(("done", None))
+    except BaseException:
+        finished.set()
+        send()                                       # rows produced before the error are kept
+        out.put(("error", traceback.format_exc()))
+
+
+def _stop_process(proc) -> None:
+    if proc.is_alive():
+        proc.terminate()
+        proc.join(2)
+    if proc.is_alive():
+        proc.kill()
+    proc.join()
+
+
+def _iter_process(pyfile: pathlib.Path, cancelled: threading.Event) -> Iterator[Dict[str, Any]]:
+    """
+    Run one scraper in its own process and yield its rows as the batches arrive.
+    Cancellation (timeout) or closing the iterator kills the worker; a worker error
+    or unexpected exit is re-raised here as RuntimeError.
+    """
+    ctx = multiprocessing.get_context(MP_START_METHOD)
+    out = ctx.Queue(maxsize=PROCESS_QUEUE_BATCHES)
+    proc = ctx.Process(target=_process_worker, args=(str(pyfile), out, PROCESS_BATCH_ROWS),
+                       name=f"scraper-{pyfile.stem}", daemon=True)
+    proc.start()
+    try:
+        while not cancelled.is_set():
+            try:
+                kind, payload = out.get(timeout=0.5)
+            except queue.Empty:
+                if not proc.is_alive() and out.empty():
+                    raise RuntimeError(f"worker process exited with code {proc.exitcode} before finishing")
+                continue
+            if kind == "rows":
+                yield from payload
+            elif kind == "done":
+                return
+            else:
+                raise RuntimeError(f"scraper failed in worker process:\n{payload}")
+    finally:
+        _stop_process(proc)
+        out.close()
+        out.cancel_join_thread()
+
+# ----------------------------------------------------------------------------
+# Producer for a single scraper (streams rows into the shared queue)
+# ----------------------------------------------------------------------------
+_DONE = object()
+
+
+def _offer(q: "queue.Queue[tuple[pathlib.Path, Any]]", item: tuple, cancelled: threading.Event) -> bool:
+    """
+    Put item on the bounded queue, giving up once the consumer cancels this producer.
     """
-    Execute a single scraper and return a list of dictionaries.
-    - Logs START/FINISH and elapsed time
-    - Supports sync and async scrape()
-    - Enforces a timeout via SCRAPER_TIMEOUT_SECS
-    - Gracefully returns [] on error or timeout (does not raise)
+    while not cancelled.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(pyfile: pathlib.Path, q: "queue.Queue[tuple[pathlib.Path, Any]]", cancelled: threading.Event,
+             checkpoints: Optional[pathlib.Path] = None, resume: bool = False, executor: str = "thread",
+             abandoned: Optional[threading.Event] = None) -> None:
+    """
+    Execute a single scraper and stream its dict rows into q as they are produced.
+    - cancelled is the scraper's cancellation token (its time budget ran out): async tasks are
+      cancelled, worker processes killed, and sync scrapers that accept `cancelled` are expected
+      to stop and return/yield what they have; rows keep flowing until abandoned is set
+      (defaults to cancelled), after which the consumer no longer reads them
+    - Logs START/FINISH, elapsed time and row count
+    - Supports sync/async scrape() returning lists or yielding rows
+    - Async scrapers run on the shared event loop (see _AsyncHost); sync ones in this thread
+    - executor="process" runs it in a worker process that is killed on cancellation
+    - Non-dict items are skipped; errors end the stream (rows already sent are kept)
+    - With checkpoints, rows are also written to the scraper's checkpoint; with resume,
+      a complete checkpoint is replayed instead of running the scraper again
+    - Always finishes with a _DONE marker so the consumer can account for it
     """
     started = time.perf_counter()
-    print(f"[scraper] START  {pyfile.name}")
+    sent = 0
+    complete = False
+    status = "failed"
+    abandoned = abandoned or cancelled
+    writer: Optional[_CheckpointWriter] = None
+    source: Iterator[Any] = iter(())
     try:
-        mod = _load_module(pyfile)
-        fn = getattr(mod, "scrape", None)
+        if checkpoints is not None and resume and checkpoint_path(pyfile, checkpoints).exists():
+            status = "resumed"
+            print(f"[scraper] RESUME {pyfile.name} from checkpoint")
+            source = _read_checkpoint(checkpoint_path(pyfile, checkpoints))
+        elif executor == "process":
+            print(f"[scraper] START  {pyfile.name} (process)")
+            if checkpoints is not None:
+                writer = _CheckpointWriter(pyfile, checkpoints)
+            source = _iter_process(pyfile, cancelled)
+            status = "ok"
+        else:
+            print(f"[scraper] START  {pyfile.name}")
+            mod = _load_module(pyfile)
+            fn = getattr(mod, "scrape", None)
 
-        if not callable(fn):
-            print(f"[scraper] ERROR  {pyfile.name}: no top-level scrape()", file=sys.stderr)
-            return []
-
-        def call_sync() -> Any:
-            if inspect.iscoroutinefunction(fn):
-                return asyncio.run(asyncio.wait_for(fn(), timeout=SCRAPER_TIMEOUT_SECS))
-            result = fn()
-            if inspect.isawaitable(result):
-                return asyncio.run(asyncio.wait_for(result, timeout=SCRAPER_TIMEOUT_SECS))
-            return result
-
-        data = _call_with_timeout(call_sync, SCRAPER_TIMEOUT_SECS)
-
-        if data is None:
-            data = []
-        if not isinstance(data, list):
-            print(f"[scraper] ERROR  {pyfile.name}: scrape() returned {type(data).__name__}, expected list -> []", file=sys.stderr)
-            return []
-
-        valid: List[Dict[str, Any]] = []
-        for idx, item in enumerate(data, start=1):
-            if isinstance(item, dict):
-                valid.append(item)
+            if not callable(fn):
+                print(f"[scraper] ERROR  {pyfile.name}: no top-level scrape()", file=sys.stderr)
+                return
+            if checkpoints is not None:
+                writer = _CheckpointWriter(pyfile, checkpoints)
+            if inspect.iscoroutinefunction(fn) or inspect.isasyncgenfunction(fn):
+                source = _shared_loop().iter_rows(fn, cancelled)
             else:
+                source = _iter_rows(fn, cancelled)
+            status = "ok"
+
+        for idx, item in enumerate(source, start=1):
+            if abandoned.is_set():
+                return
+            if not isinstance(item, dict):
                 print(f"[scraper] WARN   {pyfile.name}: item #{idx} is {type(item).__name__}, skipping", file=sys.stderr)
-        return valid
+                continue
+            if writer is not None:
+                writer.write(item)
+            if not _offer(q, (pyfile, item), abandoned):
+                return
+            sent += 1
+        complete = not cancelled.is_set()
+        if not complete:
+            status = "cancelled"
 
-    except TimeoutError as te:
-        print(f"[scraper] TIMEOUT {pyfile.name}: {te}", file=sys.stderr)
-        return []
+    except ScrapeCancelled:
+        status = "cancelled"
     except Exception:
+        status = "failed"
         print(f"[scraper] ERROR  {pyfile.name} failed:\n{traceback.format_exc()}", file=sys.stderr)
-        return []
     finally:
+        close = getattr(source, "close", None)
+        if close is not None:
+            close()                                  # stops a worker process promptly on cancel
+        if writer is not None:
+            writer.close(complete)
         dur = time.perf_counter() - started
-        print(f"[scraper] FINISH {pyfile.name} in {dur:.2f}s")
+        if cancelled.is_set() and status != "failed":
+            status = "cancelled"
+        SCRAPER_STATS[pyfile.stem] = {"rows": sent, "secs": round(dur, 3), "status": status}
+        print(f"[scraper] FINISH {pyfile.name} in {dur:.2f}s — {sent} items")
+        _offer(q, (pyfile, _DONE), abandoned)
 
 # ----------------------------------------------------------------------------
 # Public API
 # ----------------------------------------------------------------------------
-def scrape() -> List[Dict[str, Any]]:
+def scrape_stream(resume: bool = False) -> Iterator[Dict[str, Any]]:
     """
-    Run all scrapers listed in `scrapers.txt` concurrently.
-    Returns a flat list of all valid rows; failures/timeouts yield [] for that task.
+    Run all scrapers listed in `scrapers.txt` concurrently (up to MAX_WORKERS at a time)
+    and yield their valid rows as they arrive, checkpointing each scraper's output
+    (see CHECKPOINT_DIR). With resume, scrapers that already have a complete checkpoint
+    are replayed from it and only the others are run.
+    A scraper that runs longer than SCRAPER_TIMEOUT_SECS is cancelled: its async task is
+    cancelled, its worker process killed, or (sync scrapers) its `cancelled` token set. Rows
+    produced before the deadline are kept, and a cooperative scraper gets SCRAPER_CANCEL_GRACE_SECS
+    to hand over what it has before it is abandoned. Closing the generator early cancels
+    every running scraper.
     """
     files = _read_list_file(LIST_FILE)
     if not files:
         print(f"[scraper] No scrapers to run (empty or missing {LIST_FILE}).")
-        return []
+        return
 
-    print(f"[scraper] Discovered {len(files)} script(s): " + ", ".join(f.name for f in files))
+    print(f"[scraper] Discovered {len(files)} script(s): " + ", ".join(
+        f.name if ex == "thread" else f"{f.name} ({ex})" for f, ex in files))
     print(f"[scraper] Running up to {MAX_WORKERS} in parallel ...")
 
-    results: List[Dict[str, Any]] = []
-    lock = threading.Lock()
+    q: "queue.Queue[tuple[pathlib.Path, Any]]" = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    checkpoints = CHECKPOINT_DIR if CHECKPOINTS_ENABLED else None
+    SCRAPER_STATS.clear()
+    todo = deque(files)
+    # running: started, cancellation token, abandon flag; winding_down: started, grace deadline, abandon flag
+    running: Dict[pathlib.Path, tuple[float, threading.Event, threading.Event]] = {}
+    winding_down: Dict[pathlib.Path, tuple[float, float, threading.Event]] = {}
+    total = 0
+
+    def start_more() -> None:
+        while todo and len(running) < MAX_WORKERS:
+            pyfile, executor = todo.popleft()
+            cancelled, abandoned = threading.Event(), threading.Event()
+            running[pyfile] = (time.perf_counter(), cancelled, abandoned)
+            threading.Thread(target=_produce, args=(pyfile, q, cancelled, checkpoints, resume, executor, abandoned),
+                             daemon=True).start()
 
+    start_all = time.perf_counter()
     try:
-        start_all = time.perf_counter()
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-            future_map = {ex.submit(_run_one, f): f for f in files}
-            for fut in as_completed(future_map):
-                pyfile = future_map[fut]
-                try:
-                    rows = fut.result()
-                except Exception:
-                    print(f"[scraper] ERROR  Unexpected crash in future for {pyfile.name}:\n{traceback.format_exc()}", file=sys.stderr)
-                    rows = []
-                with lock:
-                    if rows:
-                        results.extend(rows)
-
-        dur_all = time.perf_counter() - start_all
-        print(f"[scraper] ALL DONE in {dur_all:.2f}s — total items: {len(results)}")
-        return results
+        start_more()
+        while running or winding_down:
+            try:
+                pyfile, item = q.get(timeout=0.5)
+            except queue.Empty:
+                pass
+            else:
+                if item is _DONE:
+                    running.pop(pyfile, None)
+                    winding_down.pop(pyfile, None)
+                elif pyfile in running or pyfile in winding_down:
+                    total += 1
+                    yield item
+
+            now = time.perf_counter()
+            for pyfile, (started, cancelled, abandoned) in list(running.items()):
+                if now - started > SCRAPER_TIMEOUT_SECS:
+                    print(f"[scraper] TIMEOUT {pyfile.name}: no completion within {SCRAPER_TIMEOUT_SECS:.1f}s, "
+                          f"cancelling (partial rows kept)", file=sys.stderr)
+                    cancelled.set()
+                    running.pop(pyfile)
+                    winding_down[pyfile] = (started, now + SCRAPER_CANCEL_GRACE_SECS, abandoned)
+            for pyfile, (started, deadline, abandoned) in list(winding_down.items()):
+                if now > deadline:
+                    print(f"[scraper] ABANDON {pyfile.name}: did not stop within {SCRAPER_CANCEL_GRACE_SECS:.1f}s "
+                          f"of cancellation", file=sys.stderr)
+                    abandoned.set()
+                    winding_down.pop(pyfile)
+                    SCRAPER_STATS.setdefault(pyfile.stem, {"rows": None, "secs": round(now - started, 3),
+                                                           "status": "abandoned"})
+            start_more()
+    finally:
+        for _, cancelled, abandoned in running.values():
+            cancelled.set()
+            abandoned.set()
+        for _, _, abandoned in winding_down.values():
+            abandoned.set()
+        _close_shared_loop()
+
+    print(f"[scraper] ALL DONE in {time.perf_counter() - start_all:.2f}s — total items: {total}")
+
 
+def scrape() -> List[Dict[str, Any]]:
+    """
+    Run all scrapers listed in `scrapers.txt` concurrently.
+    Returns a flat list of all valid rows; failures/timeouts contribute only the rows produced so far.
+    Prefer scrape_stream() when the rows do not all need to be held in memory.
+    """
+    results: List[Dict[str, Any]] = []
+    try:
+        for row in scrape_stream():
+            results.append(row)
+        return results
     except Exception:
         print(f"[scraper] FATAL unexpected error; returning partial results ({len(results)} items)\n{traceback.format_exc()}", file=sys.stderr)
         return results
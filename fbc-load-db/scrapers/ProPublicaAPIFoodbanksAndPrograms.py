@@ -1,12 +1,17 @@
-import requests
+import os
 import json
 import re
-import time
 import random
 from bs4 import BeautifulSoup
 
+import http_cache
+
 BASE_URL = "https://projects.propublica.org/nonprofits/api/v2"
-MAX_RESULTS = 175
+MAX_RESULTS = int(os.getenv("MAX_RESULTS", "175"))
+
+# Shared on-disk cache (http_cache.py): repeat runs only revalidate what they already fetched;
+# network requests are paced per host by rate_limit.py.
+HTTP = http_cache.requests_session()
 
 ABOUT_KEYWORDS = [
     "about",
@@ -22,31 +27,24 @@ ABOUT_KEYWORDS = [
 ]
 
 
-def tiny_delay():
-    """Small pause before every request."""
-    time.sleep(0.25)  # 250 ms delay
-
-
 # -------------------------------
 # GOOGLE HELPERS
 # -------------------------------
 
 def google_search_raw(query: str):
     """Run a Google Custom Search and return the raw JSON."""
-    tiny_delay()
     params = {
         "q": query,
         "cx": "47dcfe213c7274b68",
         "key": "deprecated",
         "num": 3
     }
-    resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params)
+    resp = HTTP.get("https://www.googleapis.com/customsearch/v1", params=params)
     return resp.json()
 
 
 def fetch_google_image(query: str):
     """Return the first clean Google image result, skipping lookasides."""
-    tiny_delay()
     params = {
         "q": query,
         "cx": "47dcfe213c7274b68",
@@ -55,7 +53,7 @@ def fetch_google_image(query: str):
         "searchType": "image"
     }
 
-    resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params)
+    resp = HTTP.get("https://www.googleapis.com/customsearch/v1", params=params)
     data = resp.json()
 
     if "items" not in data or not data["items"]:
@@ -112,8 +110,7 @@ def extract_about_from_url(url: str) -> str:
         return None
 
     try:
-        tiny_delay()
-        resp = requests.get(url, timeout=8)
+        resp = HTTP.get(url, timeout=8)
         if resp.status_code != 200:
             return None
 
@@ -190,20 +187,18 @@ def extract_about_section(website: str) -> str:
 # -------------------------------
 
 def fetch_search(q="food bank", state=None, page=0):
-    tiny_delay()
     url = f"{BASE_URL}/search.json"
     params = {"q": q, "page": page}
     if state:
         params["state[id]"] = state
-    resp = requests.get(url, params=params)
+    resp = HTTP.get(url, params=params)
     resp.raise_for_status()
     return resp.json()
 
 
 def fetch_organization(ein: str):
-    tiny_delay()
     url = f"{BASE_URL}/organizations/{ein}.json"
-    resp = requests.get(url)
+    resp = HTTP.get(url)
     if resp.status_code != 200:
         return None
     return resp.json()
@@ -253,12 +248,16 @@ def infer_program_type(text):
 # MAIN SCRAPER
 # -------------------------------
 
-def scrape(q="food bank", state=None, max_results=MAX_RESULTS):
+def scrape(q="food bank", state=None, max_results=MAX_RESULTS, cancelled=None):
+    """
+    Yields foodbank and program rows (in pairs) so the loader can stream them.
+    Stops between organizations once the loader sets the cancelled token (a threading.Event).
+    """
     print("Scraping for Foodbanks and Programs now.")
-    combined = []
+    produced = 0
     page = 0
 
-    while len(combined) < 2 * max_results:
+    while produced < 2 * max_results:
         search_json = fetch_search(q=q, state=state, page=page)
         orgs = search_json.get("organizations", [])
 
@@ -266,8 +265,10 @@ def scrape(q="food bank", state=None, max_results=MAX_RESULTS):
             break
 
         for org in orgs:
-            if len(combined) >= 2 * max_results:
+            if produced >= 2 * max_results:
                 break
+            if cancelled is not None and cancelled.is_set():
+                return
 
             ein = org.get("ein")
             name = org.get("name", "N/A")
@@ -345,21 +346,21 @@ def scrape(q="food bank", state=None, max_results=MAX_RESULTS):
                 "image": program_image
             }
 
-            combined.extend([foodbank_json, program_json])
+            yield foodbank_json
+            yield program_json
+            produced += 2
 
         page += 1
         if page >= search_json.get("num_pages", 0):
             break
 
-    return combined
-
 
 # -------------------------------
 # ENTRY POINT
 # -------------------------------
 
 if __name__ == "__main__":
-    results = scrape()
+    results = list(scrape())
     print(f"✅ Retrieved {len(results)} total entries (foodbanks + programs).")
 
     """
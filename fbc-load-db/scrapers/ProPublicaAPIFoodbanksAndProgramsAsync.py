@@ -11,6 +11,9 @@ import re
 from typing import Optional, Dict, Tuple
 from urllib.parse import quote
 
+import http_cache
+import rate_limit
+
 BASE_URL = "https://projects.propublica.org/nonprofits/api/v2"
 MAX_RESULTS = int(os.getenv("MAX_RESULTS", "100"))
 
@@ -223,36 +226,53 @@ async def _process_org(session, org):
 
     return foodbank_json, program_json
 
-async def scrape(q="food bank", state=None, max_results=MAX_RESULTS):
-    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_S)
-    connector = aiohttp.TCPConnector(limit=HTTP_LIMIT)
-    results = []
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
-        page = 0
-        while len(results) // 2 < max_results:
-            search_json = await _fetch_search(session, q=q, state=state, page=page)
-            orgs = (search_json or {}).get("organizations", [])
-            if not orgs:
-                break
-
-            remaining_pairs = max_results - (len(results) // 2)
-            tasks = [_process_org(session, org) for org in orgs[:remaining_pairs]]
-
-            # Gather all pairs and flatten into results
-            pairs = await asyncio.gather(*tasks, return_exceptions=False)
-            for fb, prog in pairs:
-                results.append(fb)
-                results.append(prog)
-
-            page += 1
-            if page >= (search_json or {}).get("num_pages", 0):
-                break
-
-    return results
+async def scrape(q="food bank", state=None, max_results=MAX_RESULTS, session: Optional[aiohttp.ClientSession] = None):
+    """
+    Yields food bank and program rows as each org finishes, so a run cut short by the
+    scraper timeout still hands over everything produced so far.
+    """
+    # scraper.py passes its shared, pooled session; standalone runs open their own.
+    if session is None:
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_S)
+        connector = aiohttp.TCPConnector(limit=HTTP_LIMIT)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as own:
+            async for row in scrape(q, state, max_results, session=own):
+                yield row
+        return
+    session = http_cache.cached(rate_limit.limited(session))
+
+    produced = 0
+    page = 0
+    while produced < max_results:
+        search_json = await _fetch_search(session, q=q, state=state, page=page)
+        orgs = (search_json or {}).get("organizations", [])
+        if not orgs:
+            break
+
+        remaining_pairs = max_results - produced
+        tasks = [asyncio.ensure_future(_process_org(session, org)) for org in orgs[:remaining_pairs]]
+        try:
+            for done in asyncio.as_completed(tasks):
+                fb, prog = await done
+                produced += 1
+                yield fb
+                yield prog
+        finally:
+            for t in tasks:
+                t.cancel()
+
+        page += 1
+        if page >= (search_json or {}).get("num_pages", 0):
+            break
+
+
+async def _collect(**kwargs) -> list:
+    return [row async for row in scrape(**kwargs)]
+
 
 if __name__ == "__main__":
     data = asyncio.run(
-        scrape(
+        _collect(
             q=os.getenv("QUERY", "food bank"),
             state=os.getenv("STATE"),
             max_results=int(os.getenv("MAX_RESULTS", str(MAX_RESULTS))),
@@ -1,12 +1,17 @@
-import requests
+import os
 import json
-import time
 import re
 import random
 from bs4 import BeautifulSoup
 
+import http_cache
+
 BASE_URL = "https://projects.propublica.org/nonprofits/api/v2"
-MAX_RESULTS = 175
+MAX_RESULTS = int(os.getenv("MAX_RESULTS", "175"))
+
+# Shared on-disk cache (http_cache.py): repeat runs only revalidate what they already fetched;
+# network requests are paced per host by rate_limit.py.
+HTTP = http_cache.requests_session()
 
 KEYWORDS = [
     "foundation",
@@ -47,28 +52,20 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; DataFetcherBot/1.0; +https://example.com/bot)"
 }
 
-# -------------------
-# Small Delay
-# -------------------
-def tiny_delay():
-    time.sleep(0.25)
-
 # -------------------
 # Google Helpers
 # -------------------
 def fetch_google_website(query: str) -> str:
-    tiny_delay()
     params = {"q": query, "cx": GOOGLE_CX, "key": GOOGLE_API_KEY, "num": 1}
-    resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params)
+    resp = HTTP.get("https://www.googleapis.com/customsearch/v1", params=params)
     data = resp.json()
     if "items" in data and data["items"]:
         return data["items"][0]["link"]
     return None
 
 def fetch_google_description(query: str) -> str:
-    tiny_delay()
     params = {"q": query, "cx": GOOGLE_CX, "key": GOOGLE_API_KEY, "num": 1}
-    resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params)
+    resp = HTTP.get("https://www.googleapis.com/customsearch/v1", params=params)
     data = resp.json()
     if "items" in data and data["items"]:
         return data["items"][0].get("snippet", "")
@@ -77,7 +74,6 @@ def fetch_google_description(query: str) -> str:
 def fetch_logo(name: str) -> str:
     if not name:
         return "N/A"
-    tiny_delay()
     params = {
         "q": f"{name} logo",
         "cx": GOOGLE_CX,
@@ -85,7 +81,7 @@ def fetch_logo(name: str) -> str:
         "searchType": "image",
         "num": 10
     }
-    resp = requests.get("https://www.googleapis.com/customsearch/v1", params=params)
+    resp = HTTP.get("https://www.googleapis.com/customsearch/v1", params=params)
     try:
         items = resp.json().get("items", [])
         if not items:
@@ -106,8 +102,7 @@ def extract_about_from_url(url: str) -> str:
     if not url:
         return None
     try:
-        tiny_delay()
-        resp = requests.get(url, headers=HEADERS, timeout=8)
+        resp = HTTP.get(url, headers=HEADERS, timeout=8)
         if resp.status_code != 200:
             return None
         soup = BeautifulSoup(resp.text, "html.parser")
@@ -172,9 +167,8 @@ def classify_affiliation(name: str, org_detail: dict = None) -> str:
     return "Nonprofit Foundation"
 
 def fetch_grants(ein: str) -> str:
-    tiny_delay()
     url = f"{BASE_URL}/organizations/{ein}.json"
-    resp = requests.get(url, headers=HEADERS)
+    resp = HTTP.get(url, headers=HEADERS)
     if resp.status_code != 200:
         return "N/A"
     try:
@@ -196,16 +190,19 @@ def fetch_grants(ein: str) -> str:
 # -------------------
 # Main Scraper
 # -------------------
-def scrape(max_results=MAX_RESULTS):
+def scrape(max_results=MAX_RESULTS, cancelled=None):
+    """
+    Yields sponsor rows one at a time so the loader can stream them.
+    Stops between organizations once the loader sets the cancelled token (a threading.Event).
+    """
     print("Scraping for sponsors now.")
-    out = []
+    produced = 0
 
     for keyword in KEYWORDS:
         page = 0
-        while len(out) < max_results:
-            tiny_delay()
+        while produced < max_results:
             params = {"q": keyword, "page": page}
-            resp = requests.get(f"{BASE_URL}/search.json", params=params, headers=HEADERS)
+            resp = HTTP.get(f"{BASE_URL}/search.json", params=params, headers=HEADERS)
             if resp.status_code != 200:
                 break
 
@@ -215,16 +212,17 @@ def scrape(max_results=MAX_RESULTS):
                 break
 
             for org in orgs:
-                if len(out) >= max_results:
+                if produced >= max_results:
                     break
+                if cancelled is not None and cancelled.is_set():
+                    return
 
                 name = org.get("name", "N/A")
                 ein = org.get("ein", "N/A")
                 city = org.get("city", "N/A")
                 state_code = org.get("state", "N/A")
 
-                tiny_delay()
-                detail_resp = requests.get(f"{BASE_URL}/organizations/{ein}.json", headers=HEADERS)
+                detail_resp = HTTP.get(f"{BASE_URL}/organizations/{ein}.json", headers=HEADERS)
                 detail_json = detail_resp.json() if detail_resp.status_code == 200 else {}
                 detail = detail_json.get("organization", {})
 
@@ -279,19 +277,18 @@ def scrape(max_results=MAX_RESULTS):
                     "ein": str(ein)
                 }
 
-                out.append(donor_json)
+                yield donor_json
+                produced += 1
 
             page += 1
             if page >= data.get("num_pages", 0):
                 break
 
-    return out
-
 # -------------------
 # Entry Point
 # -------------------
 if __name__ == "__main__":
-    sponsors = scrape()
+    sponsors = list(scrape())
     print(f"✅ Scraped {len(sponsors)} sponsors total")
 
     """
@@ -11,6 +11,9 @@ import re
 from urllib.parse import quote
 from typing import Optional, Dict, Any, List
 
+import http_cache
+import rate_limit
+
 BASE_URL = "https://projects.propublica.org/nonprofits/api/v2"
 MAX_RESULTS = int(os.getenv("MAX_RESULTS", "100"))
 
@@ -193,30 +196,52 @@ async def _process_org(session: aiohttp.ClientSession, org: dict) -> dict:
         "EIN": str(ein),
     }
 
-async def scrape(max_results=MAX_RESULTS):
-    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_S)
-    connector = aiohttp.TCPConnector(limit=HTTP_LIMIT)
-    results: List[dict] = []
-    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
-        for keyword in KEYWORDS:
-            page = 0
-            while len(results) < max_results:
-                data = await _fetch_json(session, f"{BASE_URL}/search.json", params={"q": keyword, "page": page})
-                orgs = (data or {}).get("organizations", [])
-                if not orgs:
-                    break
-                remaining = max_results - len(results)
-                tasks = [_process_org(session, org) for org in orgs[:remaining]]
-                results.extend(await asyncio.gather(*tasks, return_exceptions=False))
-                page += 1
-                if page >= (data or {}).get("num_pages", 0):
-                    break
-            if len(results) >= max_results:
+async def scrape(max_results=MAX_RESULTS, session: Optional[aiohttp.ClientSession] = None):
+    """
+    Yields sponsor rows as each org finishes, so a run cut short by the scraper timeout
+    still hands over everything produced so far.
+    """
+    # scraper.py passes its shared, pooled session; standalone runs open their own.
+    if session is None:
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_S)
+        connector = aiohttp.TCPConnector(limit=HTTP_LIMIT)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as own:
+            async for row in scrape(max_results, session=own):
+                yield row
+        return
+    session = http_cache.cached(rate_limit.limited(session))
+
+    produced = 0
+    for keyword in KEYWORDS:
+        page = 0
+        while produced < max_results:
+            data = await _fetch_json(session, f"{BASE_URL}/search.json", params={"q": keyword, "page": page})
+            orgs = (data or {}).get("organizations", [])
+            if not orgs:
+                break
+            remaining = max_results - produced
+            tasks = [asyncio.ensure_future(_process_org(session, org)) for org in orgs[:remaining]]
+            try:
+                for done in asyncio.as_completed(tasks):
+                    row = await done
+                    produced += 1
+                    yield row
+            finally:
+                for t in tasks:
+                    t.cancel()
+            page += 1
+            if page >= (data or {}).get("num_pages", 0):
                 break
-    return results
+        if produced >= max_results:
+            break
+
+
+async def _collect(**kwargs) -> List[dict]:
+    return [row async for row in scrape(**kwargs)]
+
 
 if __name__ == "__main__":
-    donors = asyncio.run(scrape(max_results=int(os.getenv("MAX_RESULTS", str(MAX_RESULTS)))))
+    donors = asyncio.run(_collect(max_results=int(os.getenv("MAX_RESULTS", str(MAX_RESULTS)))))
     with open("donors.json", "w", encoding="utf-8") as f:
         json.dump(donors, f, indent=2, ensure_ascii=False)
     print(
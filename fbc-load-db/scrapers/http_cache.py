@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  © 2025 Francisco Vivas Puerto (aka “DaFrancc”)
+#  All rights reserved. This file is part of the FoodBankConnect tooling.
+#  You may use and distribute with proper attribution to the author.
+# ============================================================================
+
+"""
+Persistent HTTP response cache shared by all scrapers (and across runs).
+
+Responses to GET requests are stored in one SQLite file under HTTP_CACHE_DIR, keyed by
+method + URL + query params. Entries are fresh for their TTL (per call, else the
+response's Cache-Control max-age, else HTTP_CACHE_TTL_SECS); stale entries that carry
+an ETag or Last-Modified are revalidated with a conditional request, and a 304 reuses
+the stored body. The least recently used entries are evicted once the file grows past
+HTTP_CACHE_MAX_MB.
+
+Plugging it in:
+    requests:  HTTP = http_cache.requests_session();  HTTP.get(url, params=...)
+    aiohttp:   session = http_cache.cached(rate_limit.limited(session));  async with session.get(url) as resp: ...
+HTTP_CACHE=0 turns both into plain pass-throughs. Requests that miss the cache go through
+rate_limit's per-host buckets; cache hits never wait for a token.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import tempfile
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from rate_limit import HostRateLimiter, RateLimitedAdapter
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") == "1"
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "fbc-http-cache"))
+HTTP_CACHE_TTL_SECS = float(os.getenv("HTTP_CACHE_TTL_SECS", str(7 * 24 * 3600)))
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", "512"))
+
+CACHEABLE_STATUS = (200, 203, 301, 308)
+# Response headers worth keeping; the rest (cookies, hop-by-hop, content-encoding since
+# bodies are stored decoded) are dropped.
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "expires", "location")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    url           TEXT NOT NULL,        -- scheme://host/path only; query strings may carry API keys
+    status        INTEGER NOT NULL,
+    headers       TEXT NOT NULL,
+    body          BLOB NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    stored_at     REAL NOT NULL,
+    expires_at    REAL NOT NULL,
+    last_used     REAL NOT NULL,
+    size          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def cache_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    """
+    Stable key for a request: method, URL and query params (merged and sorted).
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query += [(str(k), str(v)) for k, v in params.items() if v is not None]
+    canon = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(sorted(query)), ""))
+    return hashlib.sha256(f"{method.upper()} {canon}".encode("utf-8")).hexdigest()
+
+
+def _ttl_from_headers(headers: Mapping[str, str], default: float) -> Optional[float]:
+    """
+    TTL implied by Cache-Control/Expires; None when the response must not be stored.
+    """
+    cc = (headers.get("cache-control") or "").lower()
+    directives = dict(p.strip().partition("=")[::2] for p in cc.split(",") if p.strip())
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name, "").isdigit():
+            return float(directives[name])
+    if headers.get("expires"):
+        try:
+            return max(0.0, parsedate_to_datetime(headers["expires"]).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return 0.0
+    return default
+
+
+class CachedEntry:
+    """
+    One stored response.
+    """
+
+    __slots__ = ("status", "headers", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, etag: Optional[str],
+                 last_modified: Optional[str], expires_at: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        out = {}
+        if self.etag:
+            out["If-None-Match"] = self.etag
+        if self.last_modified:
+            out["If-Modified-Since"] = self.last_modified
+        return out
+
+
+class HTTPCache:
+    """
+    SQLite-backed response store. Safe to share between threads (one connection each)
+    and processes (WAL journal); eviction is approximate under concurrent writers.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, max_bytes: int = int(HTTP_CACHE_MAX_MB * 1024 * 1024),
+                 default_ttl: float = HTTP_CACHE_TTL_SECS):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "responses.sqlite3")
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._bytes = self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = self.revalidated = self.misses = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[CachedEntry]:
+        row = self._conn().execute(
+            "SELECT status, headers, body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._conn().execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return CachedEntry(row[0], json.loads(row[1]), row[2], row[3], row[4], row[5])
+
+    def put(self, key: str, url: str, status: int, headers: Mapping[str, str], body: bytes,
+            ttl: Optional[float] = None) -> None:
+        """
+        Stores a response unless its status or headers make it uncacheable.
+        """
+        kept = {k.lower(): v for k, v in headers.items() if k.lower() in _KEPT_HEADERS}
+        header_ttl = _ttl_from_headers(kept, self.default_ttl)
+        if status not in CACHEABLE_STATUS or header_ttl is None:
+            return
+        ttl = header_ttl if ttl is None else ttl
+        etag, last_modified = kept.get("etag"), kept.get("last-modified")
+        if ttl <= 0 and not (etag or last_modified):
+            return                                   # would never be served
+        now = time.time()
+        parts = urlsplit(url)
+        self._conn().execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, urlunsplit((parts.scheme, parts.netloc, parts.path, "", "")), status, json.dumps(kept),
+             sqlite3.Binary(body), etag, last_modified, now, now + ttl, now, len(body)),
+        )
+        with self._lock:
+            self._bytes += len(body)
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def touch(self, key: str, headers: Mapping[str, str], ttl: Optional[float] = None) -> None:
+        """
+        Marks an entry fresh again after a 304 Not Modified.
+        """
+        header_ttl = _ttl_from_headers({k.lower(): v for k, v in headers.items()}, self.default_ttl)
+        ttl = (header_ttl or 0.0) if ttl is None else ttl
+        now = time.time()
+        self._conn().execute("UPDATE responses SET stored_at = ?, expires_at = ?, last_used = ? WHERE key = ?",
+                             (now, now + ttl, now, key))
+
+    def evict(self) -> int:
+        """
+        Drops least recently used entries until the cache is at 90% of max_bytes; returns bytes freed.
+        """
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = total - int(self.max_bytes * 0.9)
+        freed, keys = 0, []
+        if target > 0:
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                keys.append((key,))
+                freed += size
+                if freed >= target:
+                    break
+            conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        with self._lock:
+            self._bytes = total - freed
+        return freed
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM responses")
+        with self._lock:
+            self._bytes = 0
+
+
+_default_cache: Optional[HTTPCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> HTTPCache:
+    """
+    Process-wide HTTPCache on HTTP_CACHE_DIR, opened on first use.
+    """
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+        return _default_cache
+
+# ----------------------------------------------------------------------------
+# requests: transport adapter
+# ----------------------------------------------------------------------------
+class CachingAdapter(RateLimitedAdapter):
+    """
+    requests transport adapter that answers GETs from the cache and revalidates stale entries;
+    whatever reaches the network is rate limited per host.
+    A per-request TTL can be given with the "X-Cache-TTL" request header (stripped before sending).
+    """
+
+    def __init__(self, cache: Optional[HTTPCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        ttl_header = request.headers.pop("X-Cache-TTL", None)
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+        cache = self.cache or default_cache()
+        ttl = float(ttl_header) if ttl_header is not None else None
+        key = cache_key("GET", request.url)
+        entry = cache.get(key)
+        if entry is not None and entry.fresh:
+            cache.hits += 1
+            return self._from_entry(request, entry)
+        if entry is not None:
+            request.headers.update(entry.conditional_headers())
+
+        resp = super().send(request, **kwargs)
+        if entry is not None and resp.status_code == 304:
+            cache.revalidated += 1
+            cache.touch(key, resp.headers, ttl)
+            resp.close()
+            return self._from_entry(request, entry)
+        cache.misses += 1
+        if not kwargs.get("stream"):
+            cache.put(key, request.url, resp.status_code, resp.headers, resp.content, ttl)
+        return resp
+
+    @staticmethod
+    def _from_entry(request, entry: CachedEntry) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = entry.status
+        resp.headers = CaseInsensitiveDict(entry.headers)
+        resp._content = entry.body
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK (cached)"
+        resp.from_cache = True                        # type: ignore[attr-defined]
+        return resp
+
+
+def requests_session(cache: Optional[HTTPCache] = None, limiter: Optional[HostRateLimiter] = None) -> requests.Session:
+    """
+    A requests.Session whose http(s) GETs go through the cache (only the rate limiter when HTTP_CACHE=0).
+    """
+    session = requests.Session()
+    adapter = CachingAdapter(cache, limiter=limiter) if HTTP_CACHE_ENABLED else RateLimitedAdapter(limiter)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# ----------------------------------------------------------------------------
+# aiohttp: session wrapper
+# ----------------------------------------------------------------------------
+class CachedAsyncResponse:
+    """
+    The parts of aiohttp.ClientResponse the scrapers use (status, headers, read/text/json).
+    """
+
+    def __init__(self, url: str, status: int, headers: Mapping[str, str], body: bytes, from_cache: bool):
+        self.url = url
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        self._body = body
+        self.from_cache = from_cache
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None, errors: str = "replace") -> str:
+        return self._body.decode(encoding or get_encoding_from_headers(self.headers) or "utf-8", errors)
+
+    async def json(self, *, loads=json.loads, content_type: Optional[str] = "application/json", **_: Any) -> Any:
+        return loads(await self.text())
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status} for {self.url}")
+
+    async def __aenter__(self) -> "CachedAsyncResponse":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class _CachedRequest:
+    """
+    Awaitable/async-context result of CachedClientSession.get(), like aiohttp's request context.
+    """
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._resp: Optional[CachedAsyncResponse] = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> CachedAsyncResponse:
+        self._resp = await self._coro
+        return self._resp
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+
+class CachedClientSession:
+    """
+    Wraps an aiohttp.ClientSession so get() is served from / stored into the cache.
+    Cache reads and writes run in a worker thread to keep the event loop responsive.
+    Other attributes pass through to the wrapped session.
+    """
+
+    def __init__(self, session, cache: Optional[HTTPCache] = None):
+        self._session = session
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    def get(self, url: str, *, params: Optional[Mapping[str, Any]] = None, headers: Optional[Mapping[str, str]] = None,
+            cache_ttl: Optional[float] = None, **kwargs: Any) -> _CachedRequest:
+        return _CachedRequest(self._get(str(url), params, dict(headers or {}), cache_ttl, kwargs))
+
+    async def _get(self, url: str, params, headers: Dict[str, str], ttl: Optional[float],
+                   kwargs: Dict[str, Any]) -> CachedAsyncResponse:
+        cache = self.cache or default_cache()
+        key = cache_key("GET", url, params)
+        entry = await asyncio.to_thread(cache.get, key)
+        if entry is not None and entry.fresh:
+            cache.hits += 1
+            return CachedAsyncResponse(url, entry.status, entry.headers, entry.body, True)
+        if entry is not None:
+            headers.update(entry.conditional_headers())
+
+        async with self._session.get(url, params=params, headers=headers, **kwargs) as resp:
+            if entry is not None and resp.status == 304:
+                cache.revalidated += 1
+                await asyncio.to_thread(cache.touch, key, dict(resp.headers), ttl)
+                return CachedAsyncResponse(url, entry.status, entry.headers, entry.body, True)
+            body = await resp.read()
+            resp_headers = dict(resp.headers)
+            status = resp.status
+        cache.misses += 1
+        await asyncio.to_thread(cache.put, key, url, status, resp_headers, body, ttl)
+        return CachedAsyncResponse(url, status, resp_headers, body, False)
+
+
+def cached(session, cache: Optional[HTTPCache] = None):
+    """
+    session wrapped in CachedClientSession, or session itself when HTTP_CACHE=0 or already wrapped.
+    """
+    if not HTTP_CACHE_ENABLED or isinstance(session, CachedClientSession):
+        return session
+    return CachedClientSession(session, cache)
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  © 2025 Francisco Vivas Puerto (aka “DaFrancc”)
+#  All rights reserved. This file is part of the FoodBankConnect tooling.
+#  You may use and distribute with proper attribution to the author.
+# ============================================================================
+
+"""
+Per-host request rate limiting shared by all scrapers, across processes.
+
+Every host gets its own token bucket (RATE_LIMITS overrides, else RATE_LIMIT_DEFAULT),
+so a slow API never throttles requests to unrelated sites. The buckets live in a SQLite
+file under RATE_LIMIT_DIR, so process-mode scrapers and their parent draw from the same
+bucket per host instead of each getting a full allowance (RATE_LIMIT_SHARED=0 keeps them
+in memory, per process). A bucket holds up to
+`burst` tokens and refills at `rate` per second; a request takes one token and waits
+only when the bucket is empty. A 429 (or 503) response blocks its host for the
+Retry-After period (else an exponential backoff) and the request is retried, up to
+RATE_LIMIT_MAX_RETRIES times.
+
+Limits are written "host=rate/burst", comma separated, e.g.
+    RATE_LIMITS="www.googleapis.com=1/2,projects.propublica.org=8/16"
+
+Plugging it in (http_cache.requests_session() already does the requests side):
+    requests:  session.mount("https://", rate_limit.RateLimitedAdapter())
+    aiohttp:   session = rate_limit.limited(session)
+RATE_LIMIT=0 turns both into plain pass-throughs.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import sqlite3
+import asyncio
+import logging
+import tempfile
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "1") == "1"
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "10/20")
+RATE_LIMITS = os.getenv("RATE_LIMITS", "www.googleapis.com=1/2,projects.propublica.org=8/16")
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+RATE_LIMIT_MAX_WAIT_SECS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECS", "60"))
+RATE_LIMIT_SHARED = os.getenv("RATE_LIMIT_SHARED", "1") == "1"
+RATE_LIMIT_DIR = os.getenv("RATE_LIMIT_DIR") or os.getenv("HTTP_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "fbc-http-cache")
+
+RETRY_STATUS = (429, 503)
+
+log = logging.getLogger(__name__)
+
+
+def parse_limit(text: str) -> Tuple[float, float]:
+    """
+    "rate/burst" (or just "rate", burst = max(1, rate)) -> (rate per second, burst).
+    """
+    rate, _, burst = text.strip().partition("/")
+    r = float(rate)
+    return r, float(burst) if burst else max(1.0, r)
+
+
+def parse_limits(text: str) -> Dict[str, Tuple[float, float]]:
+    out = {}
+    for item in text.split(","):
+        host, sep, limit = item.partition("=")
+        if sep and host.strip():
+            out[host.strip().lower()] = parse_limit(limit)
+    return out
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date); None if absent/invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _take(tokens: float, updated: float, now: float, rate: float, burst: float) -> Tuple[float, float, float]:
+    """
+    Refills the bucket up to now and takes one token; returns (tokens, updated, wait).
+    updated is in the future while the host is backing off, tokens negative while queued.
+    """
+    if now > updated:
+        tokens, updated = min(burst, tokens + (now - updated) * rate), now
+    tokens -= 1
+    deficit = -tokens / rate if tokens < 0 and rate > 0 else 0.0
+    return tokens, updated, (updated - now) + deficit
+
+
+def _blocked(tokens: float, updated: float, until: float) -> Tuple[float, float]:
+    """
+    No tokens before until (Retry-After); earlier reservations are pushed back too.
+    """
+    return (min(tokens, 0.0), until) if until > updated else (tokens, updated)
+
+
+class TokenBucket:
+    """
+    Thread-safe in-memory token bucket. reserve() hands out tokens in arrival order and
+    returns how long the caller has to wait for its token, so waiting happens outside the
+    lock (and can be time.sleep or asyncio.sleep).
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            self.tokens, self.updated, wait = _take(self.tokens, self.updated, time.monotonic(), self.rate, self.burst)
+            return wait
+
+    def block(self, secs: float) -> None:
+        with self._lock:
+            self.tokens, self.updated = _blocked(self.tokens, self.updated, time.monotonic() + secs)
+
+
+class BucketStore:
+    """
+    Token bucket state in SQLite (one row per host, wall-clock times), updated under
+    BEGIN IMMEDIATE so every process and thread on the machine sees one bucket per host.
+    """
+
+    def __init__(self, directory: str = RATE_LIMIT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "rate_limits.sqlite3")
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")         # losing bucket state in a crash is harmless
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                         "updated REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def update(self, host: str, burst: float, fn) -> Any:
+        """
+        Applies fn(tokens, updated, now) -> (tokens, updated, result) to host's row atomically.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE host = ?", (host,)).fetchone()
+            now = time.time()
+            tokens, updated, result = fn(*(row or (burst, now)), now)
+            conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (host, tokens, updated))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+
+class SharedTokenBucket:
+    """
+    TokenBucket whose state lives in a BucketStore row.
+    """
+
+    def __init__(self, store: BucketStore, host: str, rate: float, burst: float):
+        self.store = store
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+
+    def reserve(self) -> float:
+        return self.store.update(self.host, self.burst,
+                                 lambda tokens, updated, now: _take(tokens, updated, now, self.rate, self.burst))
+
+    def block(self, secs: float) -> None:
+        self.store.update(self.host, self.burst,
+                          lambda tokens, updated, now: (*_blocked(tokens, updated, now + secs), None))
+
+
+class HostRateLimiter:
+    """
+    One bucket per host, created on first use from the configured limits: shared through
+    a BucketStore when given one, else an in-memory TokenBucket for this process only.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default: Tuple[float, float] = parse_limit(RATE_LIMIT_DEFAULT),
+                 store: Optional[BucketStore] = None):
+        self.limits = parse_limits(RATE_LIMITS) if limits is None else limits
+        self.default = default
+        self.store = store
+        self._buckets: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.waited_secs = 0.0
+        self.throttled = 0
+
+    def bucket(self, url: str):
+        host = (urlsplit(url).hostname or "").lower()
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                rate, burst = self.limits.get(host, self.default)
+                b = TokenBucket(rate, burst) if self.store is None else SharedTokenBucket(self.store, host, rate, burst)
+                self._buckets[host] = b
+            return b
+
+    def _reserve(self, url: str) -> float:
+        delay = self.bucket(url).reserve()
+        if delay > 0:
+            with self._lock:
+                self.waited_secs += delay
+        return delay
+
+    def wait(self, url: str) -> None:
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url: str) -> None:
+        # A shared bucket is a SQLite transaction; keep it off the event loop.
+        delay = self._reserve(url) if self.store is None else await asyncio.to_thread(self._reserve, url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def backoff(self, url: str, status: int, retry_after: Optional[str], attempt: int) -> Optional[float]:
+        """
+        Blocks url's host after a 429/503; returns the wait, or None when the request should
+        not be retried (out of attempts, or the server asks for longer than RATE_LIMIT_MAX_WAIT_SECS).
+        """
+        secs = parse_retry_after(retry_after)
+        if secs is None:
+            if status != 429:
+                return None                   # a 503 without Retry-After is an outage, not throttling
+            secs = float(2 ** attempt)
+        if attempt >= RATE_LIMIT_MAX_RETRIES or secs > RATE_LIMIT_MAX_WAIT_SECS:
+            return None
+        self.bucket(url).block(secs)
+        with self._lock:
+            self.throttled += 1
+        log.info("rate limited by %s (HTTP %s); backing off %.1fs", urlsplit(url).hostname, status, secs)
+        return secs
+
+
+_default_limiter: Optional[HostRateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def default_limiter() -> HostRateLimiter:
+    """
+    HostRateLimiter used by every scraper in the process; with RATE_LIMIT_SHARED its buckets
+    are shared with the other processes through RATE_LIMIT_DIR.
+    """
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = HostRateLimiter(store=BucketStore() if RATE_LIMIT_SHARED else None)
+        return _default_limiter
+
+# ----------------------------------------------------------------------------
+# requests: transport adapter
+# ----------------------------------------------------------------------------
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    requests transport adapter that takes a token from the request's host bucket before
+    sending and retries 429/503 responses after backing off.
+    """
+
+    def __init__(self, limiter: Optional[HostRateLimiter] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    def send(self, request, **kwargs):
+        if not RATE_LIMIT_ENABLED:
+            return super().send(request, **kwargs)
+        limiter = self.limiter or default_limiter()
+        attempt = 0
+        while True:
+            limiter.wait(request.url)
+            resp = super().send(request, **kwargs)
+            if resp.status_code not in RETRY_STATUS:
+                return resp
+            secs = limiter.backoff(request.url, resp.status_code, resp.headers.get("Retry-After"), attempt)
+            if secs is None:
+                return resp
+            resp.close()
+            attempt += 1
+
+# ----------------------------------------------------------------------------
+# aiohttp: session wrapper
+# ----------------------------------------------------------------------------
+class _LimitedRequest:
+    """
+    Async-context/awaitable result of LimitedClientSession.get(), like aiohttp's request context.
+    """
+
+    def __init__(self, session: "LimitedClientSession", url: str, kwargs: Dict[str, Any]):
+        self._session = session
+        self._url = url
+        self._kwargs = kwargs
+        self._resp = None
+
+    async def _send(self):
+        limiter = self._session.limiter or default_limiter()
+        attempt = 0
+        while True:
+            await limiter.wait_async(self._url)
+            resp = await self._session._session.get(self._url, **self._kwargs)
+            if resp.status not in RETRY_STATUS:
+                return resp
+            secs = limiter.backoff(self._url, resp.status, resp.headers.get("Retry-After"), attempt)
+            if secs is None:
+                return resp
+            resp.release()
+            attempt += 1
+
+    def __await__(self):
+        return self._send().__await__()
+
+    async def __aenter__(self):
+        self._resp = await self._send()
+        return self._resp
+
+    async def __aexit__(self, *exc) -> None:
+        if self._resp is not None:
+            self._resp.release()
+
+
+class LimitedClientSession:
+    """
+    Wraps an aiohttp.ClientSession so get() waits for its host's token and retries 429/503.
+    Other attributes pass through to the wrapped session.
+    """
+
+    def __init__(self, session, limiter: Optional[HostRateLimiter] = None):
+        self._session = session
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    def get(self, url, **kwargs: Any) -> _LimitedRequest:
+        return _LimitedRequest(self, str(url), kwargs)
+
+
+def limited(session, limiter: Optional[HostRateLimiter] = None):
+    """
+    session wrapped in LimitedClientSession, or session itself when RATE_LIMIT=0 or already wrapped.
+    """
+    if not RATE_LIMIT_ENABLED or isinstance(session, LimitedClientSession):
+        return session
+    return LimitedClientSession(session, limiter)
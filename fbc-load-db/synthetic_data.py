@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# ============================================================================
+#  © 2025 Francisco Vivas Puerto (aka “DaFrancc”)
+#  All rights reserved. This file is part of the FoodBankConnect tooling.
+#  You may use and distribute with proper attribution to the author.
+# ============================================================================
+
+"""
+Synthetic scrape output for loader benchmarks.
+
+Records are shaped like scrapers/foodbank_example.json, program_example.json and
+sponsor_example.json (including the scrapers' camelCase keys and "type" tags), and a
+fraction of them are deliberate duplicates:
+  - exact re-emissions of an earlier record (dropped by the pipeline's digest dedup)
+  - near duplicates with case/punctuation changes and a missing field (merged by entity resolution)
+
+Usage:
+    python synthetic_data.py 100k --out /tmp/synthetic      # writes /tmp/synthetic/synthetic.jsonl.gz
+    python main.py --from-checkpoint /tmp/synthetic         # replays it through the loader
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import gzip
+import json
+import random
+import argparse
+import pathlib
+from collections import deque
+from typing import Any, Dict, Iterator, List
+
+# Share of each record kind in the generated stream (the rest are sponsors).
+FOODBANK_SHARE = 0.1
+PROGRAM_SHARE = 0.6
+DUPLICATE_RATE = float(os.getenv("SYNTHETIC_DUPLICATE_RATE", "0.05"))
+RECENT_POOL = 2000          # earlier records duplicates are drawn from
+
+_CITIES = [
+    ("Austin", "TX", "787"), ("Dallas", "TX", "752"), ("Houston", "TX", "770"), ("San Antonio", "TX", "782"),
+    ("El Paso", "TX", "799"), ("Denver", "CO", "802"), ("Phoenix", "AZ", "850"), ("Atlanta", "GA", "303"),
+    ("Chicago", "IL", "606"), ("Seattle", "WA", "981"), ("Portland", "OR", "972"), ("Boston", "MA", "021"),
+    ("Wilmington", "DE", "198"), ("Nashville", "TN", "372"), ("Omaha", "NE", "681"), ("Tucson", "AZ", "857"),
+]
+_ADJECTIVES = ["Central", "North", "Greater", "Community", "Hope", "Harvest", "Unity", "Riverside",
+               "Capital", "Heartland", "Good Neighbor", "Second Harvest", "Valley", "Lakeside", "Summit"]
+_FB_KINDS = ["Food Bank", "Food Pantry", "Hunger Relief Center", "Community Kitchen", "Food Network"]
+_PROGRAM_KINDS = [("Culinary Training Program", "class"), ("Mobile Food Pantry", "distribution"),
+                  ("SNAP Outreach", "service"), ("Nutrition Education", "class"),
+                  ("Senior Grocery Program", "distribution"), ("Kids Cafe", "meal"),
+                  ("Volunteer Shift", "volunteer"), ("Weekend Backpack Program", "distribution")]
+_SPONSOR_KINDS = ["Foundation", "Grocers", "Markets", "Bank", "Health", "Farms", "Corporation", "Trust"]
+_AFFILIATIONS = ["Private Corporation", "Nonprofit", "Private Foundation", "Government", "Faith-based"]
+_CONTRIBUTIONS = ["Food Sourcing", "Funding", "Volunteers", "Logistics", "Equipment"]
+_LANGUAGES = ["English", "Spanish", "Vietnamese", "Chinese", "Arabic", "French"]
+_SERVICES = [k for k, _ in _PROGRAM_KINDS] + ["Emergency Food Assistance", "Disaster Relief"]
+_URGENCY = ["Low", "Medium", "High", "Very High"]
+_FREQUENCY = ["Weekly", "Monthly", "Yearly", "Daily", "One-time"]
+_ABOUT = ("{name} serves families in {city} and the surrounding area, distributing food through partner "
+          "agencies and community programs and helping fight food insecurity across the region. ")
+
+
+def parse_size(text: str) -> int:
+    """
+    Parses row counts like "1000", "100k" or "1M".
+    """
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def _slug(name: str) -> str:
+    return "-".join("".join(ch for ch in name.lower() if ch.isalnum() or ch == " ").split())
+
+
+def _foodbank(rng: random.Random, i: int) -> Dict[str, Any]:
+    city, state, zip3 = rng.choice(_CITIES)
+    name = f"{rng.choice(_ADJECTIVES)} {city} {rng.choice(_FB_KINDS)} {i}"
+    return {
+        "about": _ABOUT.format(name=name, city=city),
+        "capacity": f"{rng.randrange(500, 80000, 500)} meals/week",
+        "city": city,
+        "eligibility": "No ID required for most programs; income guidelines may apply for certain assistance",
+        "image": f"https://foodbankconnect.me/images/{_slug(name)}.jpg",
+        "languages": rng.sample(_LANGUAGES, rng.randint(1, 3)),
+        "name": name,
+        "phone": f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+        "services": rng.sample(_SERVICES, rng.randint(2, 6)),
+        "state": state,
+        "type": "foodbank",
+        "urgency": rng.choice(_URGENCY),
+        "website": f"https://www.{_slug(name).replace('-', '')}.org/",
+        "zipcode": f"{zip3}{rng.randint(0, 99):02d}",
+    }
+
+
+def _program(rng: random.Random, i: int, hosts: List[str]) -> Dict[str, Any]:
+    kind, program_type = rng.choice(_PROGRAM_KINDS)
+    host = rng.choice(hosts) if hosts else "Food Bank"
+    name = f"{kind} {i}"
+    return {
+        "name": name,
+        "program_type": program_type,
+        "eligibility": rng.choice(["Open to all", "High School GED", "Ages 60+", "Families with children"]),
+        "frequency": rng.choice(_FREQUENCY),
+        "cost": rng.choice(["Free", "Free", "Sliding scale"]),
+        "host": host,
+        "detailsPage": _slug(name),
+        "about": f"{kind} offered by {host}. " * rng.randint(1, 3),
+        "sign_up_link": f"https://foodbankconnect.me/programs/{_slug(name)}/signup",
+        "type": "program",
+    }
+
+
+def _sponsor(rng: random.Random, i: int) -> Dict[str, Any]:
+    city, state, _ = rng.choice(_CITIES)
+    name = f"{rng.choice(_ADJECTIVES)} {rng.choice(_SPONSOR_KINDS)} {i}"
+    return {
+        "name": name,
+        "image": f"/images/{_slug(name)}.png",
+        "alt": f"{name} Logo",
+        "contribution": rng.choice(_CONTRIBUTIONS),
+        "contributionAmt": rng.choice([f"{rng.randrange(1000, 500000, 1000)} Pounds", f"${rng.randrange(500, 250000, 500)}", "N/A"]),
+        "affiliation": rng.choice(_AFFILIATIONS),
+        "pastInvolvement": f"{rng.choice(_ADJECTIVES)} Food Pantry",
+        "about": f"{name} supports hunger relief programs in {city}. " * rng.randint(1, 2),
+        "sponsor_link": f"https://www.{_slug(name).replace('-', '')}.com/about-us",
+        "type": "sponsor",
+        "city": city,
+        "state": state,
+        "EIN": f"{10_000_000 + i * 7919 % 89_999_999:09d}",
+    }
+
+
+def _near_duplicate(rng: random.Random, rec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Same entity as rec, spelled the way a second scraper might report it.
+    """
+    dup = dict(rec)
+    dup["name"] = rng.choice([str.upper, str.lower, lambda s: s + ", Inc."])(rec["name"])
+    optional = [k for k in ("about", "image", "phone", "sign_up_link", "alt") if k in dup]
+    if optional:
+        dup.pop(rng.choice(optional))
+    return dup
+
+
+def generate(n: int, seed: int = 0, duplicate_rate: float = DUPLICATE_RATE) -> Iterator[Dict[str, Any]]:
+    """
+    Yields n records (duplicates included) deterministically for a given seed,
+    holding only a small pool of recent records in memory.
+    """
+    rng = random.Random(seed)
+    recent: deque = deque(maxlen=RECENT_POOL)
+    hosts: deque = deque(maxlen=RECENT_POOL)
+    for i in range(n):
+        if recent and rng.random() < duplicate_rate:
+            rec = rng.choice(recent)
+            yield dict(rec) if rng.random() < 0.5 else _near_duplicate(rng, rec)
+            continue
+        roll = rng.random()
+        if roll < FOODBANK_SHARE or not hosts:
+            rec = _foodbank(rng, i)
+            hosts.append(rec["name"])
+        elif roll < FOODBANK_SHARE + PROGRAM_SHARE:
+            rec = _program(rng, i, hosts)
+        else:
+            rec = _sponsor(rng, i)
+        recent.append(rec)
+        yield rec
+
+
+def write_jsonl(path: pathlib.Path, rows: Iterator[Dict[str, Any]]) -> int:
+    """
+    Writes rows as gzip JSONL (the scrape checkpoint format); returns the row count.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for row in rows:
+            fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic scrape output for loader benchmarks.")
+    parser.add_argument("size", type=parse_size, help="rows to generate, e.g. 1k, 100k, 1M")
+    parser.add_argument("--out", default=".", help="directory for synthetic.jsonl.gz")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-rate", type=float, default=DUPLICATE_RATE)
+    args = parser.parse_args(argv)
+    path = pathlib.Path(args.out) / "synthetic.jsonl.gz"
+    n = write_jsonl(path, generate(args.size, args.seed, args.duplicate_rate))
+    print(f"Wrote {n} rows to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -24,13 +24,23 @@ Behavior:
 
 from __future__ import annotations
 
+import io
 import os
 import re
+import csv
+import json
+import time
 import uuid
+import base64
+import hashlib
 import logging
+import functools
+import threading
+from collections import OrderedDict
+from urllib.parse import urlencode
 from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Flask, jsonify, request, g
+from flask import Flask, Response, jsonify, redirect, request, g, stream_with_context
 from flask_cors import CORS
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine, Row
@@ -52,8 +62,22 @@ DATABASE_URL = os.getenv(
 )
 
 DB_SCHEMA = os.getenv("DB_SCHEMA", "app")
-MAX_PAGE_SIZE = 100000000
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "100"))
+RELATED_DEFAULT_SIZE = int(os.getenv("RELATED_DEFAULT_SIZE", "10"))
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+# Under Lambda, awsgi buffers the whole response (and Lambda caps it at 6 MB), so
+# exports are written to this bucket and answered with a presigned-URL redirect.
+EXPORT_BUCKET = os.getenv("EXPORT_BUCKET", "")
+EXPORT_URL_TTL_SECS = int(os.getenv("EXPORT_URL_TTL_SECS", "900"))
+RUNNING_IN_LAMBDA = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "200"))
+SCHEMA_CACHE_TTL_SECS = float(os.getenv("SCHEMA_CACHE_TTL_SECS", "300"))
 REQUEST_LOG_LEVEL = os.getenv("REQUEST_LOG_LEVEL", "INFO").upper()
+DATASET_VERSION_TTL_SECS = float(os.getenv("DATASET_VERSION_TTL_SECS", "30"))
+CACHE_MAX_AGE_SECS = int(os.getenv("CACHE_MAX_AGE_SECS", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_TTL_SECS = float(os.getenv("RESPONSE_CACHE_TTL_SECS", "300"))
 
 ALLOWED_TYPES: Dict[str, str] = {
     "foodbanks": "foodbank",
@@ -61,6 +85,15 @@ ALLOWED_TYPES: Dict[str, str] = {
     "sponsors": "sponsor",
 }
 
+# Chart dimensions per resource; must match FACET_DIMENSIONS in fbc-load-db/main.py,
+# which precomputes counts for every single dimension and every pair.
+FACET_DIMENSIONS: Dict[str, Tuple[str, ...]] = {
+    "foodbanks": ("state", "city", "urgency", "capacity", "eligibility"),
+    "programs": ("program_type", "frequency", "cost", "eligibility"),
+    "sponsors": ("affiliation", "contribution", "state", "city"),
+}
+FACET_MAX_DIMENSIONS = 2
+
 _IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
 
@@ -110,6 +143,39 @@ def json_error(status: int, code: str, message: str, *, details: Dict[str, Any]
     return jsonify(payload), status
 
 
+def _database_error(e: Exception, *, table: Optional[str] = None):
+    """
+    Maps a database/runtime exception raised while serving a request to a structured JSON error.
+    """
+    if isinstance(e, ProgrammingError):
+        # Handles missing relations and syntax errors; returns descriptive output.
+        # The schema may have changed underneath us, so reflect again next time.
+        schema_registry.invalidate()
+        msg = str(e.__cause__ or e)
+        logger.exception("programming error")
+        details: Dict[str, Any] = {"reason": msg}
+        if table:
+            details["table"] = table
+        return json_error(500, "DatabaseProgrammingError", "Database query failed.", details=details)
+    if isinstance(e, OperationalError):
+        # Handles network, authentication, DNS, TLS errors.
+        msg = str(e.__cause__ or e)
+        logger.exception("operational error")
+        return json_error(503, "DatabaseUnavailable", "Database connection failed.", details={"reason": msg})
+    if isinstance(e, SQLAlchemyTimeout):
+        # Handles DB timeout while executing statements.
+        logger.exception("database timeout")
+        return json_error(504, "DatabaseTimeout", "Database operation timed out.")
+    if isinstance(e, IntegrityError):
+        # Not expected in read-only paths, but included for completeness.
+        msg = str(e.__cause__ or e)
+        logger.exception("integrity error")
+        return json_error(500, "DatabaseIntegrityError", "Database integrity error.", details={"reason": msg})
+    # Catch-all for unexpected errors; logs the stack trace and returns opaque details to clients.
+    logger.exception("unhandled error")
+    return json_error(500, "InternalServerError", "Unexpected error occurred.", details={"reason": str(e)})
+
+
 def _validate_ident(name: str) -> str:
     """
     Validates that the provided name is a simple, unquoted PostgreSQL identifier.
@@ -129,22 +195,117 @@ def _table_qualified(resource: str) -> str:
     return f"{SCHEMA}.{resource}"
 
 
-def _table_exists(table_qualified: string) -> bool:
+class SchemaRegistry:
     """
-    Returns True if the schema-qualified table exists.
+    Process-wide snapshot of the relations (tables and materialized views) in SCHEMA
+    and their columns. Reflected with one catalog query, then reused until
+    SCHEMA_CACHE_TTL_SECS elapse or the dataset version changes.
     """
-    schema, table = table_qualified.split(".", 1)
-    sql = text(
-        """
-        SELECT EXISTS (
-            SELECT 1
-            FROM information_schema.tables
-            WHERE table_schema = :schema AND table_name = :table
+
+    def __init__(self, ttl_secs: float):
+        self.ttl_secs = ttl_secs
+        self._relations: Dict[str, List[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _reflect(self) -> Dict[str, List[str]]:
+        # pg_class (unlike information_schema.tables) also lists materialized views.
+        sql = text(
+            """
+            SELECT c.relname, a.attname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE n.nspname = :schema AND c.relkind IN ('r', 'p', 'v', 'm')
+            ORDER BY c.relname, a.attnum
+            """
         )
+        relations: Dict[str, List[str]] = {}
+        with engine.connect() as conn:
+            for relname, attname in conn.execute(sql, {"schema": SCHEMA}):
+                cols = relations.setdefault(relname, [])
+                if attname:
+                    cols.append(attname)
+        return relations
+
+    def snapshot(self) -> Dict[str, List[str]]:
         """
-    )
-    with engine.connect() as conn:
-        return bool(conn.execute(sql, {"schema": schema, "table": table}).scalar())
+        Returns {relation: [columns in ordinal order]}, reflecting again when stale.
+        """
+        version = _dataset_version()
+        with self._lock:
+            now = time.monotonic()
+            stale = (
+                self._loaded_at is None
+                or now - self._loaded_at > self.ttl_secs
+                or version != self._version
+            )
+            if stale:
+                self._relations = self._reflect()
+                self._loaded_at = now
+                self._version = version
+            return self._relations
+
+    def has(self, relation: str) -> bool:
+        """
+        Returns True if the relation exists in SCHEMA.
+        """
+        return relation in self.snapshot()
+
+    def columns(self, relation: str) -> List[str]:
+        """
+        Returns the relation's column names in ordinal order ([] if missing).
+        """
+        return self.snapshot().get(relation, [])
+
+    def invalidate(self) -> None:
+        """
+        Forces the next lookup to reflect the catalog again.
+        """
+        with self._lock:
+            self._loaded_at = None
+
+
+schema_registry = SchemaRegistry(SCHEMA_CACHE_TTL_SECS)
+
+
+def _check_columns(resource: str, names, kind: str) -> None:
+    """
+    Raises ValueError unless every name is a column of the resource table.
+    Identifiers are interpolated into SQL, so this must run before any query is built.
+    """
+    columns = schema_registry.columns(resource)
+    unknown = [n for n in names if n not in columns]
+    if unknown:
+        raise ValueError(f"Unknown {kind}(s) for {resource}: {', '.join(unknown)}.")
+
+
+# ------------------------------------------------------------------------------
+# Sparse fieldsets
+# ------------------------------------------------------------------------------
+
+def _parse_fields(resource: str, raw: Optional[str]) -> Optional[List[str]]:
+    """
+    Parses and validates a comma-separated ?fields= list against the table's columns.
+    Returns None when no projection was requested; "id" is always included.
+    """
+    if raw is None:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    if not fields:
+        raise ValueError("Query parameter 'fields' must list at least one field.")
+    _check_columns(resource, fields, "field")
+    return fields if "id" in fields else ["id"] + fields
+
+
+def _select_list(fields: Optional[List[str]], extra: List[str] = ()) -> str:
+    """
+    Returns the SQL projection for a sparse fieldset (plus columns needed internally).
+    """
+    if fields is None:
+        return "*"
+    return ", ".join(dict.fromkeys(list(fields) + [c for c in extra if c not in fields]))
 
 
 # ------------------------------------------------------------------------------
@@ -162,43 +323,274 @@ def _row_to_dict(row: Row) -> Dict[str, Any]:
 # Data access
 # ------------------------------------------------------------------------------
 
-def fetch_one(resource: str, item_id: str) -> Optional[Dict[str, Any]]:
+def fetch_one(resource: str, item_id: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
     """
     Retrieves a single record by id from the specified resource table.
     Returns a dictionary if found, otherwise None.
     """
-    sql = text(f"SELECT * FROM {_table_qualified(resource)} WHERE id = :item_id")
+    sql = text(f"SELECT {_select_list(fields)} FROM {_table_qualified(resource)} WHERE id = :item_id")
     with engine.connect() as conn:
         row = conn.execute(sql, {"item_id": item_id}).first()
     return _row_to_dict(row) if row else None
 
 
+def fetch_many(resource: str, ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieves several records of one resource in a single indexed query.
+    Returns a mapping of id -> record; ids that do not exist are simply absent.
+    """
+    if not ids:
+        return {}
+    sql = text(f"SELECT {_select_list(fields)} FROM {_table_qualified(resource)} WHERE id = ANY(:ids)")
+    with engine.connect() as conn:
+        rows = conn.execute(sql, {"ids": list(ids)}).fetchall()
+    return {row.id: _row_to_dict(row) for row in rows}
+
+
+def _parse_ids(raw: str) -> List[str]:
+    """
+    Parses a comma-separated ?ids= list, de-duplicated in request order.
+    Raises ValueError when empty or longer than BATCH_MAX_IDS.
+    """
+    ids = list(dict.fromkeys(i.strip() for i in raw.split(",") if i.strip()))
+    if not ids:
+        raise ValueError("Query parameter 'ids' must list at least one id.")
+    if len(ids) > BATCH_MAX_IDS:
+        raise ValueError(f"At most {BATCH_MAX_IDS} ids may be requested at once.")
+    return ids
+
+
 def fetch_list(resource: str, start: Optional[str], size: int,
-               filters: Dict[str, Any] = None, sort: List[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+               filters: Dict[str, Any] = None, sort: List[str] = None,
+               fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    Retrieves a page of items using optional filtering and sorting.
-    Returns a list of dictionaries and a next_start cursor if available.
+    Retrieves a page of items using optional filtering, sorting and a sparse fieldset.
+    Pages by keyset (index seek) on the sort key tuple; returns a list of
+    dictionaries and an opaque next_start cursor only if another page exists.
     """
     n = _clamp_page_size(size)
-    base = f"SELECT * FROM {_table_qualified(resource)}"
-
     filters = filters or {}
     sort = sort or []
-
-    # Build WHERE and ORDER BY dynamically
-    filter_sort_sql, params = _apply_filters_and_sort(resource, filters, sort)
-
-    sql_str = base + filter_sort_sql + "\nLIMIT :n"
-    params["n"] = n
+    keys = _sort_keys(sort)
+    _check_columns(resource, [col for col, _ in keys[:-len(_ID_ORDER_EXPRS)]], "sort field")
+    table = _table_qualified(resource)
+    order_sql = _order_by_sql(keys)
+    # Sort columns are selected too (cursor values) and stripped from the output below.
+    sort_cols = [col for col, _ in keys[:-len(_ID_ORDER_EXPRS)]]
+    select_sql = _select_list(fields, sort_cols)
+
+    where_clauses, params = _apply_filters(resource, filters)
+    branches = _start_branches(start, sort, filters, keys, params) if start else [None]
+    params["n"] = n + 1  # one extra row tells us whether another page exists
+
+    selects = []
+    for branch in branches:
+        clauses = where_clauses + ([branch] if branch else [])
+        where_sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+        selects.append(f"SELECT {select_sql} FROM {table}{where_sql}{order_sql}\nLIMIT :n")
+    if len(selects) == 1:
+        sql_str = selects[0]
+    else:
+        # Each branch is an independent index seek; merge them and re-apply the order.
+        sql_str = (
+            "SELECT * FROM (" + " UNION ALL ".join(f"({sel})" for sel in selects) + ") AS page"
+            + order_sql + "\nLIMIT :n"
+        )
 
     with engine.connect() as conn:
         rows = conn.execute(text(sql_str), params).fetchall()
 
-    items = [_row_to_dict(r) for r in rows]
-    next_start = items[-1]["id"] if items else None
+    items = [_row_to_dict(r) for r in rows[:n]]
+    next_start = None
+    if len(rows) > n:
+        next_start = _encode_cursor(sort, filters, _row_sort_values(items[-1], keys))
+    hidden = [c for c in sort_cols if fields is not None and c not in fields]
+    if hidden:
+        for item in items:
+            for c in hidden:
+                item.pop(c, None)
     return items, next_start
 
 
+def fetch_related(resource: str, item_id: str, related: str, size: int,
+                  fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Retrieves items of another resource linked to one record, best links first.
+    Served by a single join on the loader-built links view (see fbc-load-db).
+    """
+    n = _clamp_page_size(size)
+    cols = "t.*" if fields is None else ", ".join(f"t.{c}" for c in fields)
+    sql = text(
+        f"""
+        SELECT {cols}, l.reason AS related_by
+        FROM {_table_qualified("links")} AS l
+        JOIN {_table_qualified(related)} AS t ON t.id = l.dst_id
+        WHERE l.src_model = :resource AND l.src_id = :item_id AND l.dst_model = :related
+        ORDER BY l.rank
+        LIMIT :n
+        """
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(sql, {"resource": resource, "item_id": item_id, "related": related, "n": n}).fetchall()
+    return [_row_to_dict(r) for r in rows]
+
+
+EXPORT_FORMATS: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _csv_cell(value: Any) -> Any:
+    """
+    Flattens JSONB values (lists/objects) into JSON text for a CSV cell.
+    """
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _export_sort_keys(resource: str, sort: Optional[List[str]]) -> List[Tuple[str, bool]]:
+    """
+    Validates an export ?sort= list like the list route does and returns its ORDER BY keys.
+    """
+    keys = _sort_keys(sort or [])
+    _check_columns(resource, [col for col, _ in keys[:-len(_ID_ORDER_EXPRS)]], "sort field")
+    return keys
+
+
+def stream_export(resource: str, fmt: str, filters: Optional[Dict[str, Any]] = None,
+                  fields: Optional[List[str]] = None, sort: Optional[List[str]] = None):
+    """
+    Yields a whole resource as NDJSON lines or CSV text, one chunk per EXPORT_CHUNK_ROWS rows.
+    Rows come from a server-side cursor, so memory use does not grow with the table.
+    """
+    where_clauses, params = _apply_filters(resource, filters or {})
+    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    sql = text(
+        f"SELECT {_select_list(fields)} FROM {_table_qualified(resource)}{where_sql}"
+        f"{_order_by_sql(_export_sort_keys(resource, sort))}"
+    )
+    with engine.connect() as conn:
+        # stream_results makes the driver use a named (server-side) cursor.
+        result = conn.execution_options(stream_results=True).execute(sql, params)
+        columns = list(result.keys())
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(columns)
+            for chunk in result.partitions(EXPORT_CHUNK_ROWS):
+                writer.writerows([_csv_cell(v) for v in row] for row in chunk)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue()
+        else:
+            for chunk in result.partitions(EXPORT_CHUNK_ROWS):
+                yield "".join(app.json.dumps(_row_to_dict(row)) + "\n" for row in chunk)
+
+
+class _ExportReader(io.RawIOBase):
+    """
+    Read-only binary file over stream_export() chunks, for S3 multipart uploads.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buf = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buf = chunk.encode("utf-8")
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def export_to_s3(resource: str, fmt: str, filters: Optional[Dict[str, Any]] = None,
+                 fields: Optional[List[str]] = None, sort: Optional[List[str]] = None) -> str:
+    """
+    Uploads an export to EXPORT_BUCKET part by part and returns a presigned GET URL for it.
+    boto3 ships with the Lambda runtime, so it is imported only on this path.
+    """
+    import boto3
+
+    s3 = boto3.client("s3")
+    key = f"exports/{resource}/{uuid.uuid4().hex}.{fmt}"
+    reader = io.BufferedReader(_ExportReader(stream_export(resource, fmt, filters, fields, sort)))
+    s3.upload_fileobj(reader, EXPORT_BUCKET, key, ExtraArgs={"ContentType": EXPORT_FORMATS[fmt]})
+    return s3.generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": EXPORT_BUCKET,
+            "Key": key,
+            "ResponseContentDisposition": f'attachment; filename="{resource}.{fmt}"',
+        },
+        ExpiresIn=EXPORT_URL_TTL_SECS,
+    )
+
+
+def _parse_facet_dimensions(resource: str, raw: Optional[str]) -> List[str]:
+    """
+    Parses and validates a comma-separated ?by= list against FACET_DIMENSIONS.
+    """
+    dims = list(dict.fromkeys(d.strip() for d in (raw or "").split(",") if d.strip()))
+    if not dims:
+        raise ValueError("Query parameter 'by' must list at least one dimension.")
+    if len(dims) > FACET_MAX_DIMENSIONS:
+        raise ValueError(f"At most {FACET_MAX_DIMENSIONS} facet dimensions may be combined.")
+    unknown = [d for d in dims if d not in FACET_DIMENSIONS.get(resource, ())]
+    if unknown:
+        raise ValueError(f"Unknown facet dimension(s) for {resource}: {', '.join(unknown)}.")
+    return dims
+
+
+def fetch_facets(resource: str, dims: List[str],
+                 filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Counts rows per distinct combination of the given dimensions, largest first.
+    Unfiltered requests read the loader-built facet_counts view; filtered ones
+    (or a missing view) fall back to a GROUP BY on the live table.
+    Returns the buckets and the source used ("view" or "live").
+    """
+    if not filters:
+        sql = text(
+            f"""
+            SELECT bucket, count
+            FROM {_table_qualified("facet_counts")}
+            WHERE model = :model AND dimensions = :dimensions
+            ORDER BY count DESC, bucket::text
+            """
+        )
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(sql, {"model": resource, "dimensions": ",".join(sorted(dims))}).fetchall()
+            return [{**{d: r.bucket.get(d) for d in dims}, "count": r.count} for r in rows], "view"
+        except ProgrammingError as e:
+            if getattr(e.orig, "sqlstate", None) != "42P01":
+                raise
+            logger.warning("facet_counts view missing; counting on %s", resource)
+
+    where_clauses, params = _apply_filters(resource, filters or {})
+    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    cols = ", ".join(dims)
+    sql = text(
+        f"SELECT {cols}, count(*) AS count FROM {_table_qualified(resource)}{where_sql} "
+        f"GROUP BY {cols} ORDER BY count DESC, {cols}"
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [_row_to_dict(r) for r in rows], "live"
+
+
 def _clamp_page_size(size: Optional[int]) -> int:
     """
     Clamps the page size to [1, MAX_PAGE_SIZE]. Raises ValueError on overflow.
@@ -211,68 +603,189 @@ def _clamp_page_size(size: Optional[int]) -> int:
     return n
 
 
-def _order_numeric_first_sql() -> str:
+# ------------------------------------------------------------------------------
+# Keyset pagination
+# ------------------------------------------------------------------------------
+# Every list is ordered by the requested sort columns followed by a numeric-first
+# id tiebreaker, so the sort key tuple of the last row identifies a unique position.
+# The loader creates matching expression indexes (see ID_ORDER_SQL in fbc-load-db).
+# NULLs follow PostgreSQL's default placement: they sort as the largest value.
+
+_ID_NUMERIC_SQL = "id ~ '^[0-9]{1,18}$'"
+_ID_NUMERIC_RE = re.compile(r"[0-9]{1,18}")
+_ID_ORDER_EXPRS = (
+    f"(CASE WHEN {_ID_NUMERIC_SQL} THEN 0 ELSE 1 END)",
+    f"(CASE WHEN {_ID_NUMERIC_SQL} THEN id::bigint END)",
+    "id",
+)
+
+
+def _sort_keys(sort: List[str]) -> List[Tuple[str, bool]]:
     """
-    ORDER BY clause that places numeric ids first (ascending as bigint), then lexicographic ids.
+    Converts a sort list ("name", "-city") into (sql expression, descending) keys,
+    including the id tiebreaker. The tiebreaker follows the first column's direction.
     """
-    return """
-        ORDER BY
-            CASE WHEN id ~ '^[0-9]+$' THEN 0 ELSE 1 END,
-            (CASE WHEN id ~ '^[0-9]+$' THEN id::bigint END),
-            id
+    keys: List[Tuple[str, bool]] = []
+    for s in sort:
+        desc = s.startswith("-")
+        col = s[1:] if desc else s
+        if not _IDENT_RE.match(col):
+            raise ValueError(f"Invalid sort column '{col}'.")
+        keys.append((col, desc))
+    tie_desc = keys[0][1] if keys else False
+    return keys + [(expr, tie_desc) for expr in _ID_ORDER_EXPRS]
+
+
+def _order_by_sql(keys: List[Tuple[str, bool]]) -> str:
+    """
+    Builds the ORDER BY clause for the given sort keys.
     """
+    return " ORDER BY " + ", ".join(f"{expr} {'DESC' if desc else 'ASC'}" for expr, desc in keys)
 
 
-def _apply_cursor(base_select: str, start: Optional[str], n: int) -> Tuple[str, Dict[str, Any]]:
+def _cursor_value(value: Any) -> Any:
     """
-    Builds cursored list query:
-      - No start: numeric-first from beginning
-      - Numeric start: numeric ids >= start plus any non-numeric ids after
-      - Non-numeric start: lexicographic WHERE id >= start
+    Converts a row value into a JSON-safe cursor value PostgreSQL can compare against.
     """
-    params: Dict[str, Any] = {"n": n}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
 
-    if start is None:
-        return base_select + _order_numeric_first_sql() + "\nLIMIT :n", params
 
-    if str(start).isdigit():
-        params["start"] = start
-        return (
-            base_select
-            + """
-            WHERE
-                (id ~ '^[0-9]+$' AND CAST(id AS BIGINT) >= CAST(:start AS BIGINT))
-                OR (NOT id ~ '^[0-9]+$')
-            """
-            + _order_numeric_first_sql()
-            + "\nLIMIT :n",
-            params,
-        )
+def _row_sort_values(row: Dict[str, Any], keys: List[Tuple[str, bool]]) -> List[Any]:
+    """
+    Returns the sort key tuple of a row, mirroring the SQL tiebreaker expressions.
+    """
+    values = [_cursor_value(row.get(col)) for col, _ in keys[:-len(_ID_ORDER_EXPRS)]]
+    rid = str(row["id"])
+    numeric = _ID_NUMERIC_RE.fullmatch(rid) is not None
+    return values + [0 if numeric else 1, int(rid) if numeric else None, rid]
+
+
+def _filters_fingerprint(filters: Dict[str, Any]) -> str:
+    """
+    Returns a short digest of the filter set a cursor was issued for.
+    """
+    canon = json.dumps(sorted(filters.items()), separators=(",", ":"))
+    return hashlib.sha1(canon.encode("utf-8")).hexdigest()[:12]
+
+
+def _encode_cursor(sort: List[str], filters: Dict[str, Any], values: List[Any]) -> str:
+    """
+    Encodes the last sort key tuple (plus the sort/filter context) as an opaque token.
+    """
+    payload = {"s": sort, "f": _filters_fingerprint(filters), "k": values}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Decodes a cursor token. Returns None if the token is not a well-formed cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("k"), list):
+        return None
+    return payload
+
+
+def _start_branches(start: str, sort: List[str], filters: Dict[str, Any],
+                    keys: List[Tuple[str, bool]], params: Dict[str, Any]) -> List[str]:
+    """
+    Builds the WHERE condition(s) selecting rows strictly after the cursor position.
+    Bare numeric values are accepted for backwards compatibility and select ids >= start.
+    """
+    cursor = _decode_cursor(start)
+    if cursor is None:
+        if start.isdigit():
+            params["legacy_start"] = int(start)
+            return [
+                f"(({_ID_NUMERIC_SQL} AND CAST(id AS BIGINT) >= :legacy_start)"
+                f" OR (NOT {_ID_NUMERIC_SQL}))"
+            ]
+        raise ValueError("Query parameter 'start' is not a valid cursor.")
+    if cursor.get("s") != sort or cursor.get("f") != _filters_fingerprint(filters):
+        raise ValueError("Cursor 'start' was issued for a different sort or filter set.")
+    values = cursor["k"]
+    if len(values) != len(keys):
+        raise ValueError("Query parameter 'start' is not a valid cursor.")
+    return _keyset_branches(keys, values, params)
+
+
+def _after_sql(expr: str, desc: bool, value: Any, param: str) -> Optional[str]:
+    """
+    Condition for "expr sorts strictly after value"; None when nothing can (NULL in ASC).
+    """
+    if value is None:
+        return f"{expr} IS NOT NULL" if desc else None
+    return f"{expr} < :{param}" if desc else f"({expr} > :{param} OR {expr} IS NULL)"
+
+
+def _tuple_after_sql(keys: List[Tuple[str, bool]], values: List[Any], first: int) -> str:
+    """
+    Expands the lexicographic "keys[first:] sort after values[first:]" comparison
+    for mixed directions and NULLs.
+    """
+    branches = []
+    for i in range(first, len(keys)):
+        expr, desc = keys[i]
+        after = _after_sql(expr, desc, values[i], f"c{i}")
+        if after is None:
+            continue
+        equal = [
+            f"{keys[j][0]} IS NULL" if values[j] is None else f"{keys[j][0]} = :c{j}"
+            for j in range(first, i)
+        ]
+        branches.append("(" + " AND ".join(equal + [after]) + ")")
+    return "(" + (" OR ".join(branches) or "FALSE") + ")"
+
+
+def _keyset_branches(keys: List[Tuple[str, bool]], values: List[Any], params: Dict[str, Any]) -> List[str]:
+    """
+    Splits "row after cursor" into conditions that each start with a plain range
+    (or IS NULL) test on the leading key, so every branch is a single index seek.
+    """
+    for i, v in enumerate(values):
+        if v is not None:
+            params[f"c{i}"] = v
+
+    lead, desc = keys[0]
+    tail = _tuple_after_sql(keys, values, 1)
+    if values[0] is None:
+        # Inside the NULL segment: ASC puts it last, DESC puts it first.
+        branches = [f"({lead} IS NULL AND {tail})"]
+        if desc:
+            branches.append(f"{lead} IS NOT NULL")
+        return branches
+
+    op, strict = ("<=", "<") if desc else (">=", ">")
+    branches = [f"({lead} {op} :c0 AND ({lead} {strict} :c0 OR ({lead} = :c0 AND {tail})))"]
+    if not desc:
+        branches.append(f"{lead} IS NULL")
+    return branches
 
-    params["start"] = start
-    return (
-        base_select
-        + """
-        WHERE id >= :start
-        ORDER BY id
-        LIMIT :n
-        """,
-        params,
-    )
 
 # ------------------------------------------------------------------------------
-# Filtering and sorting helper
+# Filtering helper
 # ------------------------------------------------------------------------------
 
-def _apply_filters_and_sort(resource: str, filters: Dict[str, Any], sort: List[str]) -> Tuple[str, Dict[str, Any]]:
+def _apply_filters(resource: str, filters: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any]]:
     """
-    Builds dynamic SQL WHERE and ORDER BY clauses for filtering and sorting.
+    Builds dynamic SQL WHERE clauses (to be AND-ed) for filtering.
+    Raises ValueError for names that are not columns of the resource.
     """
-    where_clauses = []
-    order_clauses = []
+    _check_columns(resource, filters, "filter field")
+    where_clauses: List[str] = []
     params: Dict[str, Any] = {}
 
-    # --- Filters ---
     for i, (col, val) in enumerate(filters.items()):
         param = f"f{i}"
 
@@ -289,22 +802,200 @@ def _apply_filters_and_sort(resource: str, filters: Dict[str, Any], sort: List[s
             where_clauses.append(f"{col} = :{param}")
             params[param] = val
 
-    where_sql = ""
-    if where_clauses:
-        where_sql = " WHERE " + " AND ".join(where_clauses)
+    return where_clauses, params
 
-    # --- Sorting ---
-    for s in sort:
-        if s.startswith("-"):
-            order_clauses.append(f"{s[1:]} DESC")
-        else:
-            order_clauses.append(f"{s} ASC")
 
-    order_sql = ""
-    if order_clauses:
-        order_sql = " ORDER BY " + ", ".join(order_clauses)
+# ------------------------------------------------------------------------------
+# Search helpers
+# ------------------------------------------------------------------------------
+
+_SEARCH_TERM_RE = re.compile(r"[^\W_]+")
 
-    return where_sql + order_sql, params
+
+def _search_terms(q_lower: str) -> List[str]:
+    """
+    Splits a lowercased query into unique alphanumeric terms safe to embed in a tsquery.
+    """
+    return list(dict.fromkeys(_SEARCH_TERM_RE.findall(q_lower)))
+
+
+def _search_snippet(text: str, phrase: str, terms: List[str]) -> str:
+    """
+    Returns ~150 chars of surrounding text around the first match.
+    """
+    text_lower = text.lower()
+    # Try to find the query phrase first, then individual terms
+    idx = text_lower.find(phrase)
+    if idx != -1:
+        start = max(0, idx - 60)
+        end = min(len(text), idx + len(phrase) + 60)
+        return text[start:end]
+    # Fall back to first matching term
+    for term in terms:
+        if len(term) > 2:  # Skip very short terms
+            idx = text_lower.find(term)
+            if idx != -1:
+                start = max(0, idx - 60)
+                end = min(len(text), idx + len(term) + 60)
+                return text[start:end]
+    # If no match found, return beginning of text
+    return text[:150] if len(text) > 150 else text
+
+
+# ------------------------------------------------------------------------------
+# Dataset version (written by fbc-load-db after every load)
+# ------------------------------------------------------------------------------
+
+_dataset_version_state: Dict[str, Any] = {"version": None, "checked_at": float("-inf")}
+
+
+def _dataset_version() -> Optional[str]:
+    """
+    Returns the loader-stamped dataset version, re-read at most every
+    DATASET_VERSION_TTL_SECS. Returns None if no version has been stamped.
+    """
+    now = time.monotonic()
+    if now - _dataset_version_state["checked_at"] < DATASET_VERSION_TTL_SECS:
+        return _dataset_version_state["version"]
+
+    version = None
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(
+                text(f"SELECT version FROM {_table_qualified('dataset_version')} WHERE id = 1")
+            ).scalar()
+    except Exception as e:
+        logger.warning("dataset version unavailable: %s", e)
+    _dataset_version_state.update(version=version, checked_at=now)
+    return version
+
+
+# ------------------------------------------------------------------------------
+# In-process response cache
+# ------------------------------------------------------------------------------
+
+class ResponseCache:
+    """
+    Bounded LRU cache of serialized JSON bodies with a per-entry TTL.
+    All entries belong to a single dataset version and are dropped when it changes.
+    """
+
+    def __init__(self, max_entries: int, ttl_secs: float):
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Optional[str]) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: str, version: Optional[str]) -> Optional[str]:
+        """
+        Returns the cached body for key, or None on a miss or expired entry.
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_secs:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, version: Optional[str], body: str) -> None:
+        """
+        Stores a body, evicting the least recently used entries beyond max_entries.
+        """
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic(), body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns counters used to size the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_secs": self.ttl_secs,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "dataset_version": self._version,
+            }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECS)
+
+
+def _cache_key() -> str:
+    """
+    Normalized cache key: path plus query parameters sorted by name and value.
+    """
+    return request.path + "?" + urlencode(sorted(request.args.items(multi=True)))
+
+
+def _json_with_request_id(body: str):
+    """
+    Builds a JSON response from a cached body (serialized without request_id).
+    """
+    rid = json.dumps(_request_id())
+    body = body[:-1] + (f',"request_id":{rid}}}' if body != "{}" else f'"request_id":{rid}}}')
+    return app.response_class(body, mimetype="application/json")
+
+
+def cached_response(view):
+    """
+    Serves successful JSON responses of the wrapped view from response_cache.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if RESPONSE_CACHE_MAX_ENTRIES <= 0:
+            return view(*args, **kwargs)
+        key = _cache_key()
+        version = _dataset_version()
+        body = response_cache.get(key, version)
+        if body is not None:
+            resp = _json_with_request_id(body)
+            resp.headers["X-Cache"] = "HIT"
+            return resp
+
+        resp = app.make_response(view(*args, **kwargs))
+        if resp.status_code == 200 and resp.mimetype == "application/json":
+            payload = resp.get_json()
+            if isinstance(payload, dict):
+                payload.pop("request_id", None)
+                response_cache.put(key, version, app.json.dumps(payload))
+        resp.headers["X-Cache"] = "MISS"
+        return resp
+    return wrapper
+
+
+def _is_versioned_request() -> bool:
+    """
+    True for read requests whose responses depend only on the loaded dataset.
+    """
+    return request.method in ("GET", "HEAD") and request.path.startswith("/v1/")
 
 
 # ------------------------------------------------------------------------------
@@ -326,11 +1017,34 @@ def _assign_request_id_and_log():
     )
 
 
+@app.before_request
+def _conditional_get():
+    """
+    Records the dataset version as the ETag of /v1 reads. The If-None-Match check happens
+    in _after, once the route has validated the request, so only would-be 200s become 304s.
+    """
+    if not _is_versioned_request():
+        return None
+    version = _dataset_version()
+    if version:
+        g.etag = version
+    return None
+
+
 @app.after_request
 def _after(resp):
     """
-    Adds request id header to all responses.
+    Adds request id header to all responses, plus dataset-versioned ETag and
+    Cache-Control headers to successful /v1 reads (304 when If-None-Match matches).
     """
+    etag = getattr(g, "etag", None)
+    if etag and resp.status_code == 200:
+        if request.if_none_match.contains_weak(etag):
+            resp.close()                                 # e.g. an export stream not yet started
+            resp = Response(status=304)
+        # Weak: the version ignores load timestamps (created_at, fetched_at) that bodies still carry.
+        resp.set_etag(etag, weak=True)
+        resp.headers["Cache-Control"] = f"public, max-age={CACHE_MAX_AGE_SECS}"
     resp.headers["X-Request-Id"] = _request_id()
     return resp
 
@@ -353,8 +1067,17 @@ def health():
         return json_error(500, "HealthCheckFailed", "Database connectivity check failed.", details={"reason": str(e)})
 
 
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Reports in-process response cache counters for this container.
+    """
+    return jsonify({**response_cache.stats(), "request_id": _request_id()})
+
+
 @app.get("/v1/<resource>")
 @app.get("/v1/<resource>/<item_id>")
+@cached_response
 def handle_resource(resource: str, item_id: Optional[str] = None):
     """
     Serves a collection or a single item for the specified resource.
@@ -364,7 +1087,7 @@ def handle_resource(resource: str, item_id: Optional[str] = None):
 
     table = _table_qualified(resource)
     try:
-        if not _table_exists(table):
+        if not schema_registry.has(resource):
             return json_error(
                 503,
                 "ServiceNotReady",
@@ -372,13 +1095,33 @@ def handle_resource(resource: str, item_id: Optional[str] = None):
                 details={"schema": SCHEMA, "missing": [table]},
             )
 
+        try:
+            fields = _parse_fields(resource, request.args.get("fields"))
+        except ValueError as ve:
+            return json_error(400, "BadRequest", str(ve), details={"fields": request.args.get("fields")})
+
         if item_id:
-            obj = fetch_one(resource, item_id)
+            obj = fetch_one(resource, item_id, fields)
             if not obj:
                 singular = {"foodbanks": "Foodbank", "programs": "Program", "sponsors": "Sponsor"}.get(resource, "Item")
                 return json_error(404, "NotFound", f"{singular} not found.", details={"id": item_id})
             return jsonify({"type": ALLOWED_TYPES[resource], **obj, "request_id": _request_id()})
 
+        if "ids" in request.args:
+            extra = [k for k in request.args if k not in ("ids", "fields")]
+            try:
+                if extra:
+                    raise ValueError(f"Query parameter 'ids' cannot be combined with: {', '.join(extra)}.")
+                ids = _parse_ids(request.args["ids"])
+            except ValueError as ve:
+                return json_error(400, "BadRequest", str(ve), details={"max_ids": BATCH_MAX_IDS})
+            found = fetch_many(resource, ids, fields)
+            return jsonify({
+                "items": [found[i] for i in ids if i in found],
+                "missing": [i for i in ids if i not in found],
+                "request_id": _request_id(),
+            })
+
         # -----------------------------
         # Filtering and sorting support
         # -----------------------------
@@ -386,7 +1129,7 @@ def handle_resource(resource: str, item_id: Optional[str] = None):
         sort = []
 
         for key, val in request.args.items():
-            if key in ("start", "size"):
+            if key in ("start", "size", "fields"):
                 continue
             elif key == "sort":
                 sort = [s.strip() for s in val.split(",") if s.strip()]
@@ -400,44 +1143,216 @@ def handle_resource(resource: str, item_id: Optional[str] = None):
             return json_error(400, "BadRequest", "Query parameter 'size' must be an integer.")
 
         try:
-            items, next_start = fetch_list(resource, request.args.get("start"), size, filters, sort)
+            items, next_start = fetch_list(resource, request.args.get("start"), size, filters, sort, fields)
         except ValueError as ve:
-            return json_error(400, "BadRequest", str(ve), details={"max_size": MAX_PAGE_SIZE})
+            details = {"max_size": MAX_PAGE_SIZE} if size > MAX_PAGE_SIZE else None
+            return json_error(400, "BadRequest", str(ve), details=details)
 
         payload: Dict[str, Any] = {"items": items, "request_id": _request_id()}
         if next_start:
             payload["next_start"] = next_start
         return jsonify(payload)
 
+    except Exception as e:
+        return _database_error(e, table=table)
+
+# ------------------------------------------------------------------------------
+# Relationship endpoints
+# ------------------------------------------------------------------------------
+
+@app.get("/v1/<resource>/<item_id>/<related>")
+@cached_response
+def handle_related(resource: str, item_id: str, related: str):
+    """
+    Serves the items of `related` linked to one record, e.g. /v1/foodbanks/12/programs.
+    """
+    if resource not in ALLOWED_TYPES:
+        return json_error(404, "NotFound", "Unknown resource.", details={"resource": resource})
+    if related not in ALLOWED_TYPES or related == resource:
+        return json_error(404, "NotFound", "Unknown relationship.", details={"resource": resource, "related": related})
+
+    links_table = _table_qualified("links")
+    try:
+        try:
+            fields = _parse_fields(related, request.args.get("fields"))
+        except ValueError as ve:
+            return json_error(400, "BadRequest", str(ve), details={"fields": request.args.get("fields")})
+
+        try:
+            size_str = request.args.get("size")
+            size = int(size_str) if size_str else RELATED_DEFAULT_SIZE
+            items = fetch_related(resource, item_id, related, size, fields)
+        except ValueError as ve:
+            return json_error(400, "BadRequest", str(ve), details={"max_size": MAX_PAGE_SIZE})
+
+        # An empty result is only a 404 when the source record itself is missing.
+        if not items and not fetch_one(resource, item_id, ["id"]):
+            singular = ALLOWED_TYPES[resource].capitalize()
+            return json_error(404, "NotFound", f"{singular} not found.", details={"id": item_id})
+
+        return jsonify({
+            "items": items,
+            "resource": resource,
+            "id": item_id,
+            "related": related,
+            "request_id": _request_id(),
+        })
+
     except ProgrammingError as e:
-        # Handles missing relations and syntax errors; returns descriptive output.
-        msg = str(e.__cause__ or e)
-        logger.exception("programming error")
-        return json_error(500, "DatabaseProgrammingError", "Database query failed.", details={"reason": msg, "table": table})
-    except OperationalError as e:
-        # Handles network, authentication, DNS, TLS errors.
-        msg = str(e.__cause__ or e)
-        logger.exception("operational error")
-        return json_error(503, "DatabaseUnavailable", "Database connection failed.", details={"reason": msg})
-    except SQLAlchemyTimeout as e:
-        # Handles DB timeout while executing statements.
-        logger.exception("database timeout")
-        return json_error(504, "DatabaseTimeout", "Database operation timed out.")
-    except IntegrityError as e:
-        # Not expected in read-only paths, but included for completeness.
-        msg = str(e.__cause__ or e)
-        logger.exception("integrity error")
-        return json_error(500, "DatabaseIntegrityError", "Database integrity error.", details={"reason": msg})
+        if getattr(e.orig, "sqlstate", None) == "42P01":
+            return json_error(
+                503,
+                "ServiceNotReady",
+                "Relationship index is missing.",
+                details={"schema": SCHEMA, "missing": [links_table]},
+            )
+        return _database_error(e, table=links_table)
+    except Exception as e:
+        return _database_error(e, table=links_table)
+
+# ------------------------------------------------------------------------------
+# Batch get endpoint
+# ------------------------------------------------------------------------------
+
+@app.post("/v1/batch")
+def handle_batch():
+    """
+    Returns many records, possibly of different resources, in request order.
+    Body: {"items": [{"resource": "foodbanks", "id": "12"}, ...]}; one query per resource.
+    """
+    body = request.get_json(silent=True)
+    refs = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(refs, list) or not refs:
+        return json_error(400, "BadRequest", "Body must be a JSON object with a non-empty 'items' list.")
+    if len(refs) > BATCH_MAX_IDS:
+        return json_error(400, "BadRequest", f"At most {BATCH_MAX_IDS} items may be requested at once.",
+                          details={"max_ids": BATCH_MAX_IDS})
+
+    wanted: Dict[str, List[str]] = {}
+    for ref in refs:
+        if not isinstance(ref, dict) or ref.get("resource") not in ALLOWED_TYPES or ref.get("id") in (None, ""):
+            return json_error(400, "BadRequest", "Each item needs a known 'resource' and an 'id'.",
+                              details={"item": ref, "allowed": list(ALLOWED_TYPES)})
+        ids = wanted.setdefault(ref["resource"], [])
+        if str(ref["id"]) not in ids:
+            ids.append(str(ref["id"]))
+
+    found: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    try:
+        for resource, ids in wanted.items():
+            found[resource] = fetch_many(resource, ids)
+    except Exception as e:
+        return _database_error(e)
+
+    items: List[Dict[str, Any]] = []
+    missing: List[Dict[str, str]] = []
+    for ref in refs:
+        resource, item_id = ref["resource"], str(ref["id"])
+        obj = found[resource].get(item_id)
+        if obj is None:
+            missing.append({"resource": resource, "id": item_id})
+        else:
+            items.append({"type": ALLOWED_TYPES[resource], **obj})
+    return jsonify({"items": items, "missing": missing, "request_id": _request_id()})
+
+# ------------------------------------------------------------------------------
+# Bulk export endpoint
+# ------------------------------------------------------------------------------
+
+@app.get("/v1/<resource>/export")
+def handle_export(resource: str):
+    """
+    Streams a whole (optionally filtered and sorted) collection, e.g. /v1/programs/export?format=csv.
+    Replaces very large ?size= list requests for analytics consumers; start/size are ignored.
+    Under Lambda the response would be buffered by awsgi, so when EXPORT_BUCKET is set the
+    export goes to S3 and the client is redirected (303) to a presigned URL. Without a bucket,
+    Lambda exports stay limited to its 6 MB response payload.
+    """
+    if resource not in ALLOWED_TYPES:
+        return json_error(404, "NotFound", "Unknown resource.", details={"resource": resource})
+
+    fmt = (request.args.get("format") or "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        return json_error(400, "BadRequest", "Unsupported export format.", details={"allowed": list(EXPORT_FORMATS)})
+
+    table = _table_qualified(resource)
+    try:
+        if not schema_registry.has(resource):
+            return json_error(
+                503,
+                "ServiceNotReady",
+                "Required database table is missing.",
+                details={"schema": SCHEMA, "missing": [table]},
+            )
+        try:
+            fields = _parse_fields(resource, request.args.get("fields"))
+        except ValueError as ve:
+            return json_error(400, "BadRequest", str(ve), details={"fields": request.args.get("fields")})
+
+        # Validated up front: errors raised inside the stream cannot become a 400.
+        filters = {key: val for key, val in request.args.items()
+                   if key not in ("format", "fields", "sort", "start", "size")}
+        sort = [s.strip() for s in request.args.get("sort", "").split(",") if s.strip()]
+        try:
+            _check_columns(resource, filters, "filter field")
+            _export_sort_keys(resource, sort)
+        except ValueError as ve:
+            return json_error(400, "BadRequest", str(ve))
+
+        if RUNNING_IN_LAMBDA and EXPORT_BUCKET:
+            return redirect(export_to_s3(resource, fmt, filters, fields, sort), code=303)
     except Exception as e:
-        # Catch-all for unexpected errors; logs the stack trace and returns opaque details to clients.
-        logger.exception("unhandled error")
-        return json_error(500, "InternalServerError", "Unexpected error occurred.", details={"reason": str(e)})
+        return _database_error(e, table=table)
+
+    resp = Response(
+        stream_with_context(stream_export(resource, fmt, filters, fields, sort)),
+        mimetype=EXPORT_FORMATS[fmt],
+    )
+    resp.headers["Content-Disposition"] = f'attachment; filename="{resource}.{fmt}"'
+    return resp
+
+# ------------------------------------------------------------------------------
+# Facet / aggregate endpoint
+# ------------------------------------------------------------------------------
+
+@app.get("/v1/<resource>/facets")
+@cached_response
+def handle_facets(resource: str):
+    """
+    Serves counts grouped by up to two dimensions, e.g. /v1/sponsors/facets?by=affiliation,contribution.
+    Any other query parameters filter the counted rows like on the list route.
+    """
+    if resource not in ALLOWED_TYPES:
+        return json_error(404, "NotFound", "Unknown resource.", details={"resource": resource})
+
+    try:
+        dims = _parse_facet_dimensions(resource, request.args.get("by"))
+    except ValueError as ve:
+        return json_error(400, "BadRequest", str(ve), details={"allowed": list(FACET_DIMENSIONS[resource])})
+
+    filters = {key: val for key, val in request.args.items() if key != "by"}
+    table = _table_qualified(resource)
+    try:
+        buckets, source = fetch_facets(resource, dims, filters)
+    except ValueError as ve:
+        return json_error(400, "BadRequest", str(ve))
+    except Exception as e:
+        return _database_error(e, table=table)
+
+    return jsonify({
+        "by": dims,
+        "buckets": buckets,
+        "total": sum(b["count"] for b in buckets),
+        "source": source,
+        "request_id": _request_id(),
+    })
 
 # ------------------------------------------------------------------------------
 # Full-site search endpoint
 # ------------------------------------------------------------------------------
 
 @app.get("/v1/search")
+@cached_response
 def search_all():
     """
     Performs a full-site text search across foodbanks, programs, and sponsors.
@@ -448,79 +1363,60 @@ def search_all():
         return jsonify({"items": [], "request_id": _request_id()})
 
     q_lower = query.lower()
-    query_terms = re.findall(r"\b\w+\b", q_lower)
-    results: List[Dict[str, Any]] = []
+    query_terms = _search_terms(q_lower)
+    if not query_terms:
+        return jsonify({"items": [], "query": query, "request_id": _request_id()})
 
-    def relevance_score(text: str) -> int:
-        """Compute a simple relevance score based on phrase and word frequency."""
-        text_lower = text.lower()
-        phrase_score = text_lower.count(q_lower) * 3
-        word_score = sum(text_lower.count(term) for term in query_terms)
-        return phrase_score + word_score
-
-    def get_snippet(text: str) -> str:
-        """Return ~150 chars of surrounding text around the first match."""
-        text_lower = text.lower()
-        # Try to find the query phrase first, then individual terms
-        idx = text_lower.find(q_lower)
-        if idx != -1:
-            start = max(0, idx - 60)
-            end = min(len(text), idx + len(q_lower) + 60)
-            return text[start:end]
-        # Fall back to first matching term
-        for term in query_terms:
-            if len(term) > 2:  # Skip very short terms
-                idx = text_lower.find(term)
-                if idx != -1:
-                    start = max(0, idx - 60)
-                    end = min(len(text), idx + len(term) + 60)
-                    return text[start:end]
-        # If no match found, return beginning of text
-        return text[:150] if len(text) > 150 else text
+    try:
+        size_str = request.args.get("size")
+        k = int(size_str) if size_str else SEARCH_MAX_RESULTS
+    except ValueError:
+        return json_error(400, "BadRequest", "Query parameter 'size' must be an integer.")
+    k = max(1, min(k, SEARCH_MAX_RESULTS))
+
+    # Prefix-matching OR query so partially typed words still hit; ranking rewards
+    # documents matching more terms, name hits (weight A) and the whole phrase.
+    sql = text(
+        f"""
+        SELECT model, id, name, body,
+               ts_rank_cd(document, query, 32)
+                   + CASE WHEN strpos(lower(body), :phrase) > 0 THEN 1 ELSE 0 END AS score
+        FROM {_table_qualified("search_documents")}, to_tsquery('english', :tsquery) AS query
+        WHERE document @@ query
+        ORDER BY score DESC, model, id
+        LIMIT :k
+        """
+    )
+    params = {
+        "phrase": q_lower,
+        "tsquery": " | ".join(f"{term}:*" for term in query_terms),
+        "k": k,
+    }
 
-    with engine.connect() as conn:
-        for model in ALLOWED_TYPES.keys():
-            table = _table_qualified(model)
-            try:
-                # Get all rows and convert to searchable text
-                sql = text(f"SELECT * FROM {table}")
-                rows = conn.execute(sql).fetchall()
-
-                for row in rows:
-                    # Convert row to dict and create searchable text from all string fields
-                    row_dict = _row_to_dict(row)
-                    # Concatenate all text fields for searching
-                    text_parts = []
-                    for key, value in row_dict.items():
-                        if value is not None:
-                            if isinstance(value, (list, dict)):
-                                text_parts.append(str(value))
-                            else:
-                                text_parts.append(str(value))
-                    text_blob = " ".join(text_parts)
-                    
-                    score = relevance_score(text_blob)
-                    if score > 0:
-                        # Use the original model name (lowercase) to match route paths
-                        model_name = model  # e.g., "foodbanks", "programs", "sponsors"
-                        snippet = get_snippet(text_blob)
-                        # Clean up snippet - remove extra whitespace and newlines
-                        snippet = " ".join(snippet.split())[:150]
-                        
-                        results.append({
-                            "model": model_name,  # lowercase to match routes
-                            "id": row_dict.get("id", ""),
-                            "name": row_dict.get("name") or "(Unnamed)",
-                            "snippet": snippet,
-                            "score": score,
-                        })
-            except Exception as e:
-                logger.warning("Search failed for %s: %s", model, e)
-                logger.exception("Full error details")
-                continue
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+    except ProgrammingError as e:
+        if getattr(e.orig, "sqlstate", None) == "42P01":
+            return json_error(
+                503,
+                "ServiceNotReady",
+                "Search index is missing.",
+                details={"schema": SCHEMA, "missing": [_table_qualified("search_documents")]},
+            )
+        return _database_error(e, table=_table_qualified("search_documents"))
+    except Exception as e:
+        return _database_error(e)
 
-    # Sort by relevance (highest first)
-    results.sort(key=lambda r: r["score"], reverse=True)
+    results: List[Dict[str, Any]] = []
+    for row in rows:
+        results.append({
+            "model": row.model,  # lowercase to match routes
+            "id": row.id,
+            "name": row.name or "(Unnamed)",
+            "snippet": " ".join(_search_snippet(row.body or "", q_lower, query_terms).split())[:150],
+            "score": round(float(row.score), 4),
+        })
 
     return jsonify({
         "items": results,
@@ -0,0 +1,189 @@
+# tests/test_api_helpers.py
+# © 2025 Francisco Vivas. All rights reserved.
+#
+# Pure helper tests for fbc-rest-api/app.py; no database connection required.
+# Run with PYTHONPATH=fbc-rest-api (same as the CI unit-test job).
+
+import pytest
+
+import app as api
+
+# ----- Search ----------------------------------------------------------------
+
+def test_search_terms_are_unique_and_tsquery_safe():
+    assert api._search_terms("food bank & food | 'austin':*") == ["food", "bank", "austin"]
+    assert api._search_terms("__ !!") == []
+
+
+def test_search_snippet_prefers_phrase_then_terms():
+    text = "x" * 100 + " Central Food Bank " + "y" * 100
+    snippet = api._search_snippet(text, "food bank", ["food", "bank"])
+    assert "Food Bank" in snippet
+    assert len(snippet) <= len("food bank") + 120
+
+    assert api._search_snippet("short text", "zzz", ["zzz"]) == "short text"
+
+# ----- Keyset pagination -----------------------------------------------------
+
+def test_cursor_round_trip_and_tiebreaker_values():
+    keys = api._sort_keys(["-city"])
+    assert keys[0] == ("city", True)
+    assert all(desc for _, desc in keys)  # tiebreaker follows the first column
+
+    values = api._row_sort_values({"id": "42", "city": "Austin"}, keys)
+    assert values == ["Austin", 0, 42, "42"]
+    assert api._row_sort_values({"id": "fb_ut", "city": None}, keys) == [None, 1, None, "fb_ut"]
+
+    token = api._encode_cursor(["-city"], {"state": "TX"}, values)
+    assert api._decode_cursor(token)["k"] == values
+    assert api._decode_cursor("not a cursor!") is None
+
+
+def test_start_rejects_foreign_cursor_and_bad_sort_columns():
+    keys = api._sort_keys(["name"])
+    token = api._encode_cursor(["name"], {}, ["A", 0, 1, "1"])
+    with pytest.raises(ValueError):
+        api._start_branches(token, ["name"], {"state": "TX"}, keys, {})
+    with pytest.raises(ValueError):
+        api._sort_keys(["name;drop"])
+
+
+def test_keyset_branches_seek_on_leading_key():
+    keys = api._sort_keys(["name"])
+    params = {}
+    branches = api._keyset_branches(keys, ["A", 0, 1, "1"], params)
+    assert branches[0].startswith("(name >= :c0")
+    assert branches[1] == "name IS NULL"  # NULLs sort last in ascending order
+    assert params["c0"] == "A" and params["c2"] == 1
+
+    # Legacy numeric ?start= is still accepted as an id lower bound.
+    params = {}
+    assert len(api._start_branches("1", [], {}, api._sort_keys([]), params)) == 1
+    assert params["legacy_start"] == 1
+
+# ----- Sparse fieldsets ------------------------------------------------------
+
+def test_parse_fields_validates_against_columns(monkeypatch):
+    monkeypatch.setattr(api.schema_registry, "snapshot", lambda: {"foodbanks": ["id", "name", "city", "about"]})
+    assert api._parse_fields("foodbanks", None) is None
+    assert api._parse_fields("foodbanks", "name, city,name") == ["id", "name", "city"]
+    with pytest.raises(ValueError):
+        api._parse_fields("foodbanks", "name,secret")
+    assert api._select_list(["id", "name"], ["city"]) == "id, name, city"
+
+# ----- Conditional requests --------------------------------------------------
+
+def test_if_none_match_turns_successful_reads_into_304(monkeypatch):
+    monkeypatch.setattr(api, "_dataset_version", lambda: "abc123")
+    monkeypatch.setattr(api.schema_registry, "snapshot", lambda: {"foodbanks": ["id", "name"]})
+    monkeypatch.setattr(api, "fetch_list", lambda *args: ([{"id": "1", "name": "A"}], None))
+    monkeypatch.setattr(api, "RESPONSE_CACHE_MAX_ENTRIES", 0)
+    client = api.app.test_client()
+    r = client.get("/v1/foodbanks?size=2", headers={"If-None-Match": '"abc123"'})
+    assert r.status_code == 304 and r.data == b""
+    assert r.headers["ETag"] == 'W/"abc123"'  # weak: load timestamps are outside the version
+    assert "max-age" in r.headers["Cache-Control"]
+
+
+def test_if_none_match_does_not_mask_not_found_or_bad_requests(monkeypatch):
+    monkeypatch.setattr(api, "_dataset_version", lambda: "abc123")
+    monkeypatch.setattr(api.schema_registry, "snapshot", lambda: {"foodbanks": ["id", "name"]})
+    monkeypatch.setattr(api, "fetch_one", lambda *args: None)
+    monkeypatch.setattr(api, "RESPONSE_CACHE_MAX_ENTRIES", 0)
+    client = api.app.test_client()
+    match = {"If-None-Match": 'W/"abc123"'}
+    r = client.get("/v1/nope/123", headers=match)
+    assert r.status_code == 404 and "ETag" not in r.headers
+    assert client.get("/v1/foodbanks/does-not-exist", headers=match).status_code == 404
+    assert client.get("/v1/foodbanks?fields=bogus", headers=match).status_code == 400
+
+# ----- Response cache --------------------------------------------------------
+
+def test_response_cache_lru_ttl_and_version_invalidation(monkeypatch):
+    cache = api.ResponseCache(max_entries=2, ttl_secs=60)
+    cache.put("a", "v1", '{"x":1}')
+    cache.put("b", "v1", '{"x":2}')
+    assert cache.get("a", "v1") == '{"x":1}'
+    cache.put("c", "v1", '{"x":3}')  # evicts b, the least recently used
+    assert cache.get("b", "v1") is None and cache.evictions == 1
+
+    assert cache.get("a", "v2") is None  # new dataset version drops everything
+    assert cache.stats()["entries"] == 0 and cache.invalidations == 1
+
+    cache.put("d", "v2", "{}")
+    clock = iter([1000.0, 1000.0 + 61])
+    monkeypatch.setattr(api.time, "monotonic", lambda: next(clock))
+    cache.put("e", "v2", "{}")
+    assert cache.get("e", "v2") is None  # expired
+
+# ----- Relationships ---------------------------------------------------------
+
+def test_related_route_rejects_self_and_unknown_relationships(monkeypatch):
+    monkeypatch.setattr(api, "_dataset_version", lambda: None)
+    client = api.app.test_client()
+    assert client.get("/v1/foodbanks/1/foodbanks").status_code == 404
+    r = client.get("/v1/foodbanks/1/donors")
+    assert r.status_code == 404 and r.get_json()["error"] == "NotFound"
+
+# ----- Facets ----------------------------------------------------------------
+
+def test_parse_facet_dimensions_whitelist_and_limit():
+    assert api._parse_facet_dimensions("sponsors", "affiliation, contribution,affiliation") == [
+        "affiliation", "contribution"]
+    for raw in (None, "name", "state,city,urgency"):
+        with pytest.raises(ValueError):
+            api._parse_facet_dimensions("foodbanks", raw)
+
+# ----- Export ----------------------------------------------------------------
+
+def test_export_rejects_unknown_format_and_flattens_csv_cells():
+    client = api.app.test_client()
+    r = client.get("/v1/foodbanks/export?format=xml")
+    assert r.status_code == 400 and r.get_json()["details"]["allowed"] == ["ndjson", "csv"]
+    assert api._csv_cell(["English", "Spanish"]) == '["English", "Spanish"]'
+    assert api._csv_cell("Austin") == "Austin"
+
+
+def test_export_accepts_sort_ignores_paging_and_redirects_to_s3_under_lambda(monkeypatch):
+    monkeypatch.setattr(api.schema_registry, "snapshot", lambda: {"foodbanks": ["id", "name", "state"]})
+    calls = []
+    monkeypatch.setattr(api, "stream_export", lambda *args: calls.append(args) or iter(['{"id": "1"}\n']))
+    client = api.app.test_client()
+    r = client.get("/v1/foodbanks/export?state=TX&sort=-name&size=50&start=abc")
+    assert r.status_code == 200 and r.data == b'{"id": "1"}\n'
+    assert calls == [("foodbanks", "ndjson", {"state": "TX"}, None, ["-name"])]
+    assert client.get("/v1/foodbanks/export?sort=zipcode").status_code == 400
+
+    monkeypatch.setattr(api, "RUNNING_IN_LAMBDA", True)
+    monkeypatch.setattr(api, "EXPORT_BUCKET", "exports")
+    monkeypatch.setattr(api, "export_to_s3", lambda *args: "https://s3.example/signed")
+    r = client.get("/v1/foodbanks/export?format=csv")
+    assert r.status_code == 303 and r.headers["Location"] == "https://s3.example/signed"
+
+    reader = api.io.BufferedReader(api._ExportReader(iter(["ab", "", "cdé"])), buffer_size=2)
+    assert reader.read() == "abcdé".encode("utf-8")
+
+# ----- Batch get -------------------------------------------------------------
+
+def test_parse_ids_keeps_request_order_and_enforces_limit(monkeypatch):
+    assert api._parse_ids("7, 3,7,,5") == ["7", "3", "5"]
+    monkeypatch.setattr(api, "BATCH_MAX_IDS", 2)
+    with pytest.raises(ValueError):
+        api._parse_ids("1,2,3")
+    with pytest.raises(ValueError):
+        api._parse_ids(" , ")
+
+
+def test_batch_rejects_malformed_bodies():
+    client = api.app.test_client()
+    assert client.post("/v1/batch", json={"items": []}).status_code == 400
+    assert client.post("/v1/batch", json={"items": [{"resource": "users", "id": "1"}]}).status_code == 400
+
+
+def test_filter_and_sort_names_are_checked_against_the_registry(monkeypatch):
+    monkeypatch.setattr(api.schema_registry, "snapshot", lambda: {"foodbanks": ["id", "name", "state"]})
+    assert api._apply_filters("foodbanks", {"state": "TX"})[0] == ["state = :f0"]
+    with pytest.raises(ValueError):
+        api._apply_filters("foodbanks", {"state = state OR 1=1 --": "x"})
+    with pytest.raises(ValueError):
+        api.fetch_list("foodbanks", None, 10, sort=["zipcode"])
@@ -0,0 +1,612 @@
+# tests/test_loader_helpers.py
+# © 2025 Francisco Vivas. All rights reserved.
+#
+# Pure helper tests for fbc-load-db/main.py; no database connection required.
+# Run with PYTHONPATH=fbc-load-db.
+
+import pytest
+
+import main as loader
+
+# ----- COPY bulk load --------------------------------------------------------
+
+def test_copy_text_escapes_and_encodes_json():
+    assert loader._copy_text(None, False) == "\\N"
+    assert loader._copy_text("a\tb\\c\nd", False) == "a\\tb\\\\c\\nd"
+    assert loader._copy_text(12, False) == "12"
+    assert loader._copy_text({"k": "x\ty"}, True) == '{"k": "x\\\\ty"}'
+    assert loader._copy_text(None, True) == "\\N"
+
+
+def test_copy_stream_reads_in_chunks():
+    stream = loader._CopyStream(iter(["abc\n", "de\n", "f\n"]))
+    assert stream.read(5) == "abc\nd"
+    assert stream.read(100) == "e\nf\n"
+    assert stream.read(5) == ""
+
+# ----- Incremental upsert ----------------------------------------------------
+
+def test_content_hash_applies_defaults_and_ignores_key_order():
+    a = loader.content_hash(loader.FoodBank, {"id": "1", "name": "Austin", "city": "Austin"})
+    b = loader.content_hash(loader.FoodBank, {"city": "Austin", "name": "Austin", "id": "1", "languages": []})
+    assert a == b
+    assert a != loader.content_hash(loader.FoodBank, {"id": "1", "name": "Austin", "city": "Dallas"})
+
+
+def test_chunks_split_evenly():
+    assert list(loader._chunks([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+
+# ----- Blue/green swap -------------------------------------------------------
+
+class _RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, stmt, *args):
+        self.statements.append(str(stmt))
+
+
+def test_swap_only_touches_catalog_and_moves_every_relation():
+    s = _RecordingSession()
+    loader.swap_in_staging(s, "app", "app_staging")
+    assert s.statements[0].startswith("SET LOCAL lock_timeout")
+    moved = [st for st in s.statements if "SET SCHEMA app" in st]
+    assert len(moved) == len(loader.RESOURCE_MODELS) + len(loader.DERIVED_VIEWS)
+    assert not any(st.startswith(("INSERT", "DELETE", "UPDATE")) for st in s.statements)
+    assert loader.staging_schema_name("app") == "app_staging"
+
+# ----- Dataset version -------------------------------------------------------
+
+class _ChecksumResult:
+    def __init__(self, row):
+        self.row = row
+
+    def one(self):
+        return self.row
+
+
+class _TablesSession:
+    """Evaluates the checksum query's `to_jsonb(t) - 'col'` row hashing over in-memory rows."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def execute(self, stmt, *args):
+        import hashlib, json, re
+        sql = str(stmt)
+        dropped = re.findall(r"- '(\w+)'", sql)
+        rows = self.tables[re.search(r"FROM (\w+) AS t", sql).group(1)]
+        md5 = lambda s: hashlib.md5(s.encode()).hexdigest()
+        agg = "".join(md5(json.dumps({k: v for k, v in r.items() if k not in dropped}, sort_keys=True))
+                      for r in sorted(rows, key=lambda r: r["id"]))
+        return _ChecksumResult((len(rows), md5(agg) if rows else ""))
+
+
+def test_dataset_checksum_ignores_load_timestamps():
+    def load(stamp, name="Austin Food Bank"):
+        row = {"id": "1", "name": name, "created_at": stamp, "fetched_at": stamp}
+        return _TablesSession({table: [row] for table in loader.VERSIONED_TABLES})
+
+    first = loader.dataset_checksum(load("2025-01-01T00:00:00Z"))
+    assert loader.dataset_checksum(load("2025-02-01T12:30:00Z")) == first
+    assert loader.dataset_checksum(load("2025-01-01T00:00:00Z", name="Dallas Food Bank"))[0] != first[0]
+
+# ----- Derived views ---------------------------------------------------------
+
+def test_links_sql_joins_each_edge_type_separately_and_caps_every_direction():
+    sql = loader.LINKS_SQL
+    assert " OR " not in sql.upper()                        # no OR joins forcing nested loops
+    assert sql.count(f"WHERE rank <= {loader.LINKS_PER_ITEM}") == 6
+    assert sql.count(f"LIMIT {loader.LINKS_PER_ITEM}") == 4  # city/state walks, both directions
+    assert set(loader.LINK_INDEX_DDL) == {"foodbanks", "sponsors"}
+
+
+class _MatviewResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class _MatviewSession(_RecordingSession):
+    def __init__(self, views):
+        super().__init__()
+        self.views = views
+
+    def execute(self, stmt, *args):
+        super().execute(stmt, *args)
+        return _MatviewResult(self.views.get(args[0]["name"]) if args else None)
+
+
+def test_derived_views_refresh_concurrently_and_recreate_on_definition_change():
+    import hashlib
+    tag = {name: hashlib.sha256(sql.encode("utf-8")).hexdigest() for name, (sql, _) in loader.DERIVED_VIEWS.items()}
+    s = _MatviewSession({"search_documents": (True, tag["search_documents"]), "links": (True, "stale")})
+    loader.refresh_derived_views(s)
+    refreshes = [st for st in s.statements if st.startswith("REFRESH")]
+    assert refreshes == [
+        "REFRESH MATERIALIZED VIEW CONCURRENTLY search_documents",
+        "REFRESH MATERIALIZED VIEW links",
+        "REFRESH MATERIALIZED VIEW facet_counts",
+    ]
+    assert "DROP MATERIALIZED VIEW links" in s.statements
+    assert sum(st.startswith("CREATE MATERIALIZED VIEW") for st in s.statements) == 2
+    # Every view needs a unique index for REFRESH ... CONCURRENTLY.
+    assert all(any("UNIQUE INDEX" in ddl for ddl in ddls) for _, ddls in loader.DERIVED_VIEWS.values())
+
+# ----- Streaming pipeline ----------------------------------------------------
+
+def test_batch_pipeline_flushes_fixed_size_batches_and_drops_duplicates():
+    flushed = []
+    pipeline = loader.BatchPipeline(lambda model, batch, bucket: flushed.append((bucket, len(batch))), batch_size=2)
+    rows = [{"name": f"fb{i}"} for i in range(5)] + [{"name": "fb0"}, {"name": "p", "host": "fb0"}]
+    counts = pipeline.feed(iter(rows))
+    assert counts == {"foodbank": 5, "program": 1, "sponsor": 0}
+    assert pipeline.duplicates == 1
+    assert flushed == [("foodbank", 2), ("foodbank", 2), ("foodbank", 1), ("program", 1)]
+
+
+def test_scraper_rows_accept_lists_generators_and_async_generators():
+    import scraper
+
+    async def agen():
+        yield {"a": 1}
+        yield {"a": 2}
+
+    async def coro():
+        return [{"c": 1}]
+
+    assert list(scraper._iter_rows(lambda: [{"l": 1}])) == [{"l": 1}]
+    assert list(scraper._iter_rows(lambda: ({"g": i} for i in range(2)))) == [{"g": 0}, {"g": 1}]
+    assert list(scraper._iter_rows(agen)) == [{"a": 1}, {"a": 2}]
+    assert list(scraper._iter_rows(coro)) == [{"c": 1}]
+    assert list(scraper._iter_rows(lambda: None)) == []
+    with pytest.raises(TypeError):
+        list(scraper._iter_rows(lambda: {"not": "a list"}))
+
+# ----- Stable ids ------------------------------------------------------------
+
+class _EmptyResult:
+    def all(self):
+        return []
+
+    def scalar(self):
+        return None
+
+
+class _EmptyIdMapSession(_RecordingSession):
+    def execute(self, stmt, *args):
+        super().execute(stmt, *args)
+        return _EmptyResult()
+
+
+def test_stable_ids_are_order_independent_and_drop_key_collisions():
+    rows = [{"name": "A", "city": "Austin"}, {"name": "B", "ein": "12"}, {"name": "A", "city": "Austin", "about": "x"}]
+    first = loader.StableIds(_EmptyIdMapSession(), "app")
+    out = first.assign(loader.Sponsor, [dict(r) for r in rows], "sponsor")
+    assert [r["id"] for r in out] == ["1", "2"]
+    assert first.duplicates == 1
+
+    # A reload that sees rows in a different order reuses the persisted mapping.
+    second = loader.StableIds(_EmptyIdMapSession(), "app")
+    second.ids = {"sponsors": dict(first.ids["sponsors"])}
+    second.next_id, second.taken, second.used = {"sponsors": 3}, {"sponsors": {"1", "2"}}, {"sponsors": set()}
+    out = second.assign(loader.Sponsor, [{"name": "B", "ein": "12"}, {"name": "A", "city": "Austin"}], "sponsor")
+    assert [r["id"] for r in out] == ["2", "1"]
+
+
+def test_na_placeholders_do_not_become_natural_keys():
+    assert loader.make_stable_id({"name": "C", "ein": "N/A"}, "sponsor").startswith("sponsor:nm:")
+
+# ----- Entity resolution -----------------------------------------------------
+
+def test_canonical_keys_unify_scraper_spellings():
+    row = loader._canonical_row({"EIN": "1", "contributionAmt": "N/A", "contribution_amt": 5, "detailsPage": "x"})
+    assert row == {"ein": "1", "contribution_amt": 5, "details_page": "x"}
+
+
+def test_entity_resolver_blocks_and_merges_fieldwise():
+    rows = [
+        {"name": "Central Texas Food Bank, Inc.", "city": "Austin", "zipcode": "78744", "about": "N/A"},
+        {"name": "central texas food bank", "city": "AUSTIN", "about": "Feeds people", "languages": ["English"]},
+        {"name": "Central Texas Foodbank", "city": "Round Rock", "zipcode": "78744-1234", "phone": "555"},
+        {"name": "Acme Foundation", "EIN": "12-345", "affiliation": "Private"},
+        {"name": "ACME Foundation Inc", "ein": "12345", "affiliation": "Private", "contributionAmt": 100},
+        {"name": "Acme Foundation", "ein": "999", "affiliation": "Private"},
+    ]
+    out = list(loader.EntityResolver().resolve(rows))
+    assert len(out) == 3
+    fb, acme, other = out
+    assert fb["about"] == "Feeds people" and fb["phone"] == "555" and fb["languages"] == ["English"]
+    assert acme["contribution_amt"] == 100
+    assert other["ein"] == "999"    # conflicting EINs never merge
+
+
+def test_entity_resolver_state_grows_with_entities_not_rows():
+    resolver = loader.EntityResolver()
+    for i in range(300):
+        resolver.add({"name": f"Harvest Food Bank {i % 3}", "city": "Austin", "zipcode": "78744", "phone": str(i)})
+    assert len(resolver.records) == len(resolver.parent) == len(resolver.names) == 3
+
+# ----- Parallel table writers ------------------------------------------------
+
+class _NullSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, *args, **kwargs):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_failed_table_writer_aborts_the_others(monkeypatch):
+    import threading
+
+    def fake_insert(session, model, batch, bucket, strategy):
+        if bucket == "sponsor":
+            raise ValueError("boom")
+        return len(batch)
+
+    monkeypatch.setattr(loader, "get_session", lambda engine: _NullSession())
+    monkeypatch.setattr(loader, "insert_rows", fake_insert)
+    abort = threading.Event()
+    writers = {b: loader.TableWriter(None, m, b, "copy", "app", "app_staging", False, abort)
+               for b, m in loader.BUCKET_MODELS.items()}
+    for w in writers.values():
+        w.start()
+    with pytest.raises(RuntimeError):
+        for i in range(100):
+            for w in writers.values():
+                w.put([{"id": str(i)}])
+    for w in writers.values():
+        w.close()
+    assert isinstance(writers["sponsor"].error, ValueError)
+    assert abort.is_set()
+
+
+class _LiveResult(_EmptyResult):
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return "found"
+
+
+class _LiveTablesSession(_RecordingSession, _NullSession):
+    """
+    Every live table exists; id_map lookups return `mapping`.
+    """
+
+    def __init__(self, mapping=()):
+        super().__init__()
+        self.mapping = list(mapping)
+
+    def execute(self, stmt, *args, **kwargs):
+        super().execute(stmt, *args)
+        return _LiveResult(self.mapping if "natural_key" in str(stmt) else [])
+
+
+def test_keep_existing_reload_replaces_live_row_instead_of_duplicating_its_id(monkeypatch):
+    import threading
+
+    row = {"name": "Austin Food Bank", "city": "Austin", "state": "TX", "type": "foodbank"}
+    key = loader.make_stable_id({k: v for k, v in row.items() if k != "type"}, "foodbank")
+    ids = loader.StableIds(_LiveTablesSession([(key, "1")]), "app")
+    batch = ids.assign(loader.FoodBank, [dict(row)], "foodbank")
+    assert batch[0]["id"] == "1"                       # re-scraped entity gets its live id back
+
+    session = _LiveTablesSession()
+    monkeypatch.setattr(loader, "get_session", lambda engine: session)
+    monkeypatch.setattr(loader, "ensure_list_indexes", lambda s, tables: None)
+    monkeypatch.setattr(loader, "insert_rows",
+                        lambda s, model, items, bucket, strategy: s.statements.append(f"COPY id={items[0]['id']}") or 1)
+    writer = loader.TableWriter(None, loader.FoodBank, "foodbank", "copy", "app", "app_staging", True,
+                                threading.Event())
+    writer.start()
+    writer.put(batch)
+    writer.close()
+    assert writer.error is None
+    seed = [q for q in session.statements if q.startswith("INSERT INTO app_staging.foodbanks")]
+    assert len(seed) == 1 and seed[0].endswith("ON CONFLICT (id) DO NOTHING")
+    assert session.statements.index("COPY id=1") < session.statements.index(seed[0])   # fresh row wins
+
+
+# ----- Scrape checkpoints ----------------------------------------------------
+
+def test_checkpoints_publish_only_clean_runs_and_replay(tmp_path):
+    import queue
+    import threading
+    import scraper
+
+    good = tmp_path / "good.py"
+    good.write_text("def scrape():\n    yield {'name': 'A'}\n    yield {'name': 'B', 'n': 1}\n")
+    bad = tmp_path / "bad.py"
+    bad.write_text("def scrape():\n    yield {'name': 'C'}\n    raise RuntimeError('boom')\n")
+    ckpt = tmp_path / "ckpt"
+    q = queue.Queue()
+    for f in (good, bad):
+        scraper._produce(f, q, threading.Event(), ckpt)
+
+    assert scraper.checkpoint_path(good, ckpt).exists()
+    assert not scraper.checkpoint_path(bad, ckpt).exists()
+    assert scraper.checkpoint_path(bad, ckpt, partial=True).exists()
+    assert sorted(r["name"] for r in scraper.replay_checkpoints(ckpt)) == ["A", "B", "C"]
+
+    # Resuming replays the complete checkpoint without importing the scraper again.
+    good.write_text("raise SystemExit('must not run')\n")
+    q = queue.Queue()
+    scraper._produce(good, q, threading.Event(), ckpt, resume=True)
+    rows = []
+    while not q.empty():
+        _, item = q.get_nowait()
+        if item is not scraper._DONE:
+            rows.append(item)
+    assert rows == [{"name": "A"}, {"name": "B", "n": 1}]
+
+# ----- Load report -----------------------------------------------------------
+
+def test_load_report_times_stages_exclusively_and_writes_json(tmp_path):
+    import json
+    import time
+
+    report = loader.LoadReport()
+
+    def slow_source():
+        for i in range(3):
+            time.sleep(0.01)
+            yield i
+
+    with report.stage("classify_dedup"):
+        assert list(report.timed(slow_source(), "scrape")) == [0, 1, 2]
+        with report.stage("insert.foodbanks", rows=3):
+            report.round_trip(2)
+
+    stages = report.to_dict()["stages"]
+    assert stages["scrape"]["rows"] == 3 and stages["scrape"]["secs"] >= 0.03
+    assert stages["classify_dedup"]["secs"] < 0.01     # nested stage time is not double counted
+    assert stages["insert.foodbanks"]["round_trips"] == 2
+    path = report.write(str(tmp_path))
+    assert json.loads(open(path).read())["stages"]["scrape"]["calls"] == 4
+
+
+def test_load_report_measures_rss_growth_per_stage_not_the_process_peak(monkeypatch):
+    rss = iter([100.0, 150.0, 150.0, 120.0])
+    monkeypatch.setattr(loader, "_current_rss_mb", lambda: next(rss))
+    report = loader.LoadReport()
+    with report.stage("grow"):
+        pass
+    with report.stage("release"):
+        pass
+    data = report.to_dict()
+    assert data["stages"]["grow"]["rss_delta_mb"] == 50.0
+    assert data["stages"]["release"]["rss_delta_mb"] == -30.0
+    assert "peak_rss_mb" not in data["stages"]["grow"] and data["process_peak_rss_mb"] > 0
+
+# ----- Synthetic benchmark data ----------------------------------------------
+
+def test_synthetic_data_is_deterministic_and_dedups_through_the_pipeline():
+    import synthetic_data
+
+    assert [synthetic_data.parse_size(s) for s in ("1000", "100k", "1M", "2.5k")] == [1000, 100_000, 1_000_000, 2500]
+    rows = list(synthetic_data.generate(2000, seed=3, duplicate_rate=0.1))
+    assert rows == list(synthetic_data.generate(2000, seed=3, duplicate_rate=0.1))
+    assert {r["type"] for r in rows} == {"foodbank", "program", "sponsor"}
+
+    counts = loader.BatchPipeline(lambda model, batch, bucket: None).feed(
+        loader.EntityResolver().resolve(iter(rows)))
+    assert 1700 < sum(counts.values()) < 1900     # ~10% duplicates removed
+
+
+def test_process_executor_streams_rows_and_kills_worker_on_cancel(tmp_path):
+    import os
+    import queue
+    import threading
+    import scraper
+
+    ok = tmp_path / "ok.py"
+    ok.write_text("import os\ndef scrape():\n    return [{'pid': os.getpid()} for _ in range(1200)] + ['junk']\n")
+    rows = list(scraper._iter_process(ok, threading.Event()))
+    assert len(rows) == 1200 and rows[0]["pid"] != os.getpid()
+
+    spin = tmp_path / "spin.py"
+    spin.write_text("def scrape():\n    yield {'name': 'first'}\n    while True:\n        pass\n")
+    cancelled = threading.Event()
+    threading.Timer(1.5, cancelled.set).start()
+    q = queue.Queue()
+    scraper._produce(spin, q, cancelled, executor="process")
+    assert scraper.SCRAPER_STATS["spin"] == dict(scraper.SCRAPER_STATS["spin"], rows=1, status="cancelled")
+    assert not [p for p in scraper.multiprocessing.active_children() if p.name == "scraper-spin"]
+
+
+def test_async_scrapers_share_one_loop_and_http_session(tmp_path):
+    pytest.importorskip("aiohttp")
+    import queue
+    import threading
+    import scraper
+
+    body = ("import asyncio\n"
+            "async def scrape(session=None):\n"
+            "    await asyncio.sleep(0.2)\n"
+            "    return [{'session': id(session), 'loop': id(asyncio.get_running_loop())}]\n")
+    files = []
+    for name in ("one", "two"):
+        f = tmp_path / f"{name}.py"
+        f.write_text(body)
+        files.append(f)
+
+    q = queue.Queue()
+    try:
+        threads = [threading.Thread(target=scraper._produce, args=(f, q, threading.Event())) for f in files]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        scraper._close_shared_loop()
+    rows = [item for _, item in list(q.queue) if item is not scraper._DONE]
+    assert len(rows) == 2 and rows[0] == rows[1] and rows[0]["session"] != id(None)
+
+
+def test_timed_out_scrapers_hand_over_partial_rows(tmp_path, monkeypatch):
+    import scraper
+
+    (tmp_path / "coop.py").write_text(
+        "import time\n"
+        "def scrape(cancelled=None):\n"
+        "    rows = []\n"
+        "    while not cancelled.is_set():\n"
+        "        time.sleep(0.05)\n"
+        "        rows.append({'name': 'coop %d' % len(rows)})\n"
+        "    return rows\n")
+    (tmp_path / "stubborn.py").write_text("import time\ndef scrape():\n    time.sleep(10)\n    return [{'name': 'late'}]\n")
+    (tmp_path / "scrapers.txt").write_text("coop.py\nstubborn.py\n")
+    monkeypatch.setattr(scraper, "SCRAPERS_DIR", tmp_path)
+    monkeypatch.setattr(scraper, "LIST_FILE", tmp_path / "scrapers.txt")
+    monkeypatch.setattr(scraper, "CHECKPOINTS_ENABLED", False)
+    monkeypatch.setattr(scraper, "SCRAPER_TIMEOUT_SECS", 0.5)
+    monkeypatch.setattr(scraper, "SCRAPER_CANCEL_GRACE_SECS", 0.5)
+
+    rows = list(scraper.scrape_stream())
+    assert rows and all(r["name"].startswith("coop") for r in rows)
+    assert scraper.SCRAPER_STATS["coop"]["status"] == "cancelled"
+    assert scraper.SCRAPER_STATS["stubborn"]["status"] == "abandoned"
+
+# ----- HTTP cache ------------------------------------------------------------
+
+def test_http_cache_serves_fresh_revalidates_stale_and_evicts(tmp_path, monkeypatch):
+    import io
+    import pathlib
+    import requests
+    import scraper
+
+    http_cache = scraper._load_module(pathlib.Path(scraper.__file__).parent / "scrapers" / "http_cache.py")
+    assert http_cache.cache_key("get", "https://X.org/a?b=2", {"a": 1}) == \
+        http_cache.cache_key("GET", "https://x.org/a?a=1&b=2")
+
+    sent = []
+
+    def fake_send(adapter, request, **kwargs):
+        sent.append(dict(request.headers))
+        resp = requests.Response()
+        resp.status_code = 304 if request.headers.get("If-None-Match") == '"v1"' else 200
+        resp.headers["ETag"] = '"v1"'
+        resp._content = b"" if resp.status_code == 304 else b'{"ok": 1}'
+        resp.raw = io.BytesIO(resp._content)
+        resp.url = request.url
+        return resp
+
+    monkeypatch.setattr(requests.adapters.HTTPAdapter, "send", fake_send)
+    cache = http_cache.HTTPCache(str(tmp_path), max_bytes=1000)
+    session = requests.Session()
+    session.mount("https://", http_cache.CachingAdapter(cache))
+
+    first = session.get("https://x.org/a", params={"q": 1}, headers={"X-Cache-TTL": "0"})
+    assert first.json() == {"ok": 1} and not hasattr(first, "from_cache") and "X-Cache-TTL" not in sent[0]
+    stale = session.get("https://x.org/a", params={"q": 1})          # stored already expired -> 304
+    assert stale.from_cache and stale.json() == {"ok": 1} and sent[-1]["If-None-Match"] == '"v1"'
+    assert session.get("https://x.org/a", params={"q": 1}).from_cache and len(sent) == 2
+    assert (cache.hits, cache.revalidated, cache.misses) == (1, 1, 1)
+
+    for i in range(200):
+        cache.put(f"k{i}", "https://x.org/b?key=secret", 200, {}, b"x" * 10)
+    assert cache._conn().execute("SELECT SUM(size) FROM responses").fetchone()[0] <= 1000
+    assert cache.get("k199") is not None and cache.get("k0") is None
+    assert "secret" not in cache._conn().execute("SELECT url FROM responses WHERE key = 'k199'").fetchone()[0]
+
+# ----- Per-host rate limiting ------------------------------------------------
+
+def test_rate_limiter_buckets_per_host_and_honours_retry_after(monkeypatch):
+    import io
+    import pathlib
+    import requests
+    import scraper
+
+    rate_limit = scraper._load_module(pathlib.Path(scraper.__file__).parent / "scrapers" / "rate_limit.py")
+    assert rate_limit.parse_limits("a.org=2/5, b.org=0.5") == {"a.org": (2.0, 5.0), "b.org": (0.5, 1.0)}
+    assert rate_limit.parse_retry_after("3") == 3.0 and rate_limit.parse_retry_after("soon") is None
+
+    limiter = rate_limit.HostRateLimiter({"slow.org": (10.0, 2.0)}, default=(1000.0, 1000.0))
+    waits = [limiter.bucket("https://slow.org/x").reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0] and 0.09 < waits[2] < 0.11 and 0.19 < waits[3] < 0.21
+    assert limiter.bucket("https://fast.org/x").reserve() == 0.0          # other hosts are not held up
+
+    statuses = [429, 200]
+
+    def fake_send(adapter, request, **kwargs):
+        resp = requests.Response()
+        resp.status_code = statuses.pop(0)
+        resp.headers["Retry-After"] = "0"
+        resp.raw = io.BytesIO(b"")
+        resp._content = b"{}"
+        return resp
+
+    monkeypatch.setattr(requests.adapters.HTTPAdapter, "send", fake_send)
+    session = requests.Session()
+    session.mount("https://", rate_limit.RateLimitedAdapter(limiter))
+    assert session.get("https://fast.org/y").status_code == 200 and not statuses
+    assert limiter.throttled == 1
+    assert limiter.backoff("https://fast.org/y", 429, "3600", 0) is None  # longer than RATE_LIMIT_MAX_WAIT_SECS
+
+
+def test_rate_limiter_buckets_are_shared_across_processes(tmp_path):
+    import pathlib
+    import scraper
+
+    rate_limit = scraper._load_module(pathlib.Path(scraper.__file__).parent / "scrapers" / "rate_limit.py")
+    assert "projects.propublica.org" in rate_limit.parse_limits(rate_limit.RATE_LIMITS)
+
+    # Two stores on one directory stand in for two process-mode scrapers.
+    a, b = (rate_limit.HostRateLimiter({"api.org": (10.0, 2.0)}, store=rate_limit.BucketStore(str(tmp_path)))
+            for _ in range(2))
+    waits = [a.bucket("https://api.org/x").reserve(), b.bucket("https://api.org/y").reserve(),
+             a.bucket("https://api.org/z").reserve()]
+    assert waits[:2] == [0.0, 0.0] and 0.05 < waits[2] < 0.11     # the burst of 2 is spent across both
+    b.backoff("https://api.org/y", 429, "30", 0)
+    assert a.bucket("https://api.org/x").reserve() > 29          # Retry-After seen by the other process too
+
+
+def test_timed_out_async_scrapers_hand_over_partial_rows(tmp_path, monkeypatch):
+    pytest.importorskip("aiohttp")
+    import scraper
+
+    (tmp_path / "agen.py").write_text(
+        "import asyncio\n"
+        "async def scrape():\n"
+        "    i = 0\n"
+        "    while True:\n"
+        "        await asyncio.sleep(0.05)\n"
+        "        yield {'name': 'agen %d' % i}\n"
+        "        i += 1\n")
+    (tmp_path / "coro.py").write_text(
+        "import asyncio\n"
+        "async def scrape():\n"
+        "    rows = []\n"
+        "    try:\n"
+        "        while True:\n"
+        "            await asyncio.sleep(0.05)\n"
+        "            rows.append({'name': 'coro %d' % len(rows)})\n"
+        "    except asyncio.CancelledError:\n"
+        "        return rows\n")
+    (tmp_path / "scrapers.txt").write_text("agen.py\ncoro.py\n")
+    monkeypatch.setattr(scraper, "SCRAPERS_DIR", tmp_path)
+    monkeypatch.setattr(scraper, "LIST_FILE", tmp_path / "scrapers.txt")
+    monkeypatch.setattr(scraper, "CHECKPOINTS_ENABLED", False)
+    monkeypatch.setattr(scraper, "SCRAPER_TIMEOUT_SECS", 0.5)
+    monkeypatch.setattr(scraper, "SCRAPER_CANCEL_GRACE_SECS", 2)
+
+    names = [r["name"] for r in scraper.scrape_stream()]
+    assert any(n.startswith("agen") for n in names) and any(n.startswith("coro") for n in names)
+    assert scraper.SCRAPER_STATS["agen"]["status"] == "cancelled"
+    assert scraper.SCRAPER_STATS["coro"]["status"] == "cancelled"